@@ -0,0 +1,154 @@
+"""
+Evaluator.evaluate throughput on synthetic data.
+
+Measures evaluations per second in a single process, and optionally with a pool of
+--n_cpus workers, reporting evaluations per second per core.
+
+    python3 benchmarks/bench_evaluator.py --n_coins 20 --n_days 60 --n_evals 32 --n_cpus 4
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+
+import numpy as np
+
+from common import add_common_args, measure, print_measurement, write_results
+import synthetic
+from dedup_table import DedupTable, capacity_for
+from optimize import (
+    Evaluator,
+    create_shared_memory_file,
+    extract_bounds_tuple_list_from_config,
+)
+
+
+class DiscardChannel:
+    """Stands in for the results channel; the writer process is not part of this benchmark."""
+
+    def put(self, individual, analyses, objectives):
+        pass
+
+
+def build_evaluator(args):
+    coins, _, hlcvs, btc_usd_prices = synthetic.generate_hlcvs(
+        args.n_coins, args.n_days, seed=args.seed, volume_profile=args.volume_profile
+    )
+    exchange = "binance"
+    config = synthetic.make_config(coins, exchanges=[exchange], scoring=args.scoring.split(","))
+    config["backtest"]["use_btc_collateral"] = args.use_btc_collateral
+    config["optimize"]["compute_all_metrics"] = args.compute_all_metrics
+    if not args.use_btc_collateral:
+        btc_usd_prices = np.ones(len(btc_usd_prices))
+    first_closes = {coin: hlcvs[:, i, 2][hlcvs[:, i, 3] >= 0.0][0] for i, coin in enumerate(coins)}
+    mss = synthetic.market_specific_settings(coins, seed=args.seed, first_closes=first_closes)
+    files = {
+        exchange: create_shared_memory_file(hlcvs),
+        "btc": create_shared_memory_file(btc_usd_prices),
+    }
+    seen_hashes = DedupTable.create(
+        capacity_for(args.n_evals * max(2, args.n_cpus + 1)), len(config["optimize"]["scoring"])
+    )
+    files["seen_hashes"] = seen_hashes.path
+    evaluator = Evaluator(
+        shared_memory_files={exchange: files[exchange]},
+        hlcvs_shapes={exchange: hlcvs.shape},
+        hlcvs_dtypes={exchange: hlcvs.dtype},
+        btc_usd_shared_memory_files={exchange: files["btc"]},
+        btc_usd_dtypes={exchange: btc_usd_prices.dtype},
+        msss={exchange: mss},
+        config=config,
+        results_channel=DiscardChannel(),
+        seen_hashes=seen_hashes,
+    )
+    return evaluator, config, files
+
+
+def random_individuals(config, n, seed):
+    rng = random.Random(seed)
+    bounds = extract_bounds_tuple_list_from_config(config)
+    return [[rng.uniform(low, high) for low, high in bounds] for _ in range(n)]
+
+
+_evaluator = None
+
+
+def _init_worker(evaluator):
+    global _evaluator
+    _evaluator = evaluator
+
+
+def _evaluate(individual):
+    return _evaluator.evaluate(individual, [])
+
+
+def run_serial(evaluator, individuals):
+    return [evaluator.evaluate(list(ind), []) for ind in individuals]
+
+
+def run_pool(pool, individuals):
+    return pool.map(_evaluate, individuals, chunksize=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Evaluator.evaluate throughput")
+    parser.add_argument("--n_coins", type=int, default=20)
+    parser.add_argument("--n_days", type=float, default=60.0)
+    parser.add_argument("--n_evals", type=int, default=16, help="evaluations per measurement")
+    parser.add_argument("--n_cpus", type=int, default=0, help="also measure a pool of n workers")
+    parser.add_argument("--scoring", type=str, default="adg,sharpe_ratio")
+    parser.add_argument("--volume_profile", type=str, default="daily")
+    parser.add_argument("--use_btc_collateral", action="store_true")
+    parser.add_argument("--compute_all_metrics", action="store_true")
+    add_common_args(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    evaluator, config, files = build_evaluator(args)
+    measurements = []
+    try:
+        # first evaluation pays for page faults on the shared memory files
+        evaluator.evaluate(random_individuals(config, 1, args.seed - 1)[0], [])
+
+        m = measure(
+            run_serial, evaluator, random_individuals(config, args.n_evals, args.seed), trace_memory=False
+        )
+        m.update(
+            name="evaluate_serial",
+            n_evals=args.n_evals,
+            evals_per_s=args.n_evals / m["wall_s_mean"],
+            evals_per_s_per_core=args.n_evals / m["wall_s_mean"],
+        )
+        measurements.append(m)
+        print_measurement("evaluate serial", m)
+
+        if args.n_cpus > 1:
+            n_evals = args.n_evals * args.n_cpus
+            with multiprocessing.Pool(args.n_cpus, _init_worker, (evaluator,)) as pool:
+                run_pool(pool, random_individuals(config, args.n_cpus, args.seed - 2))  # warmup
+                m = measure(
+                    run_pool,
+                    pool,
+                    random_individuals(config, n_evals, args.seed + 1),
+                    trace_memory=False,
+                )
+            m.update(
+                name="evaluate_pool",
+                n_cpus=args.n_cpus,
+                n_evals=n_evals,
+                evals_per_s=n_evals / m["wall_s_mean"],
+                evals_per_s_per_core=n_evals / m["wall_s_mean"] / args.n_cpus,
+            )
+            measurements.append(m)
+            print_measurement(f"evaluate pool n_cpus={args.n_cpus}", m)
+    finally:
+        for path in files.values():
+            if os.path.exists(path):
+                os.unlink(path)
+    print(f"results written to {write_results('evaluator', args, measurements)}")
+
+
+if __name__ == "__main__":
+    main()
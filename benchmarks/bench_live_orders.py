@@ -0,0 +1,135 @@
+"""
+Live order calculation cost for 50-500 symbols: Passivbot.calc_ideal_orders and
+Passivbot.calc_orders_to_cancel_and_create.
+
+A Passivbot instance is built without exchange sessions and populated with synthetic
+market settings, positions, EMAs, trailing prices, tickers and open orders.
+
+    python3 benchmarks/bench_live_orders.py --n_symbols 50,200,500
+"""
+
+import argparse
+import logging
+from copy import deepcopy
+
+import numpy as np
+
+from common import add_common_args, measure, print_measurement, write_results
+import synthetic
+from passivbot import Passivbot
+
+
+def build_bot(n_symbols: int, position_frac: float, seed: int) -> Passivbot:
+    rng = np.random.default_rng(seed)
+    coins = synthetic.coin_names(n_symbols)
+    mss = synthetic.market_specific_settings(coins, seed=seed)
+    config = synthetic.make_config(coins)
+    config["bot"]["long"]["n_positions"] = config["bot"]["short"]["n_positions"] = max(
+        1, int(n_symbols * position_frac)
+    )
+
+    bot = Passivbot.__new__(Passivbot)
+    bot.config = config
+    bot.balance = 100_000.0
+    bot.mimic_backtest_1m_delay = False
+    bot.PB_modes = {"long": {}, "short": {}}
+    bot.active_symbols = []
+    bot.positions = {}
+    bot.open_orders = {}
+    bot.live_configs = {}
+    bot.qty_steps, bot.price_steps, bot.min_qtys, bot.min_costs, bot.c_mults = {}, {}, {}, {}, {}
+    bot.trailing_prices = {}
+    bot.emas = {"long": {}, "short": {}}
+    bot.tickers = {}
+    bot.pnls = [{"pnl": float(x)} for x in rng.normal(5.0, 50.0, 1000)]
+
+    for coin in coins:
+        symbol = mss[coin]["symbol"]
+        price = float(mss[coin]["price_step"] * 10**4 * (1.0 + rng.random()))
+        bot.active_symbols.append(symbol)
+        for key in ["qty_step", "price_step", "min_qty", "min_cost", "c_mult"]:
+            getattr(bot, f"{key}s")[symbol] = mss[coin][key]
+        bot.tickers[symbol] = {"last": price, "bid": price, "ask": price}
+        bot.live_configs[symbol] = deepcopy(config["bot"])
+        bot.positions[symbol] = {}
+        bot.trailing_prices[symbol] = {}
+        for pside, sign in [("long", 1.0), ("short", -1.0)]:
+            bot.PB_modes[pside][symbol] = "normal"
+            n_pos = config["bot"][pside]["n_positions"]
+            wel = config["bot"][pside]["total_wallet_exposure_limit"] / n_pos
+            bot.live_configs[symbol][pside]["wallet_exposure_limit"] = wel
+            if rng.random() < position_frac:
+                pprice = price * (1.0 + sign * rng.uniform(0.0, 0.05))
+                size = bot.balance * wel * rng.uniform(0.1, 1.0) / pprice
+                size = round(size / mss[coin]["qty_step"]) * mss[coin]["qty_step"] * sign
+            else:
+                pprice, size = 0.0, 0.0
+            bot.positions[symbol][pside] = {"size": size, "price": pprice}
+            bot.emas[pside][symbol] = price * (1.0 + rng.normal(0.0, 0.01, 3))
+            bot.trailing_prices[symbol][pside] = {
+                "max_since_open": price * 1.02,
+                "min_since_max": price * 1.01,
+                "min_since_open": price * 0.98,
+                "max_since_min": price * 0.99,
+            }
+    return bot
+
+
+def make_open_orders(bot: Passivbot, stale_frac: float, seed: int) -> None:
+    """Open orders = current ideal orders, a fraction of them with a stale price."""
+    rng = np.random.default_rng(seed)
+    for symbol, orders in bot.calc_ideal_orders().items():
+        bot.open_orders[symbol] = []
+        for i, order in enumerate(orders):
+            price = order["price"]
+            if rng.random() < stale_frac:
+                price = price * (1.0 + rng.choice([-1, 1]) * 0.003)
+            bot.open_orders[symbol].append(
+                {
+                    "symbol": symbol,
+                    "side": order["side"],
+                    "position_side": order["position_side"],
+                    "qty": order["qty"],
+                    "price": price,
+                    "id": f"{symbol}_{i}",
+                }
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark live order calculation")
+    parser.add_argument("--n_symbols", type=str, default="50,200,500", help="comma separated")
+    parser.add_argument("--position_frac", type=float, default=0.2, help="share with a position")
+    parser.add_argument("--stale_frac", type=float, default=0.2, help="share of open orders to replace")
+    parser.add_argument("--repeat", type=int, default=10)
+    add_common_args(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    measurements = []
+    for n_symbols in map(int, args.n_symbols.split(",")):
+        bot = build_bot(n_symbols, args.position_frac, args.seed)
+        m = measure(bot.calc_ideal_orders, repeat=args.repeat)
+        m.update(
+            name="calc_ideal_orders",
+            n_symbols=n_symbols,
+            n_orders=sum(len(v) for v in m["result"].values()),
+        )
+        measurements.append(m)
+        print_measurement(f"calc_ideal_orders n_symbols={n_symbols}", m)
+
+        make_open_orders(bot, args.stale_frac, args.seed)
+        m = measure(bot.calc_orders_to_cancel_and_create, repeat=args.repeat)
+        m.update(
+            name="calc_orders_to_cancel_and_create",
+            n_symbols=n_symbols,
+            n_to_cancel=len(m["result"][0]),
+            n_to_create=len(m["result"][1]),
+        )
+        measurements.append(m)
+        print_measurement(f"calc_orders_to_cancel_and_create n_symbols={n_symbols}", m)
+    print(f"results written to {write_results('live_orders', args, measurements)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+ParetoStore.add_entry cost against fronts of 1k-100k points.
+
+For each front size the store is seeded with a mutually non-dominated front, then a batch of
+candidates is added: dominated ones (rejected), non-dominated ones (accepted, front grows)
+and dominating ones (accepted, evicting part of the front). Flushing to disk is measured
+separately.
+
+    python3 benchmarks/bench_pareto_store.py --front_sizes 1000,10000,100000 --n_objectives 3
+"""
+
+import argparse
+import logging
+import tempfile
+
+import numpy as np
+
+from common import add_common_args, measure, print_measurement, write_results
+import synthetic
+from pareto_store import ParetoStore
+
+
+def make_entry(template: dict, scoring: list, objectives, idx: int) -> dict:
+    entry = {
+        "bot": {pside: dict(template["bot"][pside]) for pside in ["long", "short"]},
+        "optimize": {"scoring": scoring},
+        "analyses_combined": {f"w_{i}": float(v) for i, v in enumerate(objectives)},
+    }
+    # make every entry's bot section distinct
+    entry["bot"]["long"]["entry_initial_qty_pct"] = 0.01 + idx * 1e-7
+    return entry
+
+
+def simplex_front(n_points: int, n_objectives: int, rng) -> np.ndarray:
+    """Points on the plane sum(x) == 1 are mutually non-dominated."""
+    pts = rng.dirichlet(np.ones(n_objectives), size=n_points)
+    return np.round(pts, 9)
+
+
+def seed_front(store: ParetoStore, entries: list) -> None:
+    """Fill the store's in-memory front without the per insert dominance scan.
+    The entries must be mutually non-dominated."""
+    for entry in entries:
+        obj = tuple(entry["analyses_combined"][f"w_{i}"] for i in range(len(entry["analyses_combined"])))
+        store._insert(f"seed{len(store):08d}", entry, obj)
+    store.scoring_keys = entries[0]["optimize"]["scoring"]
+
+
+def add_all(store: ParetoStore, entries: list) -> int:
+    return sum(store.add_entry(entry) for entry in entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ParetoStore.add_entry")
+    parser.add_argument("--front_sizes", type=str, default="1000,10000,100000")
+    parser.add_argument("--n_objectives", type=int, default=3)
+    parser.add_argument("--n_candidates", type=int, default=200, help="per candidate kind")
+    parser.add_argument("--skip_flush", action="store_true", help="don't measure flush_now")
+    add_common_args(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    template = synthetic.make_config([])
+    scoring = [f"obj_{i}" for i in range(args.n_objectives)]
+    measurements = []
+    for front_size in map(int, args.front_sizes.split(",")):
+        rng = np.random.default_rng(args.seed)
+        front = simplex_front(front_size, args.n_objectives, rng)
+        seed_entries = [make_entry(template, scoring, obj, i) for i, obj in enumerate(front)]
+        # candidates: shifted away from / onto / towards the origin relative to the front
+        base = simplex_front(args.n_candidates, args.n_objectives, rng)
+        kinds = {
+            "dominated": base + 0.01,
+            "non_dominated": base,
+            "dominating": base - 0.01,
+        }
+        for kind, objs in kinds.items():
+            entries = [
+                make_entry(template, scoring, obj, front_size + j) for j, obj in enumerate(objs)
+            ]
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                store = ParetoStore(tmp_dir, flush_interval=10**9)
+                seed_front(store, seed_entries)
+                m = measure(add_all, store, entries)
+                m.update(
+                    name="add_entry",
+                    kind=kind,
+                    front_size=front_size,
+                    n_objectives=args.n_objectives,
+                    n_candidates=len(entries),
+                    accepted=m["result"],
+                    us_per_entry=m["wall_s_mean"] / len(entries) * 1e6,
+                )
+                measurements.append(m)
+                print_measurement(f"add_entry {kind} front={front_size}", m)
+                if kind == "non_dominated" and not args.skip_flush:
+                    m = measure(store.flush_now)
+                    m.update(name="flush_now", front_size=len(store))
+                    measurements.append(m)
+                    print_measurement(f"flush_now front={len(store)}", m)
+    print(f"results written to {write_results('pareto_store', args, measurements)}")
+
+
+if __name__ == "__main__":
+    main()
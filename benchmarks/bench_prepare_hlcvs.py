@@ -0,0 +1,148 @@
+"""
+HLCV unification cost for N coins: prepare_hlcvs_internal (single exchange) and
+_prepare_hlcvs_combined_impl (multi exchange).
+
+Exchange access is replaced by an in-memory OHLCV source serving synthetic candles, so only
+the unification work (per coin fetch bookkeeping, caching to disk, reindexing, filling) is
+measured.
+
+    python3 benchmarks/bench_prepare_hlcvs.py --n_coins 50,200 --n_days 30
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+
+from common import add_common_args, measure, print_measurement, write_results
+import synthetic
+import downloader
+
+
+class SyntheticOHLCVSource:
+    """Implements the parts of OHLCVManager used by the hlcv preparation functions."""
+
+    def __init__(self, exchange: str, dfs: dict, mss: dict):
+        self.exchange = exchange
+        self.dfs = dfs
+        self.mss = mss
+        self.cc = None
+        self.start_ts = None
+        self.end_ts = None
+
+    async def load_markets(self):
+        pass
+
+    def has_coin(self, coin):
+        return coin in self.dfs
+
+    async def get_first_timestamp(self, coin):
+        return int(self.dfs[coin].timestamp.iloc[0])
+
+    def update_date_range(self, new_start_date=None, new_end_date=None):
+        if new_start_date is not None:
+            self.start_ts = new_start_date
+        if new_end_date is not None:
+            self.end_ts = new_end_date
+
+    async def get_ohlcvs(self, coin):
+        df = self.dfs[coin]
+        if self.start_ts is not None:
+            df = df[df.timestamp >= self.start_ts]
+        return df.reset_index(drop=True)
+
+    def get_market_specific_settings(self, coin):
+        return dict(self.mss[coin])
+
+
+def make_first_timestamps_getter(sources):
+    async def get_first_timestamps_unified(coins, *args, **kwargs):
+        return {
+            coin: min(s.dfs[coin].timestamp.iloc[0] for s in sources if coin in s.dfs)
+            for coin in coins
+            if any(coin in s.dfs for s in sources)
+        }
+
+    return get_first_timestamps_unified
+
+
+async def equal_volume_ratios(exchanges, coins, start_date, end_date, om_dict=None):
+    return {
+        (ex0, ex1): 1.0 for i, ex0 in enumerate(exchanges) for ex1 in exchanges[i + 1 :]
+    }
+
+
+def run_internal(config, coins, source):
+    return asyncio.run(
+        downloader.prepare_hlcvs_internal(
+            config,
+            coins,
+            source.exchange,
+            config["backtest"]["start_date"],
+            config["backtest"]["end_date"],
+            source,
+        )
+    )
+
+
+def run_combined(config, sources):
+    return asyncio.run(
+        downloader._prepare_hlcvs_combined_impl(config, {s.exchange: s for s in sources})
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hlcv unification")
+    parser.add_argument("--n_coins", type=str, default="10,50,200", help="comma separated")
+    parser.add_argument("--n_days", type=float, default=30.0)
+    parser.add_argument("--n_exchanges", type=int, default=2, help="for the combined variant")
+    parser.add_argument("--repeat", type=int, default=3)
+    add_common_args(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    measurements = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # prepare_hlcvs_internal writes per coin temp files under ./caches/
+        os.chdir(tmp_dir)
+        try:
+            for n_coins in map(int, args.n_coins.split(",")):
+                exchanges = [f"ex{i}" for i in range(args.n_exchanges)]
+                sources = []
+                for i, ex in enumerate(exchanges):
+                    # each exchange lists every coin, with its own gaps and prices
+                    dfs = synthetic.generate_ohlcvs(n_coins, args.n_days, seed=args.seed + i)
+                    mss = synthetic.market_specific_settings(list(dfs), seed=args.seed + i)
+                    sources.append(SyntheticOHLCVSource(ex, dfs, mss))
+                coins = synthetic.coin_names(n_coins)
+                config = synthetic.make_config(coins, exchanges=exchanges)
+                config["backtest"]["start_date"] = "2023-01-01"
+                config["backtest"]["end_date"] = "2030-01-01"
+                downloader.get_first_timestamps_unified = make_first_timestamps_getter(sources)
+                downloader.compute_exchange_volume_ratios = equal_volume_ratios
+
+                m = measure(run_internal, config, coins, sources[0], repeat=args.repeat)
+                m.update(name="prepare_hlcvs_internal", n_coins=n_coins, shape=m["result"][2].shape)
+                measurements.append(m)
+                print_measurement(f"prepare_hlcvs_internal n_coins={n_coins}", m)
+
+                m = measure(run_combined, config, sources, repeat=args.repeat)
+                m.update(
+                    name="prepare_hlcvs_combined",
+                    n_coins=n_coins,
+                    n_exchanges=args.n_exchanges,
+                    shape=m["result"][2].shape,
+                )
+                measurements.append(m)
+                print_measurement(
+                    f"prepare_hlcvs_combined n_coins={n_coins} n_ex={args.n_exchanges}", m
+                )
+        finally:
+            os.chdir(cwd)
+    print(f"results written to {write_results('prepare_hlcvs', args, measurements)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Shared helpers for the benchmark scripts: timing, memory measurement and JSON output.
+
+Each benchmark writes one JSON document per run to benchmarks/results/ (or --output),
+containing the machine info, the arguments and a list of measurements, so results can be
+tracked over time and diffed between commits.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def max_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def measure(fn, *args, repeat=1, trace_memory=True, **kwargs) -> dict:
+    """
+    Call fn(*args, **kwargs) `repeat` times.
+    Returns wall and cpu seconds (min/mean over repeats), peak traced Python allocations
+    and process peak RSS, plus the return value of the last call under "result".
+    """
+    walls, cpus = [], []
+    peak_traced = 0
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        if trace_memory:
+            tracemalloc.start()
+        t0, c0 = time.perf_counter(), time.process_time()
+        result = fn(*args, **kwargs)
+        walls.append(time.perf_counter() - t0)
+        cpus.append(time.process_time() - c0)
+        if trace_memory:
+            peak_traced = max(peak_traced, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    return {
+        "wall_s_min": min(walls),
+        "wall_s_mean": sum(walls) / len(walls),
+        "cpu_s_mean": sum(cpus) / len(cpus),
+        "repeat": repeat,
+        "traced_peak_mb": peak_traced / (1024 * 1024) if trace_memory else None,
+        "max_rss_mb": max_rss_mb(),
+        "result": result,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except Exception:
+        return None
+
+
+def add_common_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--seed", type=int, default=42, help="seed for synthetic data. Default=42")
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default=None,
+        help="output JSON path. Default=benchmarks/results/<name>_<timestamp>.json",
+    )
+
+
+def write_results(name: str, args: argparse.Namespace, measurements: list) -> str:
+    """Dump measurements (minus raw return values) to JSON; returns the path written."""
+    doc = {
+        "benchmark": name,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": vars(args),
+        "measurements": [{k: v for k, v in m.items() if k != "result"} for m in measurements],
+    }
+    path = args.output
+    if path is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H_%M_%S")
+        path = os.path.join(RESULTS_DIR, f"{name}_{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=4)
+    return path
+
+
+def print_measurement(label: str, m: dict) -> None:
+    extras = " ".join(
+        f"{k}={v}"
+        for k, v in m.items()
+        if k not in ("result", "wall_s_min", "wall_s_mean", "cpu_s_mean", "repeat")
+    )
+    print(f"{label:<48} wall {m['wall_s_min']:.4f}s (mean {m['wall_s_mean']:.4f}s) {extras}")
@@ -0,0 +1,151 @@
+"""
+Deterministic synthetic market data for the Python benchmarks.
+
+Mirrors passivbot-rust/benches/synthetic: per coin geometric random walk 1m candles with
+optional late listings, delistings and volume profiles ("constant", "daily", "bursty").
+Minutes outside a coin's listed range follow the prepared-data convention:
+high == low == close (nearest valid close), volume == -1.
+"""
+
+import numpy as np
+import pandas as pd
+
+import common  # noqa: F401  (puts src/ on sys.path)
+from pure_funcs import get_template_live_config
+
+ONE_MIN_MS = 60_000
+START_TS = 1_672_531_200_000  # 2023-01-01
+
+
+def coin_names(n_coins: int) -> list:
+    return [f"C{i:04d}" for i in range(n_coins)]
+
+
+def _listed_range(rng, n_minutes, late_listing_frac, delisting_frac):
+    quarter = n_minutes // 4
+    first = int(rng.random() * quarter) + quarter // 2 if rng.random() < late_listing_frac else 0
+    last = (
+        n_minutes - 1 - quarter // 2 - int(rng.random() * quarter)
+        if rng.random() < delisting_frac
+        else n_minutes - 1
+    )
+    return first, max(first, last)
+
+
+def _volumes(rng, n, profile, offset):
+    base = 1e5 * (1.0 + 9.0 * rng.random())
+    noise = 0.5 + rng.random(n)
+    if profile == "constant":
+        return base * noise
+    if profile == "daily":
+        day_frac = ((np.arange(n) + offset) % 1440) / 1440.0
+        return base * (1.0 + 0.5 * np.sin(2 * np.pi * day_frac + rng.random() * 2 * np.pi)) * noise
+    if profile == "bursty":
+        vols = base * 0.3 * noise
+        spikes = rng.random(n) < 0.002
+        vols[spikes] = base * (10.0 + 40.0 * rng.random(spikes.sum()))
+        return vols
+    raise ValueError(f"unknown volume profile {profile}")
+
+
+def generate_ohlcvs(
+    n_coins: int,
+    n_days: float,
+    seed: int = 42,
+    volatility: float = 0.0015,
+    late_listing_frac: float = 0.2,
+    delisting_frac: float = 0.1,
+    volume_profile: str = "daily",
+) -> dict:
+    """
+    Returns {coin: DataFrame[timestamp, open, high, low, close, volume]} covering only each
+    coin's listed range, i.e. what OHLCVManager.get_ohlcvs would return.
+    """
+    rng = np.random.default_rng(seed)
+    n_minutes = int(n_days * 1440)
+    dfs = {}
+    for coin in coin_names(n_coins):
+        first, last = _listed_range(rng, n_minutes, late_listing_frac, delisting_frac)
+        n = last - first + 1
+        start_price = 10 ** (rng.random() * 4 - 1)
+        closes = start_price * np.exp(np.cumsum(volatility * rng.standard_normal(n)))
+        opens = np.concatenate([[start_price], closes[:-1]])
+        highs = np.maximum(opens, closes) * (1 + volatility * rng.random(n))
+        lows = np.minimum(opens, closes) * (1 - volatility * rng.random(n))
+        dfs[coin] = pd.DataFrame(
+            {
+                "timestamp": START_TS + np.arange(first, last + 1, dtype=np.int64) * ONE_MIN_MS,
+                "open": opens,
+                "high": highs,
+                "low": lows,
+                "close": closes,
+                "volume": _volumes(rng, n, volume_profile, first),
+            }
+        )
+    return dfs
+
+
+def ohlcvs_to_hlcvs(dfs: dict):
+    """Unify per coin ohlcvs into (timestamps, hlcvs) with shape (n_minutes, n_coins, 4)."""
+    start = min(df.timestamp.iloc[0] for df in dfs.values())
+    end = max(df.timestamp.iloc[-1] for df in dfs.values())
+    timestamps = np.arange(start, end + ONE_MIN_MS, ONE_MIN_MS)
+    hlcvs = np.empty((len(timestamps), len(dfs), 4), dtype=np.float64)
+    for i, coin in enumerate(sorted(dfs)):
+        df = dfs[coin]
+        i0 = int((df.timestamp.iloc[0] - start) // ONE_MIN_MS)
+        i1 = i0 + len(df)
+        hlcvs[i0:i1, i, :] = df[["high", "low", "close", "volume"]].values
+        hlcvs[:i0, i, :3] = df.close.iloc[0]
+        hlcvs[i1:, i, :3] = df.close.iloc[-1]
+        hlcvs[:i0, i, 3] = -1.0
+        hlcvs[i1:, i, 3] = -1.0
+    return timestamps, hlcvs
+
+
+def generate_hlcvs(n_coins: int, n_days: float, seed: int = 42, **kwargs):
+    """Returns (coins, timestamps, hlcvs, btc_usd_prices)."""
+    dfs = generate_ohlcvs(n_coins, n_days, seed=seed, **kwargs)
+    timestamps, hlcvs = ohlcvs_to_hlcvs(dfs)
+    rng = np.random.default_rng(seed + 1)
+    btc_usd_prices = 30_000.0 * np.exp(np.cumsum(0.0015 * rng.standard_normal(len(timestamps))))
+    return sorted(dfs), timestamps, hlcvs, btc_usd_prices
+
+
+def market_specific_settings(coins: list, seed: int = 42, first_closes: dict | None = None) -> dict:
+    """ccxt-like market info with the keys used by backtest and live order calculation."""
+    rng = np.random.default_rng(seed + 2)
+    mss = {}
+    for coin in coins:
+        price = first_closes[coin] if first_closes else 10 ** (rng.random() * 4 - 1)
+        price_step = 10 ** np.floor(np.log10(price) - 4)
+        qty_step = 10 ** max(-8.0, np.floor(-np.log10(price) - 1))
+        mss[coin] = {
+            "symbol": f"{coin}/USDT:USDT",
+            "qty_step": qty_step,
+            "price_step": price_step,
+            "min_qty": qty_step,
+            "min_cost": 5.0,
+            "c_mult": 1.0,
+            "maker": 0.0002,
+            "taker": 0.00055,
+            "maker_fee": 0.0002,
+            "taker_fee": 0.00055,
+            "hedge_mode": True,
+            "contractSize": 1.0,
+            "precision": {"amount": qty_step, "price": price_step},
+            "limits": {"cost": {"min": 5.0}, "amount": {"min": qty_step}},
+        }
+    return mss
+
+
+def make_config(coins: list, exchanges=("binance",), scoring=("adg", "sharpe_ratio")) -> dict:
+    config = get_template_live_config("v7")
+    config["live"]["approved_coins"] = {"long": list(coins), "short": list(coins)}
+    config["live"]["minimum_coin_age_days"] = 0.0
+    config["backtest"]["exchanges"] = list(exchanges)
+    config["backtest"]["coins"] = {ex: list(coins) for ex in exchanges}
+    config["backtest"]["start_date"] = "2023-01-01"
+    config["backtest"]["end_date"] = "2023-02-01"
+    config["optimize"]["scoring"] = list(scoring)
+    return config
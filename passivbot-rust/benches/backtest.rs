@@ -0,0 +1,287 @@
+//! Criterion benchmarks for the backtest core.
+//!
+//! Run from passivbot-rust/ with
+//!
+//!     cargo bench --no-default-features
+//!
+//! (`extension-module` must be disabled so the bench binary links against libpython.)
+//! Dataset sizes may be overridden with PB_BENCH_COINS, PB_BENCH_DAYS and PB_BENCH_SEED;
+//! all data is generated deterministically from the seed.
+
+mod synthetic;
+
+use criterion::{black_box, criterion_group, criterion_main, BenchmarkId, Criterion};
+use passivbot_rust::backtest::{analyze_backtest, Backtest};
+use passivbot_rust::closes::{
+    calc_closes_long, calc_closes_short, calc_next_close_long, calc_next_close_short,
+};
+use passivbot_rust::entries::{
+    calc_entries_long, calc_entries_short, calc_next_entry_long, calc_next_entry_short,
+};
+use passivbot_rust::types::{
+    BacktestParams, EMABands, ExchangeParams, MetricsRequest, OrderBook, Position, StateParams,
+    TrailingPriceBundle,
+};
+use std::time::Duration;
+use synthetic::{SyntheticSpec, VolumeProfile};
+
+fn env_usize(key: &str, default: usize) -> usize {
+    std::env::var(key)
+        .ok()
+        .and_then(|v| v.parse().ok())
+        .unwrap_or(default)
+}
+
+fn backtest_params(n_coins: usize) -> BacktestParams {
+    BacktestParams {
+        starting_balance: 100_000.0,
+        maker_fee: 0.0002,
+        coins: (0..n_coins).map(|i| format!("COIN{}", i)).collect(),
+        metrics: None,
+    }
+}
+
+fn order_calc_inputs() -> (ExchangeParams, StateParams, TrailingPriceBundle) {
+    let exchange_params = ExchangeParams {
+        qty_step: 0.001,
+        price_step: 0.01,
+        min_qty: 0.001,
+        min_cost: 5.0,
+        c_mult: 1.0,
+    };
+    let state_params = StateParams {
+        balance: 10_000.0,
+        order_book: OrderBook {
+            bid: 100.0,
+            ask: 100.01,
+        },
+        ema_bands: EMABands {
+            upper: 101.0,
+            lower: 99.0,
+        },
+    };
+    let trailing_price_bundle = TrailingPriceBundle {
+        min_since_open: 94.0,
+        max_since_min: 97.0,
+        max_since_open: 106.0,
+        min_since_max: 103.0,
+    };
+    (exchange_params, state_params, trailing_price_bundle)
+}
+
+fn bench_order_calcs(c: &mut Criterion) {
+    let (exchange_params, state_params, trailing) = order_calc_inputs();
+    let bot = synthetic::bot_params_pair(7);
+    let cases = [
+        ("flat", Position::default(), Position::default()),
+        (
+            "in_position",
+            Position {
+                size: 1.5,
+                price: 104.0,
+            },
+            Position {
+                size: -1.5,
+                price: 96.0,
+            },
+        ),
+    ];
+    let mut group = c.benchmark_group("orders");
+    for (label, pos_long, pos_short) in cases.iter() {
+        group.bench_with_input(
+            BenchmarkId::new("calc_next_entry_long", label),
+            pos_long,
+            |b, pos| {
+                b.iter(|| {
+                    calc_next_entry_long(
+                        black_box(&exchange_params),
+                        black_box(&state_params),
+                        &bot.long,
+                        black_box(pos),
+                        &trailing,
+                    )
+                })
+            },
+        );
+        group.bench_with_input(
+            BenchmarkId::new("calc_next_entry_short", label),
+            pos_short,
+            |b, pos| {
+                b.iter(|| {
+                    calc_next_entry_short(
+                        black_box(&exchange_params),
+                        black_box(&state_params),
+                        &bot.short,
+                        black_box(pos),
+                        &trailing,
+                    )
+                })
+            },
+        );
+        group.bench_with_input(
+            BenchmarkId::new("calc_entries_long", label),
+            pos_long,
+            |b, pos| {
+                b.iter(|| {
+                    calc_entries_long(
+                        black_box(&exchange_params),
+                        black_box(&state_params),
+                        &bot.long,
+                        black_box(pos),
+                        &trailing,
+                    )
+                })
+            },
+        );
+        group.bench_with_input(
+            BenchmarkId::new("calc_entries_short", label),
+            pos_short,
+            |b, pos| {
+                b.iter(|| {
+                    calc_entries_short(
+                        black_box(&exchange_params),
+                        black_box(&state_params),
+                        &bot.short,
+                        black_box(pos),
+                        &trailing,
+                    )
+                })
+            },
+        );
+    }
+    // closes are only meaningful with a position
+    let (_, pos_long, pos_short) = &cases[1];
+    group.bench_function("calc_next_close_long", |b| {
+        b.iter(|| {
+            calc_next_close_long(
+                black_box(&exchange_params),
+                black_box(&state_params),
+                &bot.long,
+                black_box(pos_long),
+                &trailing,
+            )
+        })
+    });
+    group.bench_function("calc_next_close_short", |b| {
+        b.iter(|| {
+            calc_next_close_short(
+                black_box(&exchange_params),
+                black_box(&state_params),
+                &bot.short,
+                black_box(pos_short),
+                &trailing,
+            )
+        })
+    });
+    group.bench_function("calc_closes_long", |b| {
+        b.iter(|| {
+            calc_closes_long(
+                black_box(&exchange_params),
+                black_box(&state_params),
+                &bot.long,
+                black_box(pos_long),
+                &trailing,
+            )
+        })
+    });
+    group.bench_function("calc_closes_short", |b| {
+        b.iter(|| {
+            calc_closes_short(
+                black_box(&exchange_params),
+                black_box(&state_params),
+                &bot.short,
+                black_box(pos_short),
+                &trailing,
+            )
+        })
+    });
+    group.finish();
+}
+
+fn bench_backtest_run(c: &mut Criterion) {
+    let n_coins = env_usize("PB_BENCH_COINS", 10);
+    let n_days = env_usize("PB_BENCH_DAYS", 30);
+    let seed = env_usize("PB_BENCH_SEED", 42) as u64;
+    let mut group = c.benchmark_group("backtest_run");
+    group.sample_size(10);
+    group.measurement_time(Duration::from_secs(20));
+    for (label, volume_profile) in [
+        ("daily_volume", VolumeProfile::Daily),
+        ("bursty_volume", VolumeProfile::Bursty),
+    ] {
+        let spec = SyntheticSpec {
+            n_coins,
+            n_days,
+            seed,
+            volume_profile,
+            ..Default::default()
+        };
+        let data = synthetic::generate(&spec);
+        let hlcvs = data.hlcvs.view();
+        let btc_usd_prices = data.btc_usd_prices.view();
+        let params = backtest_params(n_coins);
+        let bot = synthetic::bot_params_pair(7.min(n_coins));
+        let id = format!("{}c_{}d_{}", n_coins, n_days, label);
+        group.bench_function(BenchmarkId::new("run", id), |b| {
+            b.iter(|| {
+                let mut backtest = Backtest::new(
+                    &hlcvs,
+                    &btc_usd_prices,
+                    bot.clone(),
+                    synthetic::exchange_params_list(&data.hlcvs),
+                    &params,
+                );
+                black_box(backtest.run())
+            })
+        });
+    }
+    group.finish();
+}
+
+fn bench_analyze_backtest(c: &mut Criterion) {
+    let n_coins = env_usize("PB_BENCH_COINS", 10);
+    let n_days = env_usize("PB_BENCH_DAYS", 30);
+    let seed = env_usize("PB_BENCH_SEED", 42) as u64;
+    let spec = SyntheticSpec {
+        n_coins,
+        n_days,
+        seed,
+        ..Default::default()
+    };
+    let data = synthetic::generate(&spec);
+    let hlcvs = data.hlcvs.view();
+    let btc_usd_prices = data.btc_usd_prices.view();
+    let (fills, equities) = Backtest::new(
+        &hlcvs,
+        &btc_usd_prices,
+        synthetic::bot_params_pair(7.min(n_coins)),
+        synthetic::exchange_params_list(&data.hlcvs),
+        &backtest_params(n_coins),
+    )
+    .run();
+
+    let subset: Vec<String> = ["adg_w", "mdg_w", "drawdown_worst", "sharpe_ratio"]
+        .iter()
+        .map(|s| s.to_string())
+        .collect();
+    let requests = [
+        ("all", MetricsRequest::all()),
+        ("subset", MetricsRequest::from_names(&subset)),
+    ];
+    let mut group = c.benchmark_group("analyze_backtest");
+    group.sample_size(20);
+    for (label, request) in requests.iter() {
+        group.bench_with_input(BenchmarkId::new("usd", label), request, |b, request| {
+            b.iter(|| analyze_backtest(black_box(&fills), black_box(&equities.usd), request))
+        });
+    }
+    group.finish();
+}
+
+criterion_group!(
+    benches,
+    bench_order_calcs,
+    bench_analyze_backtest,
+    bench_backtest_run
+);
+criterion_main!(benches);
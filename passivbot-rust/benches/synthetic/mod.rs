@@ -0,0 +1,247 @@
+//! Deterministic synthetic market data for benchmarks.
+//!
+//! Candles are generated as a geometric random walk per coin with a seeded
+//! xorshift PRNG, so identical specs always produce identical arrays and
+//! benchmark numbers can be reproduced without downloading exchange archives.
+
+use ndarray::{Array1, Array3};
+use passivbot_rust::constants::{CLOSE, HIGH, LOW, VOLUME};
+use passivbot_rust::types::{BotParams, BotParamsPair, ExchangeParams};
+
+/// Shape of the intraday volume curve.
+#[derive(Clone, Copy, Debug)]
+pub enum VolumeProfile {
+    /// Flat base volume with noise.
+    Constant,
+    /// Sinusoidal daily seasonality (peak/trough ratio about 3x).
+    Daily,
+    /// Mostly quiet with occasional 10-50x spikes.
+    Bursty,
+}
+
+#[derive(Clone, Debug)]
+pub struct SyntheticSpec {
+    pub n_coins: usize,
+    pub n_days: usize,
+    pub seed: u64,
+    /// Per-minute log-return standard deviation.
+    pub volatility: f64,
+    /// Fraction of coins listed after the start of the dataset.
+    pub late_listing_frac: f64,
+    /// Fraction of coins delisted before the end of the dataset.
+    pub delisting_frac: f64,
+    pub volume_profile: VolumeProfile,
+}
+
+impl Default for SyntheticSpec {
+    fn default() -> Self {
+        SyntheticSpec {
+            n_coins: 10,
+            n_days: 30,
+            seed: 42,
+            volatility: 0.0015,
+            late_listing_frac: 0.2,
+            delisting_frac: 0.1,
+            volume_profile: VolumeProfile::Daily,
+        }
+    }
+}
+
+impl SyntheticSpec {
+    pub fn n_minutes(&self) -> usize {
+        self.n_days * 24 * 60
+    }
+}
+
+/// xorshift64* — small, fast and reproducible across platforms.
+pub struct XorShift64 {
+    state: u64,
+}
+
+impl XorShift64 {
+    pub fn new(seed: u64) -> Self {
+        XorShift64 {
+            state: seed.wrapping_mul(0x9E37_79B9_7F4A_7C15) | 1,
+        }
+    }
+
+    pub fn next_u64(&mut self) -> u64 {
+        let mut x = self.state;
+        x ^= x >> 12;
+        x ^= x << 25;
+        x ^= x >> 27;
+        self.state = x;
+        x.wrapping_mul(0x2545_F491_4F6C_DD1D)
+    }
+
+    /// Uniform in [0, 1).
+    pub fn next_f64(&mut self) -> f64 {
+        (self.next_u64() >> 11) as f64 / (1u64 << 53) as f64
+    }
+
+    /// Standard normal via Box-Muller.
+    pub fn next_normal(&mut self) -> f64 {
+        let u1 = self.next_f64().max(f64::MIN_POSITIVE);
+        let u2 = self.next_f64();
+        (-2.0 * u1.ln()).sqrt() * (2.0 * std::f64::consts::PI * u2).cos()
+    }
+}
+
+pub struct SyntheticData {
+    /// Shape (n_minutes, n_coins, 4) with columns high, low, close, volume.
+    pub hlcvs: Array3<f64>,
+    pub btc_usd_prices: Array1<f64>,
+}
+
+/// Generates candles for `spec`. Minutes outside a coin's listed range are
+/// marked invalid the same way the Python data preparation does:
+/// high == low == close (the nearest valid close) and volume == -1.
+pub fn generate(spec: &SyntheticSpec) -> SyntheticData {
+    let n_minutes = spec.n_minutes();
+    let n_coins = spec.n_coins;
+    let mut rng = XorShift64::new(spec.seed);
+    let mut hlcvs = Array3::<f64>::zeros((n_minutes, n_coins, 4));
+
+    for coin in 0..n_coins {
+        let (first, last) = listed_range(&mut rng, spec, n_minutes);
+        let mut close = 10f64.powf(rng.next_f64() * 4.0 - 1.0); // 0.1 .. 1000
+        let base_volume = 1e5 * (1.0 + 9.0 * rng.next_f64());
+        let phase = rng.next_f64() * 2.0 * std::f64::consts::PI;
+        for t in first..=last {
+            let prev = close;
+            close *= (spec.volatility * rng.next_normal()).exp();
+            let wick_hi = spec.volatility * rng.next_f64();
+            let wick_lo = spec.volatility * rng.next_f64();
+            hlcvs[[t, coin, HIGH]] = prev.max(close) * (1.0 + wick_hi);
+            hlcvs[[t, coin, LOW]] = prev.min(close) * (1.0 - wick_lo);
+            hlcvs[[t, coin, CLOSE]] = close;
+            hlcvs[[t, coin, VOLUME]] =
+                volume_at(&mut rng, spec.volume_profile, base_volume, phase, t) * close;
+        }
+        let first_close = hlcvs[[first, coin, CLOSE]];
+        for t in 0..first {
+            mark_invalid(&mut hlcvs, t, coin, first_close);
+        }
+        for t in (last + 1)..n_minutes {
+            mark_invalid(&mut hlcvs, t, coin, close);
+        }
+    }
+
+    let mut btc = 30_000.0;
+    let btc_usd_prices = Array1::from_iter((0..n_minutes).map(|_| {
+        btc *= (spec.volatility * rng.next_normal()).exp();
+        btc
+    }));
+
+    SyntheticData {
+        hlcvs,
+        btc_usd_prices,
+    }
+}
+
+fn listed_range(rng: &mut XorShift64, spec: &SyntheticSpec, n_minutes: usize) -> (usize, usize) {
+    // late listings and delistings happen within the middle half of the range,
+    // leaving every coin at least a quarter of the dataset of valid candles
+    let quarter = n_minutes / 4;
+    let first = if rng.next_f64() < spec.late_listing_frac {
+        (rng.next_f64() * quarter as f64) as usize + quarter / 2
+    } else {
+        0
+    };
+    let last = if rng.next_f64() < spec.delisting_frac {
+        n_minutes - 1 - quarter / 2 - (rng.next_f64() * quarter as f64) as usize
+    } else {
+        n_minutes - 1
+    };
+    (first, last.max(first))
+}
+
+fn volume_at(
+    rng: &mut XorShift64,
+    profile: VolumeProfile,
+    base: f64,
+    phase: f64,
+    minute: usize,
+) -> f64 {
+    let noise = 0.5 + rng.next_f64();
+    match profile {
+        VolumeProfile::Constant => base * noise,
+        VolumeProfile::Daily => {
+            let day_frac = (minute % 1440) as f64 / 1440.0;
+            let season = 1.0 + 0.5 * (2.0 * std::f64::consts::PI * day_frac + phase).sin();
+            base * season * noise
+        }
+        VolumeProfile::Bursty => {
+            if rng.next_f64() < 0.002 {
+                base * (10.0 + 40.0 * rng.next_f64())
+            } else {
+                base * 0.3 * noise
+            }
+        }
+    }
+}
+
+fn mark_invalid(hlcvs: &mut Array3<f64>, t: usize, coin: usize, price: f64) {
+    hlcvs[[t, coin, HIGH]] = price;
+    hlcvs[[t, coin, LOW]] = price;
+    hlcvs[[t, coin, CLOSE]] = price;
+    hlcvs[[t, coin, VOLUME]] = -1.0;
+}
+
+/// Bot params resembling configs/template.json, both sides enabled.
+pub fn bot_params_pair(n_positions: usize) -> BotParamsPair {
+    let bot_params = BotParams {
+        close_grid_markup_end: 0.001161,
+        close_grid_markup_start: 0.009675,
+        close_grid_qty_pct: 0.9692,
+        close_trailing_grid_ratio: -0.0316,
+        close_trailing_qty_pct: 0.6361,
+        close_trailing_retracement_pct: 0.09966,
+        close_trailing_threshold_pct: 0.04829,
+        ema_span_0: 275.7,
+        ema_span_1: 586.4,
+        enforce_exposure_limit: true,
+        entry_grid_double_down_factor: 1.437,
+        entry_grid_spacing_pct: 0.03623,
+        entry_grid_spacing_weight: 0.693,
+        entry_initial_ema_dist: -0.06036,
+        entry_initial_qty_pct: 0.004391,
+        entry_trailing_double_down_factor: 1.364,
+        entry_trailing_grid_ratio: -0.01483,
+        entry_trailing_retracement_pct: 0.01131,
+        entry_trailing_threshold_pct: 0.05542,
+        filter_noisiness_rolling_window: 302,
+        filter_volume_drop_pct: 0.5,
+        filter_volume_rolling_window: 2530,
+        n_positions,
+        total_wallet_exposure_limit: 1.953,
+        wallet_exposure_limit: 1.953 / n_positions.max(1) as f64,
+        unstuck_close_pct: 0.01231,
+        unstuck_ema_dist: -0.07572,
+        unstuck_loss_allowance_pct: 0.03499,
+        unstuck_threshold: 0.6536,
+    };
+    BotParamsPair {
+        long: bot_params.clone(),
+        short: bot_params,
+    }
+}
+
+/// Exchange params scaled to each coin's first close so min cost and steps
+/// stay meaningful across the generated price range.
+pub fn exchange_params_list(hlcvs: &Array3<f64>) -> Vec<ExchangeParams> {
+    (0..hlcvs.shape()[1])
+        .map(|coin| {
+            let price = hlcvs[[0, coin, CLOSE]];
+            let price_step = 10f64.powf((price.log10() - 4.0).floor());
+            let qty_step = 10f64.powf((-price.log10() - 1.0).floor().max(-8.0));
+            ExchangeParams {
+                qty_step,
+                price_step,
+                min_qty: qty_step,
+                min_cost: 5.0,
+                c_mult: 1.0,
+            }
+        })
+        .collect()
+}
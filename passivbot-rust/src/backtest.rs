@@ -8,8 +8,8 @@ use crate::entries::{
 };
 use crate::types::{
     Analysis, BacktestParams, Balance, BotParams, BotParamsPair, EMABands, Equities,
-    ExchangeParams, Fill, Order, OrderBook, OrderType, Position, Positions, StateParams,
-    TrailingPriceBundle,
+    ExchangeParams, Fill, MetricFlags, MetricsRequest, Order, OrderBook, OrderType, Position,
+    Positions, StateParams, TrailingPriceBundle,
 };
 use crate::utils::{
     calc_auto_unstuck_allowance, calc_new_psize_pprice, calc_pnl_long, calc_pnl_short,
@@ -1630,7 +1630,7 @@ fn calc_ema_alphas(bot_params_pair: &BotParamsPair) -> EmaAlphas {
     }
 }
 
-fn analyze_backtest_basic(fills: &[Fill], equities: &Vec<f64>) -> Analysis {
+fn analyze_backtest_basic(fills: &[Fill], equities: &[f64], flags: &MetricFlags) -> Analysis {
     if fills.len() <= 1 {
         return Analysis::default();
     }
@@ -1669,92 +1669,81 @@ fn analyze_backtest_basic(fills: &[Fill], equities: &Vec<f64>) -> Analysis {
         .map(|w| (w[1] - w[0]) / w[0])
         .collect();
 
+    let mut analysis = Analysis::default();
+
     // Calculate ADG and standard metrics
     let (gain, adg) = smoothed_terminal_geometric_gain_and_adg(&daily_eqs);
-    let mdg = {
+    analysis.adg = adg;
+    analysis.gain = gain;
+
+    if flags.mdg {
         let mut sorted_pct_change = daily_eqs_pct_change.clone();
-        sorted_pct_change.sort_by(|a, b| {
-            a.partial_cmp(b).unwrap_or_else(|| {
-                if a.is_nan() && b.is_nan() {
-                    Ordering::Equal
-                } else if a.is_nan() {
-                    Ordering::Greater
-                } else {
-                    Ordering::Less
-                }
-            })
-        });
-        if sorted_pct_change.len() % 2 == 0 {
+        sorted_pct_change.sort_by(cmp_nan_last);
+        analysis.mdg = if sorted_pct_change.len() % 2 == 0 {
             (sorted_pct_change[sorted_pct_change.len() / 2 - 1]
                 + sorted_pct_change[sorted_pct_change.len() / 2])
                 / 2.0
         } else {
             sorted_pct_change[sorted_pct_change.len() / 2]
-        }
-    };
-
-    // Calculate variance and standard deviation
-    let variance = daily_eqs_mins_pct_change
-        .iter()
-        .map(|&x| (x - adg).powi(2))
-        .sum::<f64>()
-        / daily_eqs_mins_pct_change.len() as f64;
-    let std_dev = variance.sqrt();
-
-    // Calculate Sharpe Ratio
-    let sharpe_ratio = if std_dev != 0.0 { adg / std_dev } else { 0.0 };
+        };
+    }
 
-    // Calculate Sortino Ratio (using downside deviation)
-    let downside_returns: Vec<f64> = daily_eqs_mins_pct_change
-        .iter()
-        .filter(|&&x| x < 0.0)
-        .cloned()
-        .collect();
-    let downside_deviation = if !downside_returns.is_empty() {
-        (downside_returns.iter().map(|x| x.powi(2)).sum::<f64>() / downside_returns.len() as f64)
-            .sqrt()
-    } else {
-        0.0
-    };
-    let sortino_ratio = if downside_deviation != 0.0 {
-        adg / downside_deviation
-    } else {
-        0.0
-    };
+    if flags.sharpe_ratio {
+        // Calculate variance and standard deviation
+        let variance = daily_eqs_mins_pct_change
+            .iter()
+            .map(|&x| (x - adg).powi(2))
+            .sum::<f64>()
+            / daily_eqs_mins_pct_change.len() as f64;
+        let std_dev = variance.sqrt();
+        analysis.sharpe_ratio = if std_dev != 0.0 { adg / std_dev } else { 0.0 };
+    }
 
-    // Calculate Omega Ratio (threshold = 0)
-    let (gains_sum, losses_sum) =
-        daily_eqs_pct_change
+    if flags.sortino_ratio {
+        // Calculate Sortino Ratio (using downside deviation)
+        let (downside_sum_sq, downside_count) = daily_eqs_mins_pct_change
             .iter()
-            .fold((0.0, 0.0), |(gains, losses), &ret| {
-                if ret >= 0.0 {
-                    (gains + ret, losses)
-                } else {
-                    (gains, losses + ret.abs())
-                }
+            .filter(|&&x| x < 0.0)
+            .fold((0.0, 0usize), |(sum, count), &x| {
+                (sum + x.powi(2), count + 1)
             });
-    let omega_ratio = if losses_sum != 0.0 {
-        gains_sum / losses_sum
-    } else {
-        f64::INFINITY
-    };
+        let downside_deviation = if downside_count > 0 {
+            (downside_sum_sq / downside_count as f64).sqrt()
+        } else {
+            0.0
+        };
+        analysis.sortino_ratio = if downside_deviation != 0.0 {
+            adg / downside_deviation
+        } else {
+            0.0
+        };
+    }
+
+    if flags.omega_ratio {
+        // Calculate Omega Ratio (threshold = 0)
+        let (gains_sum, losses_sum) =
+            daily_eqs_pct_change
+                .iter()
+                .fold((0.0, 0.0), |(gains, losses), &ret| {
+                    if ret >= 0.0 {
+                        (gains + ret, losses)
+                    } else {
+                        (gains, losses + ret.abs())
+                    }
+                });
+        analysis.omega_ratio = if losses_sum != 0.0 {
+            gains_sum / losses_sum
+        } else {
+            f64::INFINITY
+        };
+    }
 
-    // Calculate Expected Shortfall (99%)
-    let expected_shortfall_1pct = {
+    if flags.expected_shortfall_1pct {
+        // Calculate Expected Shortfall (99%)
         let mut sorted_returns = daily_eqs_mins_pct_change.clone();
-        sorted_returns.sort_by(|a, b| {
-            a.partial_cmp(b).unwrap_or_else(|| {
-                if a.is_nan() && b.is_nan() {
-                    Ordering::Equal
-                } else if a.is_nan() {
-                    Ordering::Greater
-                } else {
-                    Ordering::Less
-                }
-            })
-        });
+        sorted_returns.sort_by(cmp_nan_last);
         let cutoff_index = (daily_eqs_mins_pct_change.len() as f64 * 0.01) as usize;
-        if cutoff_index > 0 {
+        analysis.expected_shortfall_1pct = if cutoff_index > 0 {
             sorted_returns[..cutoff_index]
                 .iter()
                 .map(|x| x.abs())
@@ -1762,110 +1751,135 @@ fn analyze_backtest_basic(fills: &[Fill], equities: &Vec<f64>) -> Analysis {
                 / cutoff_index as f64
         } else {
             sorted_returns[0].abs()
+        };
+    }
+
+    if flags.drawdown_worst || flags.drawdown_worst_mean_1pct {
+        // Calculate drawdowns
+        let drawdowns = calc_drawdowns(&daily_eqs_mins);
+        if flags.drawdown_worst_mean_1pct {
+            let mut sorted_drawdowns = drawdowns.clone();
+            sorted_drawdowns.sort_by(cmp_nan_last);
+            let cutoff_index = std::cmp::max(1, (sorted_drawdowns.len() as f64 * 0.01) as usize);
+            let worst_n = std::cmp::min(cutoff_index, sorted_drawdowns.len());
+            let drawdown_worst_mean_1pct = sorted_drawdowns[..worst_n]
+                .iter()
+                .map(|x| x.abs())
+                .sum::<f64>()
+                / worst_n as f64;
+            analysis.drawdown_worst_mean_1pct = drawdown_worst_mean_1pct;
+            // Calculate Sterling Ratio (using average of worst 1% drawdowns)
+            analysis.sterling_ratio = if drawdown_worst_mean_1pct != 0.0 {
+                adg / drawdown_worst_mean_1pct
+            } else {
+                0.0
+            };
         }
-    };
+        if flags.drawdown_worst {
+            let drawdown_worst = drawdowns
+                .iter()
+                .fold(f64::NEG_INFINITY, |a, &b| f64::max(a, b.abs()));
+            analysis.drawdown_worst = drawdown_worst;
+            analysis.calmar_ratio = if drawdown_worst != 0.0 {
+                adg / drawdown_worst
+            } else {
+                0.0
+            };
+        }
+    }
 
-    // Calculate drawdowns
-    let drawdowns = calc_drawdowns(&daily_eqs_mins);
-    let drawdown_worst_mean_1pct = {
-        let mut sorted_drawdowns = drawdowns.clone();
-        sorted_drawdowns.sort_by(|a, b| {
-            a.partial_cmp(b).unwrap_or_else(|| {
-                if a.is_nan() && b.is_nan() {
-                    Ordering::Equal
-                } else if a.is_nan() {
-                    Ordering::Greater
+    if flags.equity_balance_diffs {
+        // Calculate equity-balance differences with separate positive and negative tracking
+        let mut fill_iter = fills.iter().peekable();
+        let mut last_balance = fills[0].balance_usd_total;
+        let (mut pos_sum, mut pos_max, mut pos_count) = (0.0, 0.0, 0usize);
+        let (mut neg_sum, mut neg_max, mut neg_count) = (0.0, 0.0, 0usize);
+
+        for (i, &equity) in equities.iter().enumerate() {
+            while let Some(fill) = fill_iter.peek() {
+                if fill.index <= i {
+                    last_balance = fill.balance_usd_total;
+                    fill_iter.next();
                 } else {
-                    Ordering::Less
+                    break;
                 }
-            })
-        });
-        let cutoff_index = std::cmp::max(1, (sorted_drawdowns.len() as f64 * 0.01) as usize);
-        let worst_n = std::cmp::min(cutoff_index, sorted_drawdowns.len());
-        sorted_drawdowns[..worst_n]
-            .iter()
-            .map(|x| x.abs())
-            .sum::<f64>()
-            / worst_n as f64
-    };
-    let drawdown_worst = drawdowns
-        .iter()
-        .fold(f64::NEG_INFINITY, |a, &b| f64::max(a, b.abs()));
+            }
+            let ebd = (equity - last_balance) / last_balance;
+            if ebd > 0.0 {
+                pos_sum += ebd;
+                pos_max = f64::max(pos_max, ebd);
+                pos_count += 1;
+            } else if ebd < 0.0 {
+                neg_sum += ebd.abs();
+                neg_max = f64::max(neg_max, ebd.abs());
+                neg_count += 1;
+            }
+        }
 
-    // Calculate Sterling Ratio (using average of worst 1% drawdowns)
-    let sterling_ratio = {
-        if drawdown_worst_mean_1pct != 0.0 {
-            adg / drawdown_worst_mean_1pct
+        analysis.equity_balance_diff_pos_max = pos_max;
+        analysis.equity_balance_diff_pos_mean = if pos_count > 0 {
+            pos_sum / pos_count as f64
         } else {
             0.0
-        }
-    };
-
-    let calmar_ratio = if drawdown_worst != 0.0 {
-        adg / drawdown_worst
-    } else {
-        0.0
-    };
-
-    // Calculate equity-balance differences
-    let mut bal_eq = Vec::with_capacity(equities.len());
-    let mut fill_iter = fills.iter().peekable();
-    let mut last_balance = fills[0].balance_usd_total;
+        };
+        analysis.equity_balance_diff_neg_max = neg_max;
+        analysis.equity_balance_diff_neg_mean = if neg_count > 0 {
+            neg_sum / neg_count as f64
+        } else {
+            0.0
+        };
+    }
 
-    for (i, &equity) in equities.iter().enumerate() {
-        while let Some(fill) = fill_iter.peek() {
-            if fill.index <= i {
-                last_balance = fill.balance_usd_total;
-                fill_iter.next();
+    if flags.loss_profit_ratio {
+        // Calculate profit factor
+        let (total_profit, total_loss) = fills.iter().fold((0.0, 0.0), |(profit, loss), fill| {
+            if fill.pnl > 0.0 {
+                (profit + fill.pnl, loss)
             } else {
-                break;
+                (profit, loss + fill.pnl.abs())
             }
-        }
-        bal_eq.push((last_balance, equity));
+        });
+        analysis.loss_profit_ratio = if total_profit == 0.0 {
+            f64::INFINITY
+        } else {
+            total_loss / total_profit
+        };
     }
 
-    // Calculate equity-balance differences with separate positive and negative tracking
-    let mut ebds_pos = Vec::new();
-    let mut ebds_neg = Vec::new();
-
-    for &(balance, equity) in bal_eq.iter() {
-        let ebd = (equity - balance) / balance;
-        if ebd > 0.0 {
-            ebds_pos.push(ebd);
-        } else if ebd < 0.0 {
-            ebds_neg.push(ebd);
-        }
+    if flags.positions {
+        analyze_positions(fills, equities.len(), &mut analysis);
+    }
+    if flags.equity_choppiness {
+        analysis.equity_choppiness = calc_equity_choppiness(&daily_eqs);
+    }
+    if flags.equity_jerkiness {
+        analysis.equity_jerkiness = calc_equity_jerkiness(&daily_eqs);
+    }
+    if flags.exponential_fit_error {
+        analysis.exponential_fit_error = calc_exponential_fit_error(&daily_eqs);
+    }
+    if flags.volume_pct_per_day_avg {
+        analysis.volume_pct_per_day_avg = calc_avg_volume_pct_per_day(fills);
     }
 
-    let equity_balance_diff_pos_max = ebds_pos.iter().fold(0.0, |max, &x| f64::max(max, x));
-    let equity_balance_diff_pos_mean = if !ebds_pos.is_empty() {
-        ebds_pos.iter().sum::<f64>() / ebds_pos.len() as f64
-    } else {
-        0.0
-    };
-
-    let equity_balance_diff_neg_max = ebds_neg.iter().fold(0.0, |max, &x| f64::max(max, x.abs()));
-    let equity_balance_diff_neg_mean = if !ebds_neg.is_empty() {
-        ebds_neg.iter().map(|x| x.abs()).sum::<f64>() / ebds_neg.len() as f64
-    } else {
-        0.0
-    };
+    analysis
+}
 
-    // Calculate profit factor
-    let (total_profit, total_loss) = fills.iter().fold((0.0, 0.0), |(profit, loss), fill| {
-        if fill.pnl > 0.0 {
-            (profit + fill.pnl, loss)
+/// Sort comparator placing NaNs last.
+fn cmp_nan_last(a: &f64, b: &f64) -> Ordering {
+    a.partial_cmp(b).unwrap_or_else(|| {
+        if a.is_nan() && b.is_nan() {
+            Ordering::Equal
+        } else if a.is_nan() {
+            Ordering::Greater
         } else {
-            (profit, loss + fill.pnl.abs())
+            Ordering::Less
         }
-    });
-    let loss_profit_ratio = if total_profit == 0.0 {
-        f64::INFINITY
-    } else {
-        total_loss / total_profit
-    };
+    })
+}
 
-    // Calculate position durations and position_unchanged_hours_max
+/// Calculates position durations and position_unchanged_hours_max
+fn analyze_positions(fills: &[Fill], n_minutes: usize, analysis: &mut Analysis) {
     let mut positions_opened: HashMap<String, usize> = HashMap::new(); // Tracks position open time
     let mut durations: Vec<usize> = Vec::new(); // Total position durations
     let mut last_fill_time: HashMap<String, usize> = HashMap::new(); // Last fill time per position
@@ -1913,22 +1927,22 @@ fn analyze_backtest_basic(fills: &[Fill], equities: &Vec<f64>) -> Analysis {
     }
 
     // Calculate duration statistics
-    let n_days = (equities.len() as f64) / 1440.0; // Convert minutes to days
-    let positions_held_per_day = durations.len() as f64 / n_days;
+    let n_days = (n_minutes as f64) / 1440.0; // Convert minutes to days
+    analysis.positions_held_per_day = durations.len() as f64 / n_days;
 
-    let position_held_hours_mean = if !durations.is_empty() {
+    analysis.position_held_hours_mean = if !durations.is_empty() {
         durations.iter().sum::<usize>() as f64 / (durations.len() as f64 * 60.0)
     } else {
         0.0
     };
 
-    let position_held_hours_max = if !durations.is_empty() {
+    analysis.position_held_hours_max = if !durations.is_empty() {
         *durations.iter().max().unwrap() as f64 / 60.0
     } else {
         0.0
     };
 
-    let position_held_hours_median = if !durations.is_empty() {
+    analysis.position_held_hours_median = if !durations.is_empty() {
         let mut sorted_durations = durations.clone();
         sorted_durations.sort_unstable();
         let mid = sorted_durations.len() / 2;
@@ -1941,51 +1955,17 @@ fn analyze_backtest_basic(fills: &[Fill], equities: &Vec<f64>) -> Analysis {
         0.0
     };
 
-    let position_unchanged_hours_max = if !unchanged_durations.is_empty() {
+    analysis.position_unchanged_hours_max = if !unchanged_durations.is_empty() {
         *unchanged_durations.iter().max().unwrap() as f64 / 60.0
     } else {
         0.0
     };
-    let equity_choppiness = calc_equity_choppiness(&daily_eqs);
-    let equity_jerkiness = calc_equity_jerkiness(&daily_eqs);
-    let exponential_fit_error = calc_exponential_fit_error(&daily_eqs);
-
-    let volume_pct_per_day_avg = calc_avg_volume_pct_per_day(fills);
-
-    let mut analysis = Analysis::default();
-    analysis.adg = adg;
-    analysis.mdg = mdg;
-    analysis.gain = gain;
-    analysis.sharpe_ratio = sharpe_ratio;
-    analysis.sortino_ratio = sortino_ratio;
-    analysis.omega_ratio = omega_ratio;
-    analysis.expected_shortfall_1pct = expected_shortfall_1pct;
-    analysis.calmar_ratio = calmar_ratio;
-    analysis.sterling_ratio = sterling_ratio;
-    analysis.drawdown_worst = drawdown_worst;
-    analysis.drawdown_worst_mean_1pct = drawdown_worst_mean_1pct;
-    analysis.equity_balance_diff_neg_max = equity_balance_diff_neg_max;
-    analysis.equity_balance_diff_neg_mean = equity_balance_diff_neg_mean;
-    analysis.equity_balance_diff_pos_max = equity_balance_diff_pos_max;
-    analysis.equity_balance_diff_pos_mean = equity_balance_diff_pos_mean;
-    analysis.loss_profit_ratio = loss_profit_ratio;
-    analysis.positions_held_per_day = positions_held_per_day;
-    analysis.position_held_hours_mean = position_held_hours_mean;
-    analysis.position_held_hours_max = position_held_hours_max;
-    analysis.position_held_hours_median = position_held_hours_median;
-    analysis.position_unchanged_hours_max = position_unchanged_hours_max;
-    analysis.equity_choppiness = equity_choppiness;
-    analysis.equity_jerkiness = equity_jerkiness;
-    analysis.exponential_fit_error = exponential_fit_error;
-    analysis.volume_pct_per_day_avg = volume_pct_per_day_avg;
-
-    analysis
 }
 
-pub fn analyze_backtest(fills: &[Fill], equities: &Vec<f64>) -> Analysis {
-    let mut analysis = analyze_backtest_basic(fills, equities);
+pub fn analyze_backtest(fills: &[Fill], equities: &[f64], request: &MetricsRequest) -> Analysis {
+    let mut analysis = analyze_backtest_basic(fills, equities, &request.basic);
 
-    if fills.len() <= 1 {
+    if fills.len() <= 1 || !request.compute_weighted {
         return analysis;
     }
 
@@ -2010,17 +1990,14 @@ pub fn analyze_backtest(fills: &[Fill], equities: &Vec<f64>) -> Analysis {
             break;
         }
 
-        // filter fills that happened after or at start_idx
-        let subset_fills: Vec<Fill> = fills
-            .iter()
-            .filter(|fill| fill.index >= start_idx)
-            .cloned()
-            .collect();
+        // fills are in chronological order; keep those that happened after or at start_idx
+        let subset_fills = &fills[fills.partition_point(|fill| fill.index < start_idx)..];
         if subset_fills.len() == 0 {
             break;
         }
 
-        let subset_analysis = analyze_backtest_basic(&subset_fills, &subset_equities.to_vec());
+        let subset_analysis =
+            analyze_backtest_basic(subset_fills, subset_equities, &request.weighted);
         subset_analyses.push(subset_analysis);
     }
 
@@ -2070,8 +2047,9 @@ pub fn analyze_backtest_pair(
     fills: &[Fill],
     equities: &Equities,
     use_btc_collateral: bool,
+    request: &MetricsRequest,
 ) -> (Analysis, Analysis) {
-    let analysis_usd = analyze_backtest(fills, &equities.usd);
+    let analysis_usd = analyze_backtest(fills, &equities.usd, request);
     if !use_btc_collateral {
         return (analysis_usd.clone(), analysis_usd);
     }
@@ -2080,7 +2058,7 @@ pub fn analyze_backtest_pair(
         fill.balance_usd_total /= fill.btc_price; // Use actual BTC balance if available
         fill.pnl = fill.pnl / fill.btc_price; // Convert PNL to BTC
     }
-    let analysis_btc = analyze_backtest(&btc_fills, &equities.btc);
+    let analysis_btc = analyze_backtest(&btc_fills, &equities.btc, request);
     (analysis_usd, analysis_btc)
 }
 
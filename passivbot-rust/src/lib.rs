@@ -1,10 +1,10 @@
-mod backtest;
-mod closes;
-mod constants;
-mod entries;
+pub mod backtest;
+pub mod closes;
+pub mod constants;
+pub mod entries;
 mod python;
-mod types;
-mod utils;
+pub mod types;
+pub mod utils;
 
 use backtest::*;
 use closes::*;
@@ -39,6 +39,7 @@ fn passivbot_rust(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(calc_closes_long_py, m)?)?;
     m.add_function(wrap_pyfunction!(calc_closes_short_py, m)?)?;
     m.add_function(wrap_pyfunction!(run_backtest, m)?)?;
+    m.add_function(wrap_pyfunction!(bot_params_fields, m)?)?;
     m.add_function(wrap_pyfunction!(calc_auto_unstuck_allowance, m)?)?;
     m.add_function(wrap_pyfunction!(hysteresis_rounding, m)?)?;
     m.add_function(wrap_pyfunction!(calc_pprice_diff_int, m)?)?;
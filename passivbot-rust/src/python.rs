@@ -6,14 +6,14 @@ use crate::entries::{
     calc_entries_long, calc_entries_short, calc_next_entry_long, calc_next_entry_short,
 };
 use crate::types::{
-    Analysis, BacktestParams, BotParams, BotParamsPair, EMABands, Equities, ExchangeParams, Order,
-    OrderBook, Position, StateParams, TrailingPriceBundle,
+    Analysis, BacktestParams, BotParams, BotParamsPair, EMABands, Equities, ExchangeParams,
+    MetricsRequest, Order, OrderBook, Position, StateParams, TrailingPriceBundle,
 };
 use memmap::MmapOptions;
 use ndarray::{Array1, Array2, Array3, Array4, ArrayBase, ArrayD, ArrayView, ShapeBuilder};
 use numpy::{
-    IntoPyArray, PyArray1, PyArray2, PyArray3, PyArray4, PyReadonlyArray2, PyReadonlyArray3,
-    PyReadonlyArray4,
+    IntoPyArray, PyArray1, PyArray2, PyArray3, PyArray4, PyReadonlyArray1, PyReadonlyArray2,
+    PyReadonlyArray3, PyReadonlyArray4,
 };
 use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
@@ -23,15 +23,29 @@ use serde::Serialize;
 use std::{fs::File, slice};
 
 #[pyfunction]
+#[pyo3(signature = (
+    shared_memory_file,
+    hlcvs_shape,
+    hlcvs_dtype,
+    btc_usd_shared_memory_file,
+    btc_usd_dtype,
+    bot_params_pair_dict,
+    exchange_params_list,
+    backtest_params_dict,
+    hlcvs_offset=0,
+    btc_usd_offset=0
+))]
 pub fn run_backtest(
     shared_memory_file: &str,           // Existing HLCV shared memory file
     hlcvs_shape: (usize, usize, usize), // Shape of HLCV data
     hlcvs_dtype: &str,                  // Dtype of HLCV data
     btc_usd_shared_memory_file: &str,   // New BTC/USD shared memory file
     btc_usd_dtype: &str,                // Dtype of BTC/USD data
-    bot_params_pair_dict: &PyDict,      // Bot parameters
+    bot_params_pair_dict: &PyAny,       // Bot parameters (dict or flat array)
     exchange_params_list: &PyAny,       // Exchange parameters
     backtest_params_dict: &PyDict,      // Backtest parameters
+    hlcvs_offset: u64,                  // Byte offset of the HLCV data, e.g. past a .npy header
+    btc_usd_offset: u64,                // Byte offset of the BTC/USD data
 ) -> PyResult<(
     Py<PyArray2<PyObject>>,
     Py<PyArray1<f64>>,
@@ -44,9 +58,19 @@ pub fn run_backtest(
         .map_err(|e| PyValueError::new_err(format!("Unable to open shared memory file: {}", e)))?;
     let mmap = unsafe {
         MmapOptions::new()
+            .offset(hlcvs_offset)
             .map(&file)
             .map_err(|e| PyValueError::new_err(format!("Unable to map HLCV file: {}", e)))?
     };
+    let hlcvs_len = hlcvs_shape.0 * hlcvs_shape.1 * hlcvs_shape.2;
+    if mmap.len() < hlcvs_len * std::mem::size_of::<f64>() {
+        return Err(PyValueError::new_err(format!(
+            "HLCV file holds {} bytes past offset {}, expected {}",
+            mmap.len(),
+            hlcvs_offset,
+            hlcvs_len * std::mem::size_of::<f64>()
+        )));
+    }
     let hlcvs_rust = unsafe {
         match hlcvs_dtype {
             "<f8" => ArrayView::from_shape_ptr(hlcvs_shape, mmap.as_ptr() as *const f64),
@@ -60,10 +84,19 @@ pub fn run_backtest(
     })?;
     let btc_usd_mmap = unsafe {
         MmapOptions::new()
+            .offset(btc_usd_offset)
             .map(&btc_usd_file)
             .map_err(|e| PyValueError::new_err(format!("Unable to map BTC/USD file: {}", e)))?
     };
     let n_timesteps = hlcvs_shape.0; // Number of timesteps from HLCV shape
+    if btc_usd_mmap.len() < n_timesteps * std::mem::size_of::<f64>() {
+        return Err(PyValueError::new_err(format!(
+            "BTC/USD file holds {} bytes past offset {}, expected {}",
+            btc_usd_mmap.len(),
+            btc_usd_offset,
+            n_timesteps * std::mem::size_of::<f64>()
+        )));
+    }
     let btc_usd_rust = unsafe {
         match btc_usd_dtype {
             "<f8" => ArrayView::from_shape_ptr((n_timesteps,), btc_usd_mmap.as_ptr() as *const f64),
@@ -81,7 +114,12 @@ pub fn run_backtest(
     }
 
     // Prepare bot, exchange, and backtest parameters
-    let bot_params_pair = bot_params_pair_from_dict(bot_params_pair_dict)?;
+    let bot_params_pair = if let Ok(dict) = bot_params_pair_dict.downcast::<PyDict>() {
+        bot_params_pair_from_dict(dict)?
+    } else {
+        let values: PyReadonlyArray1<f64> = bot_params_pair_dict.extract()?;
+        bot_params_pair_from_slice(values.as_slice()?)?
+    };
     let exchange_params = {
         let mut params_vec = Vec::new();
         if let Ok(py_list) = exchange_params_list.downcast::<PyList>() {
@@ -104,6 +142,10 @@ pub fn run_backtest(
     };
 
     let backtest_params = backtest_params_from_dict(backtest_params_dict)?;
+    let metrics_request = match &backtest_params.metrics {
+        Some(names) => MetricsRequest::from_names(names),
+        None => MetricsRequest::all(),
+    };
     let mut backtest = Backtest::new(
         &hlcvs_rust,
         &btc_usd_rust,
@@ -115,12 +157,21 @@ pub fn run_backtest(
     // Run the backtest and process results
     Python::with_gil(|py| {
         let (fills, equities) = backtest.run();
-        let (analysis_usd, analysis_btc) =
-            analyze_backtest_pair(&fills, &equities, backtest.balance.use_btc_collateral);
+        let (analysis_usd, analysis_btc) = analyze_backtest_pair(
+            &fills,
+            &equities,
+            backtest.balance.use_btc_collateral,
+            &metrics_request,
+        );
 
         // Create a dictionary to store analysis results using a more concise approach
         let py_analysis_usd = struct_to_py_dict(py, &analysis_usd)?;
         let py_analysis_btc = struct_to_py_dict(py, &analysis_btc)?;
+        if let Some(names) = &metrics_request.names {
+            // drop metrics which were not requested and hence not computed
+            retain_py_dict_keys(py_analysis_usd, names)?;
+            retain_py_dict_keys(py_analysis_btc, names)?;
+        }
         let mut py_fills = Array2::from_elem((fills.len(), 13), py.None());
         for (i, fill) in fills.iter().enumerate() {
             py_fills[(i, 0)] = fill.index.into_py(py);
@@ -169,11 +220,22 @@ fn struct_to_py_dict<'py, T: Serialize + ?Sized>(
     })
 }
 
+fn retain_py_dict_keys(dict: &PyDict, keys: &[String]) -> PyResult<()> {
+    for key in dict.keys().iter() {
+        let key_str: String = key.extract()?;
+        if !keys.contains(&key_str) {
+            dict.del_item(key)?;
+        }
+    }
+    Ok(())
+}
+
 fn backtest_params_from_dict(dict: &PyDict) -> PyResult<BacktestParams> {
     Ok(BacktestParams {
         starting_balance: extract_value(dict, "starting_balance").unwrap_or_default(),
         maker_fee: extract_value(dict, "maker_fee").unwrap_or_default(),
         coins: extract_value(dict, "coins").unwrap_or_default(),
+        metrics: extract_value(dict, "metrics").ok(),
     })
 }
 
@@ -187,6 +249,95 @@ fn exchange_params_from_dict(dict: &PyDict) -> PyResult<ExchangeParams> {
     })
 }
 
+/// Order of the BotParams fields in the flat bot params array accepted by run_backtest:
+/// all fields of long, then all fields of short. Bools and integers are passed as floats.
+const BOT_PARAMS_FIELDS: [&str; 29] = [
+    "close_grid_markup_end",
+    "close_grid_markup_start",
+    "close_grid_qty_pct",
+    "close_trailing_retracement_pct",
+    "close_trailing_grid_ratio",
+    "close_trailing_qty_pct",
+    "close_trailing_threshold_pct",
+    "enforce_exposure_limit",
+    "entry_grid_double_down_factor",
+    "entry_grid_spacing_weight",
+    "entry_grid_spacing_pct",
+    "entry_initial_ema_dist",
+    "entry_initial_qty_pct",
+    "entry_trailing_double_down_factor",
+    "entry_trailing_retracement_pct",
+    "entry_trailing_grid_ratio",
+    "entry_trailing_threshold_pct",
+    "filter_noisiness_rolling_window",
+    "filter_volume_rolling_window",
+    "filter_volume_drop_pct",
+    "ema_span_0",
+    "ema_span_1",
+    "n_positions",
+    "total_wallet_exposure_limit",
+    "wallet_exposure_limit",
+    "unstuck_close_pct",
+    "unstuck_ema_dist",
+    "unstuck_loss_allowance_pct",
+    "unstuck_threshold",
+];
+
+#[pyfunction]
+pub fn bot_params_fields() -> Vec<&'static str> {
+    BOT_PARAMS_FIELDS.to_vec()
+}
+
+fn bot_params_pair_from_slice(values: &[f64]) -> PyResult<BotParamsPair> {
+    let n = BOT_PARAMS_FIELDS.len();
+    if values.len() != 2 * n {
+        return Err(PyValueError::new_err(format!(
+            "bot params array has {} values, expected {}",
+            values.len(),
+            2 * n
+        )));
+    }
+    Ok(BotParamsPair {
+        long: bot_params_from_slice(&values[..n]),
+        short: bot_params_from_slice(&values[n..]),
+    })
+}
+
+fn bot_params_from_slice(v: &[f64]) -> BotParams {
+    // indices follow BOT_PARAMS_FIELDS
+    BotParams {
+        close_grid_markup_end: v[0],
+        close_grid_markup_start: v[1],
+        close_grid_qty_pct: v[2],
+        close_trailing_retracement_pct: v[3],
+        close_trailing_grid_ratio: v[4],
+        close_trailing_qty_pct: v[5],
+        close_trailing_threshold_pct: v[6],
+        enforce_exposure_limit: v[7] != 0.0,
+        entry_grid_double_down_factor: v[8],
+        entry_grid_spacing_weight: v[9],
+        entry_grid_spacing_pct: v[10],
+        entry_initial_ema_dist: v[11],
+        entry_initial_qty_pct: v[12],
+        entry_trailing_double_down_factor: v[13],
+        entry_trailing_retracement_pct: v[14],
+        entry_trailing_grid_ratio: v[15],
+        entry_trailing_threshold_pct: v[16],
+        filter_noisiness_rolling_window: v[17].round() as usize,
+        filter_volume_rolling_window: v[18].round() as usize,
+        filter_volume_drop_pct: v[19],
+        ema_span_0: v[20],
+        ema_span_1: v[21],
+        n_positions: v[22].round() as usize,
+        total_wallet_exposure_limit: v[23],
+        wallet_exposure_limit: v[24],
+        unstuck_close_pct: v[25],
+        unstuck_ema_dist: v[26],
+        unstuck_loss_allowance_pct: v[27],
+        unstuck_threshold: v[28],
+    }
+}
+
 fn bot_params_pair_from_dict(dict: &PyDict) -> PyResult<BotParamsPair> {
     Ok(BotParamsPair {
         long: bot_params_from_dict(extract_value(dict, "long")?)?,
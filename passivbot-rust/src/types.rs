@@ -28,6 +28,7 @@ pub struct BacktestParams {
     pub starting_balance: f64,
     pub maker_fee: f64,
     pub coins: Vec<String>,
+    pub metrics: Option<Vec<String>>, // None means compute all metrics
 }
 
 #[derive(Default, Debug, Clone, Copy)]
@@ -326,3 +327,143 @@ impl Default for Analysis {
         }
     }
 }
+
+/// Groups of metrics computed by `analyze_backtest`.
+/// Metrics belonging to a disabled group keep their `Analysis::default()` value.
+/// adg and gain are always computed, as most other metrics depend on them.
+#[derive(Clone, Copy, Debug, Default)]
+pub struct MetricFlags {
+    pub mdg: bool,
+    pub sharpe_ratio: bool,
+    pub sortino_ratio: bool,
+    pub omega_ratio: bool,
+    pub expected_shortfall_1pct: bool,
+    pub drawdown_worst: bool,
+    pub drawdown_worst_mean_1pct: bool,
+    pub equity_balance_diffs: bool,
+    pub loss_profit_ratio: bool,
+    pub positions: bool,
+    pub equity_choppiness: bool,
+    pub equity_jerkiness: bool,
+    pub exponential_fit_error: bool,
+    pub volume_pct_per_day_avg: bool,
+}
+
+impl MetricFlags {
+    pub fn all() -> Self {
+        MetricFlags {
+            mdg: true,
+            sharpe_ratio: true,
+            sortino_ratio: true,
+            omega_ratio: true,
+            expected_shortfall_1pct: true,
+            drawdown_worst: true,
+            drawdown_worst_mean_1pct: true,
+            equity_balance_diffs: true,
+            loss_profit_ratio: true,
+            positions: true,
+            equity_choppiness: true,
+            equity_jerkiness: true,
+            exponential_fit_error: true,
+            volume_pct_per_day_avg: true,
+        }
+    }
+
+    /// Enables the group computing `metric`, including the groups it depends on.
+    /// Returns false if `metric` is not a field of `Analysis`.
+    pub fn enable(&mut self, metric: &str) -> bool {
+        match metric {
+            "adg" | "gain" => {}
+            "mdg" => self.mdg = true,
+            "sharpe_ratio" => self.sharpe_ratio = true,
+            "sortino_ratio" => self.sortino_ratio = true,
+            "omega_ratio" => self.omega_ratio = true,
+            "expected_shortfall_1pct" => self.expected_shortfall_1pct = true,
+            "drawdown_worst" | "calmar_ratio" => self.drawdown_worst = true,
+            "drawdown_worst_mean_1pct" | "sterling_ratio" => self.drawdown_worst_mean_1pct = true,
+            "equity_balance_diff_neg_max"
+            | "equity_balance_diff_neg_mean"
+            | "equity_balance_diff_pos_max"
+            | "equity_balance_diff_pos_mean" => self.equity_balance_diffs = true,
+            "loss_profit_ratio" => self.loss_profit_ratio = true,
+            "positions_held_per_day"
+            | "position_held_hours_mean"
+            | "position_held_hours_max"
+            | "position_held_hours_median"
+            | "position_unchanged_hours_max" => self.positions = true,
+            "equity_choppiness" => self.equity_choppiness = true,
+            "equity_jerkiness" => self.equity_jerkiness = true,
+            "exponential_fit_error" => self.exponential_fit_error = true,
+            "volume_pct_per_day_avg" => self.volume_pct_per_day_avg = true,
+            _ => return false,
+        }
+        true
+    }
+
+    pub fn union(&self, other: &MetricFlags) -> MetricFlags {
+        MetricFlags {
+            mdg: self.mdg || other.mdg,
+            sharpe_ratio: self.sharpe_ratio || other.sharpe_ratio,
+            sortino_ratio: self.sortino_ratio || other.sortino_ratio,
+            omega_ratio: self.omega_ratio || other.omega_ratio,
+            expected_shortfall_1pct: self.expected_shortfall_1pct || other.expected_shortfall_1pct,
+            drawdown_worst: self.drawdown_worst || other.drawdown_worst,
+            drawdown_worst_mean_1pct: self.drawdown_worst_mean_1pct
+                || other.drawdown_worst_mean_1pct,
+            equity_balance_diffs: self.equity_balance_diffs || other.equity_balance_diffs,
+            loss_profit_ratio: self.loss_profit_ratio || other.loss_profit_ratio,
+            positions: self.positions || other.positions,
+            equity_choppiness: self.equity_choppiness || other.equity_choppiness,
+            equity_jerkiness: self.equity_jerkiness || other.equity_jerkiness,
+            exponential_fit_error: self.exponential_fit_error || other.exponential_fit_error,
+            volume_pct_per_day_avg: self.volume_pct_per_day_avg || other.volume_pct_per_day_avg,
+        }
+    }
+}
+
+/// Metrics requested from `analyze_backtest`.
+/// `basic` applies to the whole backtest, `weighted` to the temporal subsets
+/// averaged into the `_w` metrics. `names` is None when all metrics are requested.
+#[derive(Clone, Debug)]
+pub struct MetricsRequest {
+    pub basic: MetricFlags,
+    pub weighted: MetricFlags,
+    pub compute_weighted: bool,
+    pub names: Option<Vec<String>>,
+}
+
+impl MetricsRequest {
+    pub fn all() -> Self {
+        MetricsRequest {
+            basic: MetricFlags::all(),
+            weighted: MetricFlags::all(),
+            compute_weighted: true,
+            names: None,
+        }
+    }
+
+    /// Resolves metric names (fields of `Analysis`) into metric groups.
+    /// Unknown names are ignored.
+    pub fn from_names(names: &[String]) -> Self {
+        let mut basic = MetricFlags::default();
+        let mut weighted = MetricFlags::default();
+        let mut compute_weighted = false;
+        for name in names {
+            if basic.enable(name) {
+                continue;
+            }
+            if let Some(base) = name.strip_suffix("_w") {
+                if weighted.enable(base) {
+                    compute_weighted = true;
+                }
+            }
+        }
+        MetricsRequest {
+            // the whole-range analysis is also the first of the weighted subsets
+            basic: basic.union(&weighted),
+            weighted,
+            compute_weighted,
+            names: Some(names.to_vec()),
+        }
+    }
+}
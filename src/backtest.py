@@ -39,8 +39,11 @@ from main import manage_rust_compilation
 import gzip
 import traceback
 
+import mmap
 import tempfile
 from contextlib import contextmanager
+from shared_datasets import get_registry
+from memory_budget import check_shared_memory_budget
 
 logging.basicConfig(
     format="%(asctime)s %(levelname)-8s %(message)s",
@@ -49,14 +52,61 @@ logging.basicConfig(
 )
 
 
+def get_shared_memory_dir():
+    """/dev/shm where available, so shared memory files live in RAM, else the temp dir."""
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def get_mapped_file_offset(array: np.ndarray):
+    """
+    (filename, offset) of the data of an array memory-mapped from a file in full, such as
+    np.load("hlcvs.npy", mmap_mode="r"), or None if the array is in RAM or a view.
+    """
+    if (
+        isinstance(array, np.memmap)
+        and isinstance(array.base, mmap.mmap)
+        and array.filename is not None
+        and array.flags.c_contiguous
+    ):
+        return array.filename, array.offset
+    return None
+
+
+def shared_memory_bytes_needed(array: np.ndarray, key=None) -> int:
+    """Bytes create_shared_memory_file(array, key) writes: none if mapped in place or shared."""
+    if get_mapped_file_offset(array) is not None:
+        return 0
+    if key is not None:
+        path = get_registry().segment_path(key)
+        if os.path.exists(path) and os.path.getsize(path) == array.nbytes:
+            return 0
+    return array.nbytes
+
+
 @contextmanager
-def create_shared_memory_file(array: np.ndarray):
-    with tempfile.NamedTemporaryFile(delete=False) as f:
+def create_shared_memory_file(array: np.ndarray, key=None):
+    """
+    Yields (filepath, offset) of a file holding array's data. Arrays mapped from the hlcvs
+    cache are used in place; others go to the shared dataset named key, shared with other
+    runs, or without a key to a private shared memory file, deleted on exit.
+    """
+    mapped = get_mapped_file_offset(array)
+    if mapped is not None:
+        yield mapped
+        return
+    if key is not None:
+        registry = get_registry()
+        try:
+            yield registry.attach(key, array), 0
+        finally:
+            registry.detach(key)
+        return
+    with tempfile.NamedTemporaryFile(dir=get_shared_memory_dir(), delete=False) as f:
         filepath = f.name
-        array.tofile(f)
+        array.tofile(f)  # writes straight from the array's buffer
 
     try:
-        yield filepath
+        yield filepath, 0
     finally:
         # Ensure file is closed before deleting
         try:
@@ -179,6 +229,15 @@ def get_cache_hash(config, exchange):
     return calc_hash(to_hash)
 
 
+def get_shared_dataset_keys(config, exchange):
+    """Shared dataset registry keys of the hlcvs and BTC/USD prices; None: not shared."""
+    cache_hash = get_cache_hash(config, exchange)[:16]
+    btc_usd_key = (
+        f"btc_usd_{cache_hash}" if config["backtest"].get("use_btc_collateral", False) else None
+    )
+    return f"hlcvs_{cache_hash}", btc_usd_key
+
+
 def load_coins_hlcvs_from_cache(config, exchange):
     cache_hash = get_cache_hash(config, exchange)
     cache_dir = Path("caches") / "hlcvs_data" / cache_hash[:16]
@@ -204,13 +263,14 @@ def load_coins_hlcvs_from_cache(config, exchange):
         else:
             fname = cache_dir / "hlcvs.npy"
             logging.info(f"{exchange} Attempting to load hlcvs data from cache {fname}...")
-            hlcvs = np.load(fname)
+            # mapped rather than read: the data is passed to Rust by file and offset
+            hlcvs = np.load(fname, mmap_mode="r")
             btc_fname = cache_dir / "btc_usd_prices.npy"
             if os.path.exists(btc_fname):
                 logging.info(
                     f"{exchange} Attempting to load BTC/USD prices from cache {btc_fname}..."
                 )
-                btc_usd_prices = np.load(btc_fname)
+                btc_usd_prices = np.load(btc_fname, mmap_mode="r")
             else:
                 # Backward compatibility: default to 1.0s if not cached
                 logging.info(f"{exchange} No BTC/USD prices in cache, using default array of 1.0s")
@@ -317,7 +377,8 @@ def prep_backtest_args(config, mss, exchange, exchange_params=None, backtest_par
 
 
 def expand_analysis(analysis_usd, analysis_btc, fills, config):
-    keys = ["adg", "adg_w", "mdg", "mdg_w", "gain"]
+    # metrics may be a subset if the backtest was run with backtest_params["metrics"]
+    keys = [k for k in ["adg", "adg_w", "mdg", "mdg_w", "gain"] if k in analysis_usd]
     for pside in ["long", "short"]:
         twel = config["bot"][pside]["total_wallet_exposure_limit"]
         for key in keys:
@@ -351,9 +412,17 @@ def run_backtest(hlcvs, mss, config: dict, exchange: str, btc_usd_prices):
     sts = utc_ms()
 
     # Use context managers for both HLCV and BTC/USD shared memory files
-    with create_shared_memory_file(hlcvs) as shared_memory_file, create_shared_memory_file(
-        btc_usd_prices
-    ) as btc_usd_shared_memory_file:
+    hlcvs_key, btc_usd_key = get_shared_dataset_keys(config, exchange)
+    check_shared_memory_budget(
+        shared_memory_bytes_needed(hlcvs, hlcvs_key)
+        + shared_memory_bytes_needed(btc_usd_prices, btc_usd_key),
+        get_shared_memory_dir(),
+    )
+    with create_shared_memory_file(hlcvs, hlcvs_key) as hlcvs_file, create_shared_memory_file(
+        btc_usd_prices, btc_usd_key
+    ) as btc_usd_file:
+        shared_memory_file, hlcvs_offset = hlcvs_file
+        btc_usd_shared_memory_file, btc_usd_offset = btc_usd_file
         fills, equities_usd, equities_btc, analysis_usd, analysis_btc = pbr.run_backtest(
             shared_memory_file,
             hlcvs.shape,
@@ -363,6 +432,8 @@ def run_backtest(hlcvs, mss, config: dict, exchange: str, btc_usd_prices):
             bot_params,
             exchange_params,
             backtest_params,
+            hlcvs_offset,
+            btc_usd_offset,
         )
 
     logging.info(f"seconds elapsed for backtest: {(utc_ms() - sts) / 1000:.4f}")
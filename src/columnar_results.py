@@ -0,0 +1,153 @@
+"""
+Columnar store of every optimizer result, an alternative to the msgpack all_results.bin.
+
+The results directory gets an ``all_results/`` directory holding:
+- schema.json: the column names, in order: parameters (as in the optimizer individual, e.g.
+  ``long_entry_grid_spacing_pct``), objectives (``w_0``, ``w_1``, ...), combined metrics
+  (``<metric>_mean``, ``_min``, ``_max``, ``_std``) and per exchange metrics
+  (``<exchange>.<metric>``).
+- chunk_<seq>.npz: compressed float64 matrix ``data`` of shape (n_rows, n_columns).
+
+The columns are fixed by the first result written. Missing metrics are stored as NaN, and
+metrics not in the schema are dropped. The last chunk is rewritten on every flush until it
+holds chunk_size rows. After that, a new chunk is started.
+
+    from columnar_results import load_columnar_results
+    cols = load_columnar_results("optimize_results/.../")
+    best = cols["adg_mean"][cols["drawdown_worst_max"] < 0.3].max()
+"""
+
+import glob
+import json
+import math
+import os
+
+import numpy as np
+
+DIRNAME = "all_results"
+SCHEMA_FILENAME = "schema.json"
+
+
+def _to_float(value) -> float:
+    return math.nan if value is None else float(value)
+
+
+def make_columns(param_names: list, analyses_combined: dict, analyses: dict) -> list:
+    w_keys = sorted(
+        (k for k in analyses_combined if k.startswith("w_")), key=lambda k: int(k[2:])
+    )
+    combined_keys = sorted(k for k in analyses_combined if not k.startswith("w_"))
+    exchange_keys = [
+        f"{exchange}.{key}" for exchange in sorted(analyses) for key in sorted(analyses[exchange])
+    ]
+    return list(param_names) + w_keys + combined_keys + exchange_keys
+
+
+class ColumnarResultsWriter:
+    def __init__(self, results_dir: str, param_names: list, chunk_size: int = 4096):
+        self.directory = os.path.join(results_dir, DIRNAME)
+        self.param_names = list(param_names)
+        self.chunk_size = chunk_size
+        os.makedirs(self.directory, exist_ok=True)
+        self.columns = None
+        self._column_index = None
+        self._rows = []
+        self._n_unflushed = 0
+        schema_path = os.path.join(self.directory, SCHEMA_FILENAME)
+        if os.path.exists(schema_path):
+            # resumed run: append to the existing store with its columns
+            with open(schema_path) as f:
+                schema = json.load(f)
+            if schema["columns"][: len(self.param_names)] != self.param_names:
+                raise ValueError(f"{self.directory} was written with different parameters")
+            self._set_columns(schema["columns"])
+        # a chunk of the previous run is never appended to, even if not full
+        self.seq = len(glob.glob(os.path.join(self.directory, "chunk_*.npz")))
+
+    def _set_columns(self, columns: list) -> None:
+        self.columns = columns
+        self._column_index = {name: i for i, name in enumerate(columns)}
+
+    def _write_schema(self) -> None:
+        schema = {
+            "columns": self.columns,
+            "n_params": len(self.param_names),
+            "dtype": "float64",
+            "chunk_size": self.chunk_size,
+        }
+        path = os.path.join(self.directory, SCHEMA_FILENAME)
+        with open(path + ".tmp", "w") as f:
+            json.dump(schema, f, indent=4)
+        os.replace(path + ".tmp", path)
+
+    def append(self, individual, analyses_combined: dict, analyses: dict) -> None:
+        """analyses_combined includes the objectives as w_0, w_1, ..."""
+        if self.columns is None:
+            self._set_columns(make_columns(self.param_names, analyses_combined, analyses))
+            self._write_schema()
+        row = np.full(len(self.columns), np.nan)
+        row[: len(self.param_names)] = individual
+        index = self._column_index
+        for key, value in analyses_combined.items():
+            if key in index:
+                row[index[key]] = _to_float(value)
+        for exchange, analysis in analyses.items():
+            for key, value in analysis.items():
+                i = index.get(f"{exchange}.{key}")
+                if i is not None:
+                    row[i] = _to_float(value)
+        self._rows.append(row)
+        self._n_unflushed += 1
+        if len(self._rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the rows of the current chunk; starts the next chunk if it is full."""
+        if not self._n_unflushed:
+            return
+        path = os.path.join(self.directory, f"chunk_{self.seq:06d}.npz")
+        with open(path + ".tmp", "wb") as f:
+            np.savez_compressed(f, data=np.vstack(self._rows))
+        os.replace(path + ".tmp", path)
+        self._n_unflushed = 0
+        if len(self._rows) >= self.chunk_size:
+            self.seq += 1
+            self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+
+
+def get_columnar_dir(path: str) -> str:
+    """all_results/ directory of path, a results directory or the all_results/ directory itself."""
+    if os.path.exists(os.path.join(path, SCHEMA_FILENAME)):
+        return path
+    return os.path.join(path, DIRNAME)
+
+
+def load_columnar_schema(path: str) -> dict:
+    with open(os.path.join(get_columnar_dir(path), SCHEMA_FILENAME)) as f:
+        return json.load(f)
+
+
+def get_chunk_paths(path: str) -> list:
+    return sorted(glob.glob(os.path.join(get_columnar_dir(path), "chunk_*.npz")))
+
+
+def load_chunk(chunk_path: str) -> np.ndarray:
+    """(n_rows, n_columns) matrix of one chunk."""
+    with np.load(chunk_path) as chunk:
+        return chunk["data"]
+
+
+def load_columnar_results(path: str) -> dict:
+    """
+    {column name: 1d float64 array} of all results in path (a results directory or its
+    all_results/ directory), in the order they were written.
+    """
+    columns = load_columnar_schema(path)["columns"]
+    chunks = [load_chunk(chunk_path) for chunk_path in get_chunk_paths(path)]
+    data = np.vstack(chunks) if chunks else np.empty((0, len(columns)))
+    # one contiguous array per column, so filters don't stride across rows
+    data = np.ascontiguousarray(data.T)
+    return dict(zip(columns, data))
@@ -0,0 +1,277 @@
+"""
+Shared-memory table of evaluated config hashes, used by optimizer workers to detect duplicates.
+
+Replaces a Manager dict: every worker maps the same file (in /dev/shm where available) and
+accesses it directly, so lookups cost no IPC round-trips or pickling. The table is split into
+shards, each guarded by an fcntl byte-range lock, so workers only contend when they touch the
+same shard.
+
+Capacity is fixed at creation. Each key is probed over a bounded window; when the window is
+full, the slot at the key's home position is overwritten. Memory therefore never grows,
+and the table stays exact as long as it holds fewer entries than its capacity.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from uuid import uuid4
+
+try:
+    import fcntl
+except ImportError:  # Windows: no byte-range locks; workers may race on duplicate detection
+    fcntl = None
+
+MAGIC = b"PBDEDUP1"
+HEADER_FMT = "<8sQQQQ"  # magic, slots_per_shard, n_shards, n_objectives, duplicate counter
+HEADER_SIZE = 64
+DUPLICATES_OFFSET = 32
+FAILED_PERTURBATIONS_OFFSET = 40  # duplicates no perturbation could make new; in the padding
+SHARD_HEADER_SIZE = 8  # number of occupied slots in the shard
+KEY_SIZE = 16  # leading 128 bits of the sha256 config hash
+SLOT_HEADER_SIZE = 24  # key + state byte, padded to 8 bytes
+MAX_PROBE = 32
+
+EMPTY, CLAIMED, SCORED = 0, 1, 2
+
+
+def default_directory() -> str:
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def capacity_for(n_evaluations: int) -> int:
+    """Total slots needed to keep n_evaluations hashes at a load factor of about 0.5."""
+    capacity = 1 << 16
+    while capacity < 2 * n_evaluations:
+        capacity <<= 1
+    return capacity
+
+
+class DedupTable:
+    def __init__(self, path: str):
+        """Attach to an existing table file. Use DedupTable.create to make a new one."""
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR)
+        self._mm = mmap.mmap(self._fd, 0)
+        magic, self.slots_per_shard, self.n_shards, self.n_objectives, _ = struct.unpack_from(
+            HEADER_FMT, self._mm, 0
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a dedup table")
+        self._value_fmt = f"<{self.n_objectives}d"
+        self.slot_size = SLOT_HEADER_SIZE + 8 * self.n_objectives
+        self.shard_size = SHARD_HEADER_SIZE + self.slots_per_shard * self.slot_size
+
+    @classmethod
+    def create(
+        cls,
+        capacity: int,
+        n_objectives: int,
+        n_shards: int = 64,
+        directory: str | None = None,
+    ) -> "DedupTable":
+        slots_per_shard = max(MAX_PROBE, -(-capacity // n_shards))
+        slot_size = SLOT_HEADER_SIZE + 8 * n_objectives
+        size = HEADER_SIZE + n_shards * (SHARD_HEADER_SIZE + slots_per_shard * slot_size)
+        path = os.path.join(directory or default_directory(), f"passivbot_dedup_{uuid4().hex}.bin")
+        with open(path, "wb") as f:
+            f.truncate(size)  # sparse, zero filled: all slots EMPTY
+            f.write(struct.pack(HEADER_FMT, MAGIC, slots_per_shard, n_shards, n_objectives, 0))
+        return cls(path)
+
+    # -- pickling: workers re-attach by path ---------------------------------------
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    # -- locking -------------------------------------------------------------------
+
+    def _lock(self, offset: int):
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, offset)
+
+    def _unlock(self, offset: int):
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, offset)
+
+    # -- slot addressing -----------------------------------------------------------
+
+    @staticmethod
+    def _key(config_hash: str) -> bytes:
+        return bytes.fromhex(config_hash[: 2 * KEY_SIZE])
+
+    def _shard_offset(self, key: bytes) -> int:
+        shard = int.from_bytes(key[8:], "little") % self.n_shards
+        return HEADER_SIZE + shard * self.shard_size
+
+    def _find(self, shard_offset: int, key: bytes) -> tuple[int | None, int | None]:
+        """Returns (offset of the slot holding key, offset of the first empty slot in the probe window)."""
+        home = int.from_bytes(key[:8], "little") % self.slots_per_shard
+        slots_offset = shard_offset + SHARD_HEADER_SIZE
+        for i in range(MAX_PROBE):
+            offset = slots_offset + ((home + i) % self.slots_per_shard) * self.slot_size
+            if self._mm[offset + KEY_SIZE] == EMPTY:
+                return None, offset
+            if self._mm[offset : offset + KEY_SIZE] == key:
+                return offset, None
+        return None, None
+
+    def _evict_offset(self, shard_offset: int, key: bytes) -> int:
+        home = int.from_bytes(key[:8], "little") % self.slots_per_shard
+        return shard_offset + SHARD_HEADER_SIZE + home * self.slot_size
+
+    def _write(self, shard_offset: int, offset: int, key: bytes, values) -> None:
+        was_empty = self._mm[offset + KEY_SIZE] == EMPTY
+        self._mm[offset : offset + KEY_SIZE] = key
+        if values is None:
+            self._mm[offset + KEY_SIZE] = CLAIMED
+        else:
+            struct.pack_into(self._value_fmt, self._mm, offset + SLOT_HEADER_SIZE, *values)
+            self._mm[offset + KEY_SIZE] = SCORED
+        if was_empty:
+            (count,) = struct.unpack_from("<Q", self._mm, shard_offset)
+            struct.pack_into("<Q", self._mm, shard_offset, count + 1)
+
+    def _insert(self, shard_offset: int, key: bytes, values) -> None:
+        found, free = self._find(shard_offset, key)
+        offset = found if found is not None else free
+        if offset is None:
+            offset = self._evict_offset(shard_offset, key)
+        self._write(shard_offset, offset, key, values)
+
+    # -- public API ------------------------------------------------------------------
+
+    def claim(self, config_hash: str) -> bool:
+        """Atomically insert config_hash without a score. Returns False if already present."""
+        key = self._key(config_hash)
+        shard_offset = self._shard_offset(key)
+        self._lock(shard_offset)
+        try:
+            found, _ = self._find(shard_offset, key)
+            if found is not None:
+                return False
+            self._insert(shard_offset, key, None)
+            return True
+        finally:
+            self._unlock(shard_offset)
+
+    def get(self, config_hash: str):
+        """Objectives tuple if scored, else None (missing or claimed but not yet evaluated)."""
+        key = self._key(config_hash)
+        shard_offset = self._shard_offset(key)
+        self._lock(shard_offset)
+        try:
+            found, _ = self._find(shard_offset, key)
+            if found is None or self._mm[found + KEY_SIZE] != SCORED:
+                return None
+            return struct.unpack_from(self._value_fmt, self._mm, found + SLOT_HEADER_SIZE)
+        finally:
+            self._unlock(shard_offset)
+
+    def __contains__(self, config_hash: str) -> bool:
+        key = self._key(config_hash)
+        shard_offset = self._shard_offset(key)
+        self._lock(shard_offset)
+        try:
+            return self._find(shard_offset, key)[0] is not None
+        finally:
+            self._unlock(shard_offset)
+
+    def __setitem__(self, config_hash: str, objectives) -> None:
+        """Store objectives (or None to only mark as seen) for config_hash."""
+        if objectives is not None and len(objectives) != self.n_objectives:
+            raise ValueError(f"expected {self.n_objectives} objectives, got {len(objectives)}")
+        key = self._key(config_hash)
+        shard_offset = self._shard_offset(key)
+        self._lock(shard_offset)
+        try:
+            self._insert(shard_offset, key, objectives)
+        finally:
+            self._unlock(shard_offset)
+
+    def __len__(self) -> int:
+        return sum(
+            struct.unpack_from("<Q", self._mm, HEADER_SIZE + i * self.shard_size)[0]
+            for i in range(self.n_shards)
+        )
+
+    def _increment_counter(self, offset: int) -> int:
+        self._lock(offset)
+        try:
+            (count,) = struct.unpack_from("<Q", self._mm, offset)
+            struct.pack_into("<Q", self._mm, offset, count + 1)
+            return count + 1
+        finally:
+            self._unlock(offset)
+
+    def increment_duplicates(self) -> int:
+        """Increment the shared duplicate counter; returns the new count."""
+        return self._increment_counter(DUPLICATES_OFFSET)
+
+    def increment_failed_perturbations(self) -> int:
+        return self._increment_counter(FAILED_PERTURBATIONS_OFFSET)
+
+    @property
+    def duplicates(self) -> int:
+        return struct.unpack_from("<Q", self._mm, DUPLICATES_OFFSET)[0]
+
+    @property
+    def failed_perturbations(self) -> int:
+        return struct.unpack_from("<Q", self._mm, FAILED_PERTURBATIONS_OFFSET)[0]
+
+    def snapshot(self, path: str) -> None:
+        """Copy the table to path (atomically replaced). Writes racing with the copy may be
+        missed, which at worst lets a config be evaluated twice after a restore."""
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._mm[:])
+        os.replace(tmp, path)
+
+    @classmethod
+    def restore(cls, snapshot_path: str, directory: str | None = None) -> "DedupTable":
+        """
+        Create a new shared table initialized from a snapshot. Hashes claimed without a score
+        are left out: their evaluations were in flight when the snapshot was taken, and the
+        resumed run evaluates them again instead of treating them as duplicates.
+        """
+        with open(snapshot_path, "rb") as f:
+            snapshot = f.read()
+        magic, slots_per_shard, n_shards, n_objectives, _ = struct.unpack_from(
+            HEADER_FMT, snapshot, 0
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{snapshot_path} is not a dedup table snapshot")
+        table = cls.create(slots_per_shard * n_shards, n_objectives, n_shards, directory)
+        for offset in [DUPLICATES_OFFSET, FAILED_PERTURBATIONS_OFFSET]:
+            table._mm[offset : offset + 8] = snapshot[offset : offset + 8]
+        # reinserted rather than copied, so dropped slots don't break probe windows
+        for shard in range(n_shards):
+            slots_offset = HEADER_SIZE + shard * table.shard_size + SHARD_HEADER_SIZE
+            for i in range(slots_per_shard):
+                offset = slots_offset + i * table.slot_size
+                if snapshot[offset + KEY_SIZE] != SCORED:
+                    continue
+                key = snapshot[offset : offset + KEY_SIZE]
+                values = struct.unpack_from(table._value_fmt, snapshot, offset + SLOT_HEADER_SIZE)
+                table._insert(table._shard_offset(key), key, values)
+        return table
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            os.close(self._fd)
+            self._mm = None
+
+    def unlink(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,153 @@
+"""
+Persistent cache of optimizer evaluations shared across runs.
+
+Maps an evaluation key (backtester build, dataset hash, backtest inputs and bot params, see
+``evaluation_key``) to the per-exchange analyses of that backtest. Objectives are not stored:
+they are recomputed from the analyses with the scoring and limits of the current run, so one
+cache serves runs with different scoring. Rebuilding passivbot_rust invalidates all entries.
+
+Backed by SQLite in WAL mode, so any number of worker processes may read while one writes.
+Each process opens its own connection lazily; the object pickles by path.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+
+import passivbot_rust as pbr
+
+from pure_funcs import calc_hash
+
+DEFAULT_PATH = os.path.join("caches", "evaluation_cache.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    key TEXT PRIMARY KEY,
+    metrics TEXT,
+    analyses TEXT NOT NULL
+)
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def backtester_version() -> str:
+    """Hash of the compiled passivbot_rust extension; changes with every rebuild."""
+    digest = hashlib.sha256()
+    with open(pbr.__file__, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def evaluation_key(
+    dataset_hashes: dict, bot_params: dict, exchange_params: dict, backtest_params: dict
+) -> str:
+    """
+    Hash of everything a backtest result depends on, the backtester build included.
+    backtest_params["metrics"] is left out: which metrics were computed is stored alongside
+    the analyses instead.
+    """
+    return calc_hash(
+        {
+            "backtester": backtester_version(),
+            "exchanges": {
+                exchange: {
+                    "dataset": dataset_hashes[exchange],
+                    "bot_params": bot_params[exchange],
+                    "exchange_params": exchange_params[exchange],
+                    "backtest_params": {
+                        k: v for k, v in backtest_params[exchange].items() if k != "metrics"
+                    },
+                }
+                for exchange in sorted(dataset_hashes)
+            },
+        }
+    )
+
+
+class EvaluationCache:
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._conn = None
+        self._pid = None
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=60.0, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(SCHEMA)
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str, required_metrics=None):
+        """
+        Per-exchange analyses stored under key, or None if missing.
+        required_metrics: metric names the caller needs, None meaning all metrics.
+        Entries computed with a narrower metric set count as missing.
+        """
+        row = (
+            self._connection()
+            .execute("SELECT metrics, analyses FROM evaluations WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        metrics, analyses = row
+        if metrics is not None:
+            if required_metrics is None or not set(required_metrics) <= set(json.loads(metrics)):
+                return None
+        return json.loads(analyses)
+
+    def put(self, key: str, analyses: dict, metrics=None) -> None:
+        """
+        Store analyses computed for the metric names in metrics (None: all metrics). An entry
+        with all metrics is never replaced by a partial one; two partial entries are merged,
+        so runs with different scoring on one dataset don't evict each other's metrics.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT metrics, analyses FROM evaluations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] is None:
+                conn.execute("COMMIT")
+                return
+            if row is not None and metrics is not None:
+                metrics = set(metrics) | set(json.loads(row[0]))
+                stored = json.loads(row[1])
+                analyses = {
+                    exchange: {**stored.get(exchange, {}), **analysis}
+                    for exchange, analysis in analyses.items()
+                }
+            conn.execute(
+                "INSERT OR REPLACE INTO evaluations (key, metrics, analyses) VALUES (?, ?, ?)",
+                (
+                    key,
+                    None if metrics is None else json.dumps(sorted(metrics)),
+                    json.dumps(analyses),
+                ),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._pid = None
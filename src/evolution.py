@@ -0,0 +1,237 @@
+"""
+Asynchronous steady-state (mu + lambda) evolution for the optimizer.
+
+Unlike DEAP's generational ``eaMuPlusLambda``, no generation barrier exists: a fixed number of
+evaluations is kept in flight, each finished evaluation is inserted into the population as
+it arrives and immediately replaced by a new offspring. Variation (``varOr`` with the
+toolbox's mate/mutate) and survivor selection (the toolbox's select, i.e. NSGA-II) are the
+same as in the generational loop; selection is applied every ``trim_every`` arrivals.
+
+With a ``screen`` (see surrogate.SurrogateScreen), several offspring are bred per submission
+and only the one with the best predicted objectives is evaluated.
+
+Evaluations go through an evaluation backend exposing ``submit``, ``next_result``,
+``n_pending`` and ``capacity``, so workers need not be local processes.
+"""
+
+import logging
+import os
+import queue
+import random
+import time
+
+from deap import algorithms, tools
+
+_worker_evaluate = None
+
+
+def init_pool_worker(evaluate_fn):
+    """Pool initializer: install the evaluation function once per worker process."""
+    global _worker_evaluate
+    _worker_evaluate = evaluate_fn
+
+
+def evaluate_in_worker(genes, claimed=False):
+    # evaluate may perturb duplicates in place, so the evaluated genes are returned as well
+    individual = list(genes)
+    start = time.perf_counter()
+    fitness = _worker_evaluate(individual, claimed=claimed)
+    return individual, fitness, (f"local:{os.getpid()}", time.perf_counter() - start)
+
+
+class PoolEvaluationBackend:
+    """Runs evaluations on a multiprocessing.Pool created with init_pool_worker."""
+
+    def __init__(self, pool, capacity: int):
+        self.pool = pool
+        self.capacity = capacity
+        self.n_pending = 0
+        self._results = queue.Queue()
+
+    def submit(self, individual) -> None:
+        self.n_pending += 1
+        self.pool.apply_async(
+            evaluate_in_worker,
+            (list(individual),),
+            callback=lambda res, ind=individual: self._results.put((ind, res, None)),
+            error_callback=lambda exc, ind=individual: self._results.put((ind, None, exc)),
+        )
+
+    def next_result(self, timeout=None):
+        """
+        Blocks until an evaluation finishes. Returns (individual, genes, fitness, timing),
+        timing being (worker name, seconds taken).
+        """
+        individual, res, exc = self._results.get(timeout=timeout)
+        self.n_pending -= 1
+        if exc is not None:
+            raise exc
+        genes, fitness, timing = res
+        return individual, genes, fitness, timing
+
+
+def make_offspring(population, toolbox, cxpb, mutpb, max_tries=100):
+    """
+    One new (unevaluated) offspring; reproduction draws are retried. Crossover needs two
+    parents, so with a single evaluated individual the offspring is a mutant.
+    """
+    if len(population) < 2:
+        cxpb, mutpb = 0.0, 1.0
+    for _ in range(max_tries):
+        (child,) = algorithms.varOr(population, toolbox, 1, cxpb, mutpb)
+        if not child.fitness.valid:
+            return child
+    child = toolbox.clone(random.choice(population))
+    (child,) = toolbox.mutate(child)
+    del child.fitness.values
+    return child
+
+
+def ea_steady_state(
+    population,
+    toolbox,
+    backend,
+    mu,
+    cxpb,
+    mutpb,
+    max_evals,
+    trim_every,
+    stats=None,
+    halloffame=None,
+    log_every=None,
+    on_result=None,
+    logbook=None,
+    n_evals_done=0,
+    checkpoint_fn=None,
+    checkpoint_interval=None,
+    screen=None,
+    migration=None,
+    migrate_every=None,
+    n_migrants=None,
+    telemetry=None,
+    stop_fn=None,
+):
+    """
+    Evaluate the unevaluated members of ``population`` then keep producing offspring until
+    ``max_evals`` evaluations were submitted. Returns (population, logbook).
+
+    Logbook records are written every ``log_every`` evaluations (default mu), so a record
+    corresponds to one generation of the generational (mu + lambda) loop with lambda = mu.
+    ``on_result(individual, n_evals)`` is called after each arrival.
+
+    Every ``checkpoint_interval`` seconds ``checkpoint_fn(state)`` receives a dict with the
+    population (in-flight individuals included, unevaluated), the logbook and n_evals.
+    Passing these back as population, logbook and n_evals_done resumes the run.
+
+    ``screen`` receives every evaluated individual and, once fitted, picks which of
+    ``screen.n_candidates`` bred offspring is submitted.
+
+    Every ``migrate_every`` evaluations, ``n_migrants`` individuals chosen by the toolbox's
+    select are passed to ``migration.migrate`` (see islands.MigrationDirectory), and the
+    immigrants it returns join the population without being evaluated again.
+
+    ``telemetry.on_result(n_evals, timing, backend)`` is called after each arrival (see
+    telemetry.OptimizerTelemetry).
+
+    ``stop_fn()`` is called after each arrival; once it returns True, nothing more is
+    submitted and the run ends when the evaluations in flight are done.
+    """
+    log_every = log_every or mu
+    if logbook is None:
+        logbook = tools.Logbook()
+        logbook.header = ["gen", "evals"] + (stats.fields if stats else [])
+
+    pending = [ind for ind in population if not ind.fitness.valid]
+    evaluated = [ind for ind in population if ind.fitness.valid]
+    in_flight = {}  # id -> individual
+    n_submitted = n_evals = n_evals_done
+    n_since_trim = n_since_log = n_since_migration = 0
+    last_checkpoint = time.time()
+    stopping = False
+    if screen is not None:
+        for individual in evaluated:
+            screen.add(individual, individual.fitness.values)
+
+    def submit_next() -> bool:
+        nonlocal n_submitted
+        if n_submitted >= max_evals or stopping:
+            return False
+        if pending:
+            individual = pending.pop()
+        elif screen is not None and screen.ready:
+            candidates = [
+                make_offspring(evaluated, toolbox, cxpb, mutpb) for _ in range(screen.n_candidates)
+            ]
+            individual = candidates[screen.pick(candidates)]
+        elif evaluated:
+            individual = make_offspring(evaluated, toolbox, cxpb, mutpb)
+        else:
+            return False  # wait for the first arrivals before breeding
+        backend.submit(individual)
+        in_flight[id(individual)] = individual
+        n_submitted += 1
+        return True
+
+    while backend.n_pending < backend.capacity and submit_next():
+        pass
+
+    while backend.n_pending > 0:
+        individual, genes, fitness, timing = backend.next_result()
+        del in_flight[id(individual)]
+        individual[:] = genes
+        individual.fitness.values = fitness
+        evaluated.append(individual)
+        n_evals += 1
+        n_since_trim += 1
+        n_since_log += 1
+        if halloffame is not None:
+            halloffame.update([individual])
+        if screen is not None:
+            screen.add(individual, fitness)
+        if len(evaluated) > mu and n_since_trim >= trim_every:
+            evaluated[:] = toolbox.select(evaluated, mu)
+            n_since_trim = 0
+        if n_since_log >= log_every:
+            record = stats.compile(evaluated) if stats else {}
+            logbook.record(gen=len(logbook), evals=n_since_log, **record)
+            logging.info(f"evals: {n_evals} | population: {len(evaluated)} | {record}")
+            n_since_log = 0
+        if on_result is not None:
+            on_result(individual, n_evals)
+        if telemetry is not None:
+            telemetry.on_result(n_evals, timing, backend)
+        if stop_fn is not None and not stopping and stop_fn():
+            stopping = True
+            logging.info(f"stopping after {n_evals} evaluations")
+        n_since_migration += 1
+        if migration is not None and n_since_migration >= migrate_every:
+            emigrants = toolbox.select(evaluated, min(n_migrants, len(evaluated)))
+            immigrants = migration.migrate([(ind, ind.fitness.values) for ind in emigrants])
+            for genes, fitness in immigrants:
+                immigrant = type(individual)(genes)
+                immigrant.fitness.values = fitness
+                evaluated.append(immigrant)
+                if halloffame is not None:
+                    halloffame.update([immigrant])
+            if immigrants:
+                logging.info(f"migration: sent {len(emigrants)}, received {len(immigrants)}")
+            n_since_migration = 0
+        if checkpoint_fn is not None and time.time() - last_checkpoint >= checkpoint_interval:
+            checkpoint_fn(
+                {
+                    "population": evaluated + pending + list(in_flight.values()),
+                    "logbook": logbook,
+                    "n_evals": n_evals,
+                }
+            )
+            last_checkpoint = time.time()
+        while backend.n_pending < backend.capacity and submit_next():
+            pass
+
+    if len(evaluated) > mu:
+        evaluated[:] = toolbox.select(evaluated, mu)
+    if n_since_log:
+        record = stats.compile(evaluated) if stats else {}
+        logbook.record(gen=len(logbook), evals=n_since_log, **record)
+    population[:] = evaluated
+    return population, logbook
@@ -0,0 +1,170 @@
+"""
+Island model for the optimizer: several optimize.py processes, possibly on different hosts,
+each evolving its own population with its own pool and shared memory dataset.
+
+Islands share one directory (a local path on a single box, a network filesystem across boxes):
+- migration/: every island periodically writes its elites to island_<id>_<seq>.json and
+  takes in the latest elites of its predecessor on a ring (island id - 1).
+- results_channel/: all islands append their results there, and island 0 runs the only
+  results writer, so everything ends up in one all_results.bin and one ParetoStore.
+- done/: an island writes island_<id> when finished, also when it failed; island 0 waits for
+  all of them before stopping the writer. An island removes its own marker when it starts,
+  and island 0 ignores markers older than its own start, so markers left by an earlier run
+  or by a crashed island that was resumed don't count.
+- heartbeat/: every island touches island_<id> every HEARTBEAT_INTERVAL seconds while it
+  runs. Island 0 stops waiting for an island which is not done and whose heartbeat is older
+  than STALE_AFTER seconds (or which never wrote one), as it crashed or never started.
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+HEARTBEAT_INTERVAL = 30.0
+STALE_AFTER = 300.0
+
+
+class MigrationDirectory:
+    def __init__(self, directory: str, island_id: int, n_islands: int, keep_files: int = 2):
+        self.directory = directory
+        self.island_id = island_id
+        self.n_islands = n_islands
+        self.keep_files = keep_files
+        self.migration_dir = os.path.join(directory, "migration")
+        self.done_dir = os.path.join(directory, "done")
+        self.heartbeat_dir = os.path.join(directory, "heartbeat")
+        os.makedirs(self.migration_dir, exist_ok=True)
+        os.makedirs(self.done_dir, exist_ok=True)
+        os.makedirs(self.heartbeat_dir, exist_ok=True)
+        self._stop_heartbeat = threading.Event()
+        # markers from before this start belong to an earlier run or to a crashed attempt
+        self.started_at = time.time()
+        try:
+            os.remove(self._done_path(island_id))
+        except FileNotFoundError:
+            pass
+        self.heartbeat()
+        self.seq = self._last_seq(island_id)
+        self.source_id = (island_id - 1) % n_islands
+        self.last_received = self._last_seq(self.source_id)
+
+    @property
+    def is_home(self) -> bool:
+        return self.island_id == 0
+
+    def _files(self, island_id: int) -> list:
+        return sorted(glob.glob(os.path.join(self.migration_dir, f"island_{island_id}_*.json")))
+
+    def _last_seq(self, island_id: int) -> int:
+        files = self._files(island_id)
+        return int(files[-1].rsplit("_", 1)[1].split(".")[0]) if files else 0
+
+    def migrate(self, emigrants: list) -> list:
+        """
+        Publish emigrants as (genes, fitness) pairs; returns the immigrants published by the
+        source island since the previous call, as (genes, fitness) pairs.
+        """
+        self.seq += 1
+        path = os.path.join(self.migration_dir, f"island_{self.island_id}_{self.seq:08d}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump([[list(genes), list(fitness)] for genes, fitness in emigrants], f)
+        os.replace(tmp, path)
+        for old in self._files(self.island_id)[: -self.keep_files]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+        files = self._files(self.source_id)
+        if not files:
+            return []
+        latest = files[-1]
+        seq = int(latest.rsplit("_", 1)[1].split(".")[0])
+        if seq <= self.last_received:
+            return []
+        try:
+            with open(latest) as f:
+                immigrants = json.load(f)
+        except (OSError, ValueError):
+            return []  # removed by its writer meanwhile; next migration picks up a newer one
+        self.last_received = seq
+        return [(genes, tuple(fitness)) for genes, fitness in immigrants]
+
+    def heartbeat(self) -> None:
+        with open(os.path.join(self.heartbeat_dir, f"island_{self.island_id}"), "w") as f:
+            f.write(str(time.time()))
+
+    def start_heartbeat(self, interval: float = HEARTBEAT_INTERVAL) -> None:
+        """Touch this island's heartbeat file every interval seconds until mark_done."""
+
+        def beat():
+            while True:
+                try:
+                    self.heartbeat()
+                except OSError as e:
+                    logging.warning(f"island heartbeat failed: {e!r}")
+                if self._stop_heartbeat.wait(interval):
+                    return
+
+        threading.Thread(target=beat, daemon=True).start()
+
+    def _done_path(self, island_id: int) -> str:
+        return os.path.join(self.done_dir, f"island_{island_id}")
+
+    def mark_done(self) -> None:
+        self._stop_heartbeat.set()
+        with open(self._done_path(self.island_id), "w") as f:
+            f.write(str(time.time()))
+
+    def is_done(self, island_id: int) -> bool:
+        """Whether the island marked itself done since this island started."""
+        try:
+            return os.path.getmtime(self._done_path(island_id)) >= self.started_at
+        except OSError:
+            return False
+
+    def n_done(self) -> int:
+        return self.n_islands - len(self.pending_islands())
+
+    def pending_islands(self) -> list:
+        """Ids of the islands which have not marked themselves done."""
+        return [i for i in range(self.n_islands) if not self.is_done(i)]
+
+    def heartbeat_age(self, island_id: int, default: float) -> float:
+        """Seconds since the island's last heartbeat; default if it never wrote one."""
+        try:
+            return time.time() - os.path.getmtime(
+                os.path.join(self.heartbeat_dir, f"island_{island_id}")
+            )
+        except OSError:
+            return default
+
+    def wait_for_all(self, poll_interval: float = 5.0, stale_after: float = STALE_AFTER) -> list:
+        """
+        Wait until every island is done or has gone stale. Returns the ids of the islands
+        given up on.
+        """
+        start = time.time()
+        logged = 0.0
+        while pending := self.pending_islands():
+            since_start = time.time() - start
+            stale = [i for i in pending if self.heartbeat_age(i, since_start) > stale_after]
+            if len(stale) == len(pending):
+                logging.warning(
+                    f"islands {stale} did not finish and sent no heartbeat for {stale_after:.0f}s;"
+                    " not waiting for them"
+                )
+                return stale
+            if time.time() - logged > 60.0:
+                logging.info(
+                    f"waiting for islands to finish: {self.n_islands - len(pending)}/"
+                    f"{self.n_islands} done, pending: {pending}"
+                    + (f", stale: {stale}" if stale else "")
+                )
+                logged = time.time()
+            time.sleep(poll_interval)
+        return []
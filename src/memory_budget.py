@@ -0,0 +1,135 @@
+"""
+Memory estimates for sizing the optimizer's worker pool and its shared memory datasets.
+
+Before the pool is started, probe_worker() runs one evaluation in a worker process of its own
+and measures its time and peak private memory: resident memory not backed by the shared memory
+datasets or other files, which is what each additional worker costs. choose_n_workers() then
+takes as many workers as fit in the available RAM, limited by the cores and optimize.n_cpus.
+
+On Linux the parent samples the worker's anonymous RSS from /proc while it evaluates (the
+backtest holds the GIL, so the worker can't sample itself). Elsewhere the probe falls back to
+the peak RSS from getrusage, which also counts the dataset pages the worker touched and so
+overestimates; without either, no memory limit is applied.
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+
+from evolution import evaluate_in_worker, init_pool_worker
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MEMORY_HEADROOM = 1.25  # per worker, for evaluations using more memory than the probe's
+RESERVED_MEMORY_FRACTION = 0.1  # of the available memory, left to the rest of the system
+MEMORY_SAMPLE_INTERVAL = 0.005  # seconds
+
+
+def read_proc_fields(path: str) -> dict:
+    """{field: bytes} of the "Field:   123 kB" lines of a /proc file; {} if it can't be read."""
+    fields = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                parts = value.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = int(parts[0]) * 1024
+    except OSError:
+        pass
+    return fields
+
+
+def available_memory():
+    """Bytes of memory available to new processes without swapping, or None if unknown."""
+    meminfo = read_proc_fields("/proc/meminfo")
+    if "MemAvailable" in meminfo:
+        return meminfo["MemAvailable"]
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))  # respects cpu sets, e.g. in containers
+    return multiprocessing.cpu_count()
+
+
+def private_memory(pid="self"):
+    """Resident bytes of a process not backed by files or shared memory, or None if unknown."""
+    return read_proc_fields(f"/proc/{pid}/status").get("RssAnon")
+
+
+def peak_rss():
+    """Peak resident bytes of this process, shared pages included, or None if unknown."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def probe_evaluation(genes) -> dict:
+    """Runs in a worker set up by evolution.init_pool_worker."""
+    _, _, (_, seconds) = evaluate_in_worker(genes)
+    return {"seconds": seconds, "peak_bytes": peak_rss()}
+
+
+def probe_worker(evaluate_fn, genes) -> dict:
+    """Seconds and peak private bytes (or None) of evaluating genes in a fresh worker process."""
+    with multiprocessing.Pool(1, initializer=init_pool_worker, initargs=(evaluate_fn,)) as pool:
+        pid = pool.apply(os.getpid)
+        peak = private_memory(pid)
+        result = pool.apply_async(probe_evaluation, (list(genes),))
+        while not result.ready():
+            result.wait(MEMORY_SAMPLE_INTERVAL)
+            if peak is not None:
+                peak = max(peak, private_memory(pid) or 0)
+        probe = result.get()
+    if peak is not None:
+        probe["peak_bytes"] = peak
+    return probe
+
+
+def choose_n_workers(peak_bytes, max_workers=0, available_bytes=None, n_cores=None) -> tuple:
+    """
+    (number of workers, what limited it). max_workers caps the count unless 0. Each worker
+    is given MEMORY_HEADROOM times peak_bytes of the available memory, minus a reserve.
+    """
+    limits = {"cores": n_cores if n_cores is not None else available_cores()}
+    if max_workers:
+        limits["optimize.n_cpus"] = max_workers
+    if peak_bytes and available_bytes is not None:
+        usable = available_bytes * (1.0 - RESERVED_MEMORY_FRACTION)
+        limits["memory"] = int(usable // (peak_bytes * MEMORY_HEADROOM))
+    limited_by = min(limits, key=limits.get)
+    return max(1, limits[limited_by]), limited_by
+
+
+def check_shared_memory_budget(required_bytes: int, directory: str) -> bool:
+    """
+    Warn ahead of writing shared memory datasets of required_bytes to directory if they won't
+    fit, instead of failing halfway through the setup. Returns whether they fit.
+    """
+    fits = True
+    free = shutil.disk_usage(directory).free
+    if required_bytes > free:
+        logging.warning(
+            f"Shared memory datasets need {required_bytes / 1024**3:.2f} GB, but {directory} has "
+            f"only {free / 1024**3:.2f} GB free; writing them will fail"
+        )
+        fits = False
+    available = available_memory()
+    if directory.startswith("/dev/shm") and available is not None and required_bytes > available:
+        logging.warning(
+            f"Shared memory datasets need {required_bytes / 1024**3:.2f} GB of RAM, but only "
+            f"{available / 1024**3:.2f} GB is available; expect swapping"
+        )
+        fits = False
+    return fits
@@ -1,7 +1,10 @@
 import json
 import logging
 import math
+import os
+import struct
 import msgpack
+import numpy as np
 from typing import Any
 import passivbot_rust as pbr
 
@@ -162,6 +165,151 @@ def load_results(filepath):
             yield current
 
 
+# --- all_results.idx ---------------------------------------------------------------------
+# Sidecar index of all_results.bin: a header (magic, number of objectives) followed by one
+# fixed-size record per result: its byte offset, the offset of the full (non-diff) record it
+# is diffed against (itself if full), and its objective values.
+
+RESULTS_INDEX_MAGIC = b"PBIDX001"
+RESULTS_INDEX_HEADER = struct.Struct("<8sI")
+
+
+def get_results_index_path(filepath: str) -> str:
+    return os.path.splitext(filepath)[0] + ".idx"
+
+
+def results_index_dtype(n_objectives: int) -> np.dtype:
+    return np.dtype(
+        [("offset", "<u8"), ("keyframe", "<u8"), ("objectives", "<f8", (n_objectives,))]
+    )
+
+
+def get_result_objectives(result: dict) -> list:
+    combined = result["analyses_combined"]
+    w_keys = sorted((k for k in combined if k.startswith("w_")), key=lambda k: int(k[2:]))
+    return [combined[k] for k in w_keys]
+
+
+def _has_same_keys(a: dict, b: dict) -> bool:
+    if a.keys() != b.keys():
+        return False
+    return all(
+        _has_same_keys(v, b[k])
+        for k, v in a.items()
+        if isinstance(v, dict) and isinstance(b[k], dict)
+    )
+
+
+def load_results_index(filepath: str) -> np.ndarray:
+    """Structured array (offset, keyframe, objectives) of the index of results file filepath."""
+    with open(get_results_index_path(filepath), "rb") as f:
+        magic, n_objectives = RESULTS_INDEX_HEADER.unpack(f.read(RESULTS_INDEX_HEADER.size))
+    if magic != RESULTS_INDEX_MAGIC:
+        raise ValueError(f"{get_results_index_path(filepath)} is not a results index")
+    dtype = results_index_dtype(n_objectives)
+    n_records = (
+        os.path.getsize(get_results_index_path(filepath)) - RESULTS_INDEX_HEADER.size
+    ) // dtype.itemsize
+    if n_records == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(
+        get_results_index_path(filepath),
+        dtype=dtype,
+        mode="r",
+        offset=RESULTS_INDEX_HEADER.size,
+        shape=(n_records,),
+    )
+
+
+class ResultsIndexWriter:
+    """
+    Appends to the index of results file filepath, next to the results writer. Records of
+    filepath missing from the index (the whole file if there is no index yet) are indexed first.
+    """
+
+    def __init__(self, filepath: str, n_objectives: int):
+        self.path = get_results_index_path(filepath)
+        self.dtype = results_index_dtype(n_objectives)
+        update_results_index(filepath, n_objectives)
+        self.f = open(self.path, "ab")
+
+    def add(self, offset: int, keyframe: int, objectives) -> None:
+        record = np.zeros(1, dtype=self.dtype)
+        record["offset"], record["keyframe"], record["objectives"] = offset, keyframe, objectives
+        self.f.write(record.tobytes())
+
+    def flush(self) -> None:
+        self.f.flush()
+
+    def close(self) -> None:
+        self.f.close()
+
+
+def update_results_index(filepath: str, n_objectives: int = None) -> None:
+    """
+    Index the records of results file filepath which aren't in its index yet. Without an
+    index, the whole file is scanned; a record is taken as a keyframe if it holds every key
+    of the result it decodes to.
+    """
+    index_path = get_results_index_path(filepath)
+    if not os.path.exists(filepath):
+        return
+    index = load_results_index(filepath) if os.path.exists(index_path) else None
+    start = 0 if index is None or not len(index) else int(index["keyframe"][-1])
+    last_indexed = -1 if index is None or not len(index) else int(index["offset"][-1])
+    records = []
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        unpacker = msgpack.Unpacker(f, raw=False)
+        current = {}
+        keyframe = start
+        while True:
+            offset = start + unpacker.tell()
+            try:
+                record = next(unpacker)
+            except (StopIteration, ValueError):
+                break
+            current = deep_updated(current, record)
+            if offset <= last_indexed:
+                continue
+            if _has_same_keys(record, current):
+                keyframe = offset
+            records.append((offset, keyframe, get_result_objectives(current)))
+    if index is None:
+        if n_objectives is None:
+            n_objectives = len(records[0][2]) if records else 0
+        with open(index_path, "wb") as f:
+            f.write(RESULTS_INDEX_HEADER.pack(RESULTS_INDEX_MAGIC, n_objectives))
+    if records:
+        logging.info(f"indexing {len(records)} records of {filepath}")
+        dtype = index.dtype if index is not None else results_index_dtype(n_objectives)
+        array = np.zeros(len(records), dtype=dtype)
+        for i, (offset, keyframe, objectives) in enumerate(records):
+            array[i] = (offset, keyframe, objectives)
+        with open(index_path, "ab") as f:
+            f.write(array.tobytes())
+
+
+def load_result(filepath: str, i: int) -> dict:
+    """Full result number i of results file filepath, decoded from its nearest keyframe."""
+    index = load_results_index(filepath)
+    keyframe = int(index["keyframe"][i])
+    # number of records to decode: from the keyframe up to and including record i
+    n = i - int(np.searchsorted(index["offset"][: i + 1], keyframe)) + 1
+    with open(filepath, "rb") as f:
+        f.seek(keyframe)
+        unpacker = msgpack.Unpacker(f, raw=False)
+        current = {}
+        for _ in range(n):
+            current = deep_updated(current, next(unpacker))
+    return current
+
+
+def iter_objectives(filepath: str):
+    """Objective vectors of all results in results file filepath, without decoding them."""
+    yield from load_results_index(filepath)["objectives"]
+
+
 def round_floats(obj: Any, sig_digits: int = 6) -> Any:
     if isinstance(obj, float):
         return pbr.round_dynamic(obj, sig_digits)
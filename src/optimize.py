@@ -28,12 +28,17 @@ import argparse
 import multiprocessing
 import mmap
 from multiprocessing import Queue, Process
-from collections import defaultdict
+from collections import defaultdict, deque
 from contextlib import nullcontext
 from backtest import (
     prepare_hlcvs_mss,
     prep_backtest_args,
     expand_analysis,
+    get_cache_hash,
+    get_mapped_file_offset,
+    get_shared_dataset_keys,
+    get_shared_memory_dir,
+    shared_memory_bytes_needed,
 )
 from pure_funcs import (
     get_template_live_config,
@@ -63,16 +68,48 @@ import logging
 import traceback
 import json
 import pprint
-from deap import base, creator, tools, algorithms
+from hashlib import sha256
+from deap import base, creator, tools
 from contextlib import contextmanager
 import tempfile
 import time
 import math
+import pickle
+import random
 import fcntl
 from tqdm import tqdm
-from optimizer_overrides import optimizer_overrides
-from opt_utils import make_json_serializable, generate_incremental_diff, round_floats
+from optimizer_overrides import optimizer_overrides, MAX_OVERRIDES, NOOP_OVERRIDES
+from opt_utils import (
+    make_json_serializable,
+    generate_incremental_diff,
+    round_floats,
+    ResultsIndexWriter,
+)
 from pareto_store import ParetoStore
+from dedup_table import DedupTable, capacity_for
+from evaluation_cache import EvaluationCache, evaluation_key
+from results_channel import ResultsChannel, ResultsReader
+from columnar_results import ColumnarResultsWriter
+from evolution import PoolEvaluationBackend, ea_steady_state, init_pool_worker
+from surrogate import SurrogateScreen
+from islands import MigrationDirectory
+from shared_datasets import get_registry
+from remote_workers import RemoteEvaluationBackend
+from memory_budget import (
+    available_cores,
+    available_memory,
+    check_shared_memory_budget,
+    choose_n_workers,
+    probe_worker,
+)
+from telemetry import (
+    WRITER_BACKLOG,
+    WRITER_FRONT_SIZE,
+    WRITER_HYPERVOLUME,
+    WRITER_RECORDS_WRITTEN,
+    WRITER_STATUS_SIZE,
+    OptimizerTelemetry,
+)
 import msgpack
 from typing import Sequence, Tuple, List
 
@@ -84,6 +121,10 @@ logging.basicConfig(
 
 
 TEMPLATE_CONFIG_MODE = "v7"
+CHECKPOINT_FILENAME = "checkpoint.pkl"
+DEDUP_SNAPSHOT_FILENAME = "checkpoint_seen_hashes.bin"
+CONVERGED_FILENAME = "converged.json"  # written once the hypervolume stops improving
+HYPERVOLUME_INTERVAL = 5.0  # seconds between hypervolume checks of the results writer
 
 # === bounds helpers =========================================================
 
@@ -154,17 +195,527 @@ def get_bound_keys_ignored():
     return ["enforce_exposure_limit"]
 
 
+def get_param_indices() -> dict:
+    """{pside: {key: position in individual}}, in the order of extract_bounds_tuple_list_from_config."""
+    template_config = get_template_live_config(TEMPLATE_CONFIG_MODE)
+    keys_ignored = get_bound_keys_ignored()
+    indices = {}
+    i = 0
+    for pside in sorted(template_config["bot"]):
+        indices[pside] = {}
+        for key in sorted(template_config["bot"][pside]):
+            if key in keys_ignored:
+                continue
+            indices[pside][key] = i
+            i += 1
+    return indices
+
+
+FILTER_KEYS = [
+    "filter_noisiness_rolling_window",
+    "filter_volume_drop_pct",
+    "filter_volume_rolling_window",
+]
+ENTRY_GRID_KEYS = [
+    "entry_grid_double_down_factor",
+    "entry_grid_spacing_pct",
+    "entry_grid_spacing_weight",
+]
+ENTRY_TRAILING_KEYS = [
+    "entry_trailing_double_down_factor",
+    "entry_trailing_retracement_pct",
+    "entry_trailing_threshold_pct",
+]
+CLOSE_GRID_KEYS = ["close_grid_markup_end", "close_grid_markup_start", "close_grid_qty_pct"]
+CLOSE_TRAILING_KEYS = [
+    "close_trailing_qty_pct",
+    "close_trailing_retracement_pct",
+    "close_trailing_threshold_pct",
+]
+
+
+def canonicalize_individual(
+    individual: Sequence[float], bounds: Sequence[Bound], param_indices: dict, n_coins: int
+) -> List[float]:
+    """
+    Copy of individual with parameters which cannot affect the backtest set to their lower
+    bound, so behaviorally identical individuals share one hash:
+    - a pside which cannot trade (total_wallet_exposure_limit == 0 or n_positions rounds to 0):
+      all its params except these two
+    - n_positions >= n_coins: n_positions is clamped to n_coins and the coin filters are unused
+    - trailing/grid ratio == 0: trailing params unused; abs(ratio) >= 1: grid params unused
+
+    Mirrors the rules of the Rust backtester (backtest.rs, entries.rs, closes.rs).
+    n_coins is the largest number of coins of any exchange in the run.
+    """
+    canonical = list(individual)
+
+    def reset(indices, keys):
+        for key in keys:
+            canonical[indices[key]] = bounds[indices[key]][0]
+
+    for pside, indices in param_indices.items():
+        twel = canonical[indices["total_wallet_exposure_limit"]]
+        n_positions = canonical[indices["n_positions"]]
+        if twel == 0.0 or n_positions < 0.5:
+            reset(
+                indices,
+                [k for k in indices if k not in ["n_positions", "total_wallet_exposure_limit"]],
+            )
+            continue
+        if n_positions >= n_coins:
+            n_positions_low = bounds[indices["n_positions"]][0]
+            canonical[indices["n_positions"]] = max(n_positions_low, float(n_coins))
+            reset(indices, FILTER_KEYS)
+        entry_ratio = canonical[indices["entry_trailing_grid_ratio"]]
+        if entry_ratio == 0.0:
+            reset(indices, ENTRY_TRAILING_KEYS)
+        elif abs(entry_ratio) >= 1.0:
+            reset(indices, ENTRY_GRID_KEYS)
+        close_ratio = canonical[indices["close_trailing_grid_ratio"]]
+        if close_ratio == 0.0:
+            reset(indices, CLOSE_TRAILING_KEYS)
+        elif abs(close_ratio) >= 1.0:
+            reset(indices, CLOSE_GRID_KEYS)
+    return canonical
+
+
+def calc_individual_hash(individual) -> str:
+    """Hash of an individual's genes; cheaper than calc_hash, which serializes to JSON."""
+    return sha256(np.asarray(individual, dtype=np.float64).tobytes()).hexdigest()
+
+
+class BotParamsLayout:
+    """
+    Precompiled mapping from an individual straight to the flat bot params array accepted by
+    pbr.run_backtest: the BotParams fields of long, then of short, in the order given by
+    pbr.bot_params_fields(). Gives the same values as individual_to_config followed by
+    prep_backtest_args, without building a config per evaluation. Overrides are taken from
+    optimizer_overrides.MAX_OVERRIDES; with any other override, vectorized is False and callers
+    go through individual_to_config and prep_backtest_args instead.
+    """
+
+    def __init__(self, config, overrides_list):
+        fields = list(pbr.bot_params_fields())
+        param_indices = get_param_indices()
+        self.n_fields = len(fields)
+        self.base = np.zeros(2 * self.n_fields)
+        sources, targets = [], []
+        for i, pside in enumerate(["long", "short"]):
+            offset = i * self.n_fields
+            for j, field in enumerate(fields):
+                if field in param_indices[pside]:
+                    sources.append(param_indices[pside][field])
+                    targets.append(offset + j)
+                elif field != "wallet_exposure_limit":  # derived, see pack
+                    self.base[offset + j] = float(config["bot"][pside][field])
+        self.sources = np.array(sources)
+        self.targets = np.array(targets)
+        # field -> [position in long, position in short]
+        position = {field: np.array([j, self.n_fields + j]) for j, field in enumerate(fields)}
+        self.twel = position["total_wallet_exposure_limit"]
+        self.n_positions = position["n_positions"]
+        self.wel = position["wallet_exposure_limit"]
+        # overrides as (target, source) positions: target = max(target, source)
+        max_targets, max_sources = [], []
+        # False if an override can only be applied by optimizer_overrides on a full config
+        self.vectorized = True
+        for override in overrides_list or []:
+            if override in MAX_OVERRIDES:
+                target, source = MAX_OVERRIDES[override]
+                max_targets.extend(position[target])
+                max_sources.extend(position[source])
+            elif override not in NOOP_OVERRIDES:
+                logging.info(
+                    f"override {override} has no vectorized form; building a config per evaluation"
+                )
+                self.vectorized = False
+                break
+        self.fields = fields
+        self.max_targets = np.array(max_targets, dtype=int)
+        self.max_sources = np.array(max_sources, dtype=int)
+
+    def pack(self, individual, n_coins: int) -> np.ndarray:
+        """Bot params array of individual for an exchange with n_coins coins."""
+        values = self.base.copy()
+        values[self.targets] = np.asarray(individual, dtype=np.float64)[self.sources]
+        if len(self.max_targets):
+            values[self.max_targets] = np.maximum(
+                values[self.max_targets], values[self.max_sources]
+            )
+        n_positions = np.clip(values[self.n_positions], 0, n_coins)
+        twel = values[self.twel]
+        values[self.wel] = np.divide(
+            twel, n_positions, out=np.zeros_like(twel), where=n_positions > 0
+        )
+        return values
+
+    def flatten(self, bot_params) -> np.ndarray:
+        """Bot params array of the per-pside bot params dicts returned by prep_backtest_args."""
+        return np.array(
+            [float(bot_params[pside][field]) for pside in ["long", "short"] for field in self.fields]
+        )
+
+    def analysis_config(self, values: np.ndarray, config) -> dict:
+        """The parts of a config expand_analysis reads, for the bot params array values."""
+        return {
+            "bot": {
+                pside: {"total_wallet_exposure_limit": float(values[self.twel[i]])}
+                for i, pside in enumerate(["long", "short"])
+            },
+            "backtest": config["backtest"],
+        }
+
+
+def get_required_metrics(config) -> List[str]:
+    """
+    Returns the analysis metrics needed by optimize.scoring and optimize.limits,
+    reduced to the metric names computed by the Rust backtester.
+    e.g. btc_adg_per_exposure_long -> adg; btc_sterling_ratio_w -> sterling_ratio_w
+    """
+    keys = list(config["optimize"]["scoring"])
+    for key in config["optimize"].get("limits", {}):
+        for prefix in ["penalize_if_greater_than_", "penalize_if_lower_than_"]:
+            if key.startswith(prefix):
+                key = key[len(prefix) :]
+                break
+        keys.append(key)
+    metrics = set()
+    for key in keys:
+        if key.startswith("btc_"):
+            key = key[len("btc_") :]
+        for pside in ["long", "short"]:
+            key = key.replace(f"_per_exposure_{pside}", "")
+        metrics.add(key)
+    return sorted(metrics)
+
+
+# sign of each scoring metric: objectives are minimized, so metrics to maximize get -1.0
+SCORING_WEIGHTS = {
+    "adg": -1.0,
+    "adg_per_exposure_long": -1.0,
+    "adg_per_exposure_short": -1.0,
+    "adg_w": -1.0,
+    "adg_w_per_exposure_long": -1.0,
+    "adg_w_per_exposure_short": -1.0,
+    "btc_adg": -1.0,
+    "btc_adg_per_exposure_long": -1.0,
+    "btc_adg_per_exposure_short": -1.0,
+    "btc_adg_w": -1.0,
+    "btc_adg_w_per_exposure_long": -1.0,
+    "btc_adg_w_per_exposure_short": -1.0,
+    "btc_calmar_ratio": -1.0,
+    "btc_calmar_ratio_w": -1.0,
+    "btc_drawdown_worst": 1.0,
+    "btc_drawdown_worst_mean_1pct": 1.0,
+    "btc_equity_balance_diff_neg_max": 1.0,
+    "btc_equity_balance_diff_neg_mean": 1.0,
+    "btc_equity_balance_diff_pos_max": 1.0,
+    "btc_equity_balance_diff_pos_mean": 1.0,
+    "btc_equity_choppiness": 1.0,
+    "btc_equity_choppiness_w": 1.0,
+    "btc_equity_jerkiness": 1.0,
+    "btc_equity_jerkiness_w": 1.0,
+    "btc_expected_shortfall_1pct": 1.0,
+    "btc_exponential_fit_error": 1.0,
+    "btc_exponential_fit_error_w": 1.0,
+    "btc_gain": -1.0,
+    "btc_gain_per_exposure_long": -1.0,
+    "btc_gain_per_exposure_short": -1.0,
+    "btc_loss_profit_ratio": 1.0,
+    "btc_loss_profit_ratio_w": 1.0,
+    "btc_mdg": -1.0,
+    "btc_mdg_per_exposure_long": -1.0,
+    "btc_mdg_per_exposure_short": -1.0,
+    "btc_mdg_w": -1.0,
+    "btc_mdg_w_per_exposure_long": -1.0,
+    "btc_mdg_w_per_exposure_short": -1.0,
+    "btc_omega_ratio": -1.0,
+    "btc_omega_ratio_w": -1.0,
+    "btc_sharpe_ratio": -1.0,
+    "btc_sharpe_ratio_w": -1.0,
+    "btc_sortino_ratio": -1.0,
+    "btc_sortino_ratio_w": -1.0,
+    "btc_sterling_ratio": -1.0,
+    "btc_sterling_ratio_w": -1.0,
+    "calmar_ratio": -1.0,
+    "calmar_ratio_w": -1.0,
+    "drawdown_worst": 1.0,
+    "drawdown_worst_mean_1pct": 1.0,
+    "equity_balance_diff_neg_max": 1.0,
+    "equity_balance_diff_neg_mean": 1.0,
+    "equity_balance_diff_pos_max": 1.0,
+    "equity_balance_diff_pos_mean": 1.0,
+    "equity_choppiness": 1.0,
+    "equity_choppiness_w": 1.0,
+    "equity_jerkiness": 1.0,
+    "equity_jerkiness_w": 1.0,
+    "expected_shortfall_1pct": 1.0,
+    "exponential_fit_error": 1.0,
+    "exponential_fit_error_w": 1.0,
+    "gain": -1.0,
+    "gain_per_exposure_long": -1.0,
+    "gain_per_exposure_short": -1.0,
+    "loss_profit_ratio": 1.0,
+    "loss_profit_ratio_w": 1.0,
+    "mdg": -1.0,
+    "mdg_per_exposure_long": -1.0,
+    "mdg_per_exposure_short": -1.0,
+    "mdg_w": -1.0,
+    "mdg_w_per_exposure_long": -1.0,
+    "mdg_w_per_exposure_short": -1.0,
+    "omega_ratio": -1.0,
+    "omega_ratio_w": -1.0,
+    "position_held_hours_max": 1.0,
+    "position_held_hours_mean": 1.0,
+    "position_held_hours_median": 1.0,
+    "position_unchanged_hours_max": 1.0,
+    "positions_held_per_day": 1.0,
+    "sharpe_ratio": -1.0,
+    "sharpe_ratio_w": -1.0,
+    "sortino_ratio": -1.0,
+    "sortino_ratio_w": -1.0,
+    "sterling_ratio": -1.0,
+    "sterling_ratio_w": -1.0,
+    "volume_pct_per_day_avg": -1.0,
+    "volume_pct_per_day_avg_w": -1.0,
+}
+
+
+def build_limit_checks(config, scoring_weights=SCORING_WEIGHTS) -> List[dict]:
+    """Penalty checks for config.optimize.limits, as used by calc_fitness."""
+    limit_checks = []
+    limits = config["optimize"].get("limits", {})
+
+    for i, full_key in enumerate(sorted(limits)):
+        bound = limits[full_key]
+
+        if full_key.startswith("penalize_if_greater_than_"):
+            metric = full_key[len("penalize_if_greater_than_") :]
+            penalize_if = "greater"
+        elif full_key.startswith("penalize_if_lower_than_"):
+            metric = full_key[len("penalize_if_lower_than_") :]
+            penalize_if = "lower"
+        else:
+            # Fallback for scoring_weight-based logic
+            metric = full_key
+            weight = scoring_weights.get(metric)
+            if weight is None:
+                continue
+            penalize_if = "lower" if weight < 0 else "greater"
+        suffix = "min" if penalize_if == "lower" else "max"
+
+        limit_checks.append(
+            {
+                "metric_key": f"{metric}_{suffix}",
+                "penalize_if": penalize_if,
+                "bound": bound,
+                "penalty_weight": 1e6,
+            }
+        )
+    return limit_checks
+
+
+def calc_penalty(analyses_combined, limit_checks) -> float:
+    """Penalty added to every objective for the limits analyses_combined exceeds."""
+    modifier = 0.0
+    for check in limit_checks:
+        val = analyses_combined.get(check["metric_key"])
+        if val is None:
+            continue
+
+        if check["penalize_if"] == "greater" and val > check["bound"]:
+            modifier += (val - check["bound"]) * (check["penalty_weight"])
+        elif check["penalize_if"] == "lower" and val < check["bound"]:
+            modifier += (check["bound"] - val) * (check["penalty_weight"])
+    return modifier
+
+
+def calc_fitness(analyses_combined, scoring, limit_checks, scoring_weights=SCORING_WEIGHTS):
+    """Objectives (minimized) for analyses_combined; None if a scoring metric is missing."""
+    modifier = calc_penalty(analyses_combined, limit_checks)
+    scores = []
+    for sk in sorted(scoring):
+        val = analyses_combined.get(f"{sk}_mean")
+        if val is None:
+            return None
+        scores.append(val * scoring_weights[sk] + modifier)
+    return tuple(scores)
+
+
+def hypervolume_reference(scoring, limit_checks, scoring_weights=SCORING_WEIGHTS) -> list:
+    """
+    Hypervolume reference point implied by the limits: for each objective (sorted scoring),
+    the weighted bound of a limit on the same metric, or None if there is none. A config
+    within its limits is never worse than this point, since an objective is the metric's mean
+    and the limit applies to its max (or min).
+    """
+    reference = []
+    for sk in sorted(scoring):
+        weight = scoring_weights[sk]
+        penalize_if, suffix = ("greater", "max") if weight > 0 else ("lower", "min")
+        bounds = [
+            check["bound"]
+            for check in limit_checks
+            if check["metric_key"] == f"{sk}_{suffix}" and check["penalize_if"] == penalize_if
+        ]
+        # of several limits on the metric, the tightest one
+        reference.append(min(bound * weight for bound in bounds) if bounds else None)
+    return reference
+
+
 # ============================================================================
 
 
+def combine_analyses(analyses):
+    analyses_combined = {}
+    keys = analyses[next(iter(analyses))].keys()
+    for key in keys:
+        values = [analysis[key] for analysis in analyses.values()]
+        if not values or any([x == np.inf for x in values]) or any([x is None for x in values]):
+            analyses_combined[f"{key}_mean"] = 0.0
+            analyses_combined[f"{key}_min"] = 0.0
+            analyses_combined[f"{key}_max"] = 0.0
+            analyses_combined[f"{key}_std"] = 0.0
+        else:
+            try:
+                analyses_combined[f"{key}_mean"] = np.mean(values)
+                analyses_combined[f"{key}_min"] = np.min(values)
+                analyses_combined[f"{key}_max"] = np.max(values)
+                analyses_combined[f"{key}_std"] = np.std(values)
+            except Exception as e:
+                print("\n\n debug\n\n")
+                print("key, values", key, values)
+                print(e)
+                traceback.print_exc()
+                raise
+    return analyses_combined
+
+
+def record_to_result(individual, analyses, objectives, config, overrides_list):
+    """Rebuild the full result dict (config + analyses) from a results channel record."""
+    result_config = individual_to_config(individual, optimizer_overrides, overrides_list, config)
+    analyses_combined = combine_analyses(analyses)
+    for i, val in enumerate(objectives):
+        analyses_combined[f"w_{i}"] = val
+    return {
+        **result_config,
+        "analyses_combined": analyses_combined,
+        "analyses": analyses,
+    }
+
+
+class HypervolumeTracker:
+    """
+    Follows the hypervolume of the results writer's Pareto front and detects convergence.
+
+    The reference point comes from the limits (see hypervolume_reference). Objectives without
+    a limit take the worst value among the first reference_warmup results within the limits.
+    Once set, the reference point is kept with the front, so a resumed run measures against
+    the same point.
+
+    With convergence_window > 0, the run has converged once the hypervolume grew by less than
+    convergence_threshold (relative) over the last convergence_window results; this is
+    recorded in CONVERGED_FILENAME, which the optimizer checks to stop.
+    """
+
+    def __init__(self, store: ParetoStore, config: dict, results_dir: str):
+        optimize_config = config["optimize"]
+        self.store = store
+        self.limit_checks = build_limit_checks(config)
+        self.reference = hypervolume_reference(optimize_config["scoring"], self.limit_checks)
+        self.reference_warmup = optimize_config["population_size"]
+        self.window = optimize_config.get("convergence_window", 0)
+        self.threshold = optimize_config.get("convergence_threshold", 0.0)
+        self.converged_path = os.path.join(results_dir, CONVERGED_FILENAME)
+        self.worst = np.full(len(self.reference), -np.inf)
+        self.n_results = 0
+        self.n_feasible = 0
+        self.history = deque()  # (n_results, hypervolume)
+        self.converged = False
+        self.last_update_ts = 0.0
+
+    def add(self, objectives, analyses_combined: dict) -> None:
+        self.n_results += 1
+        if self.store.reference_point is not None:
+            return
+        if calc_penalty(analyses_combined, self.limit_checks) > 0.0:
+            return
+        self.worst = np.maximum(self.worst, objectives)
+        self.n_feasible += 1
+        if None in self.reference and self.n_feasible < self.reference_warmup:
+            return
+        reference = [w if r is None else r for r, w in zip(self.reference, self.worst.tolist())]
+        self.store.set_reference_point(reference)
+        logging.info(f"hypervolume reference point: {reference}")
+
+    def update(self, force: bool = False):
+        """Hypervolume, recomputed every HYPERVOLUME_INTERVAL seconds; None before a reference."""
+        if not force and time.time() - self.last_update_ts < HYPERVOLUME_INTERVAL:
+            return self.history[-1][1] if self.history else None
+        self.last_update_ts = time.time()
+        hv = self.store.hypervolume
+        if hv is None:
+            return None
+        self.history.append((self.n_results, hv))
+        if self.window <= 0 or self.converged:
+            return hv
+        # compare with the latest value at least window results old
+        while len(self.history) > 1 and self.history[1][0] <= self.n_results - self.window:
+            self.history.popleft()
+        n_then, hv_then = self.history[0]
+        if n_then > self.n_results - self.window or hv_then <= 0.0:
+            return hv
+        improvement = (hv - hv_then) / hv_then
+        if improvement < self.threshold:
+            self.converged = True
+            logging.info(
+                f"hypervolume improved by {improvement:.3%} over the last "
+                f"{self.n_results - n_then} results; converged"
+            )
+            with open(self.converged_path + ".tmp", "w") as f:
+                json.dump(
+                    {
+                        "n_results": self.n_results,
+                        "hypervolume": hv,
+                        "improvement": improvement,
+                        "window": self.window,
+                        "threshold": self.threshold,
+                    },
+                    f,
+                    indent=4,
+                )
+            os.replace(self.converged_path + ".tmp", self.converged_path)
+        return hv
+
+
+def make_convergence_check(results_dir: str, interval: float = 1.0):
+    """Function telling whether the run has converged, checking for the marker once per interval."""
+    path = os.path.join(results_dir, CONVERGED_FILENAME)
+    state = {"last_check": 0.0, "converged": False}
+
+    def converged() -> bool:
+        if not state["converged"] and time.time() - state["last_check"] >= interval:
+            state["last_check"] = time.time()
+            state["converged"] = os.path.exists(path)
+        return state["converged"]
+
+    return converged
+
+
 def results_writer_process(
-    queue,
+    channel_dir,
+    done_event,
+    config,
     results_dir,
     sig_digits,
     flush_interval,
     *,
     compress: bool = True,
     write_all_results: bool = True,
+    results_format: str = "msgpack",
+    poll_interval: float = 0.05,
+    status=None,
 ):
     logging.basicConfig(
         level=logging.INFO,
@@ -177,53 +728,91 @@ def results_writer_process(
         flush_interval=flush_interval,
         log_name="optimizer.pareto",
     )
-
-    pareto_front = []
-    objectives_dict = {}
-    index_to_entry = {}
-    iteration = 0
-    n_objectives = None
-    scoring_keys = None
+    reader = ResultsReader(channel_dir)
+    overrides_list = config.get("optimize", {}).get("enable_overrides", [])
+    tracker = HypervolumeTracker(store, config, results_dir)
 
     results_filename = os.path.join(results_dir, "all_results.bin")
+    columnar = None
+    if write_all_results and results_format == "columnar":
+        param_names = [
+            f"{pside}_{key}" for pside, keys in get_param_indices().items() for key in keys
+        ]
+        columnar = ColumnarResultsWriter(results_dir, param_names)
+        write_all_results = False  # no all_results.bin
+    last_columnar_flush = time.time()
+    results_index = None
 
     try:
         with open(results_filename, "ab") if write_all_results else nullcontext() as f:
             packer = msgpack.Packer(use_bin_type=True) if write_all_results else None
+            if write_all_results:
+                results_index = ResultsIndexWriter(
+                    results_filename, len(config["optimize"]["scoring"])
+                )
+            keyframe = None
             prev_data = None
             counter = 0
             while True:
-                data = queue.get()
-                if data == "DONE":
-                    store.flush_now()
-                    break
-                if write_all_results:
-                    try:
-                        # Write raw results (diffed if compress enabled)
-                        if compress:
-                            if prev_data is None or counter % 100 == 0:
-                                output_data = make_json_serializable(data)
+                # check before polling so records written before the signal are drained
+                done = done_event.is_set()
+                records = reader.poll()
+                for individual, analyses, objectives in records:
+                    data = record_to_result(individual, analyses, objectives, config, overrides_list)
+                    if write_all_results:
+                        try:
+                            # Write raw results (diffed if compress enabled)
+                            offset = f.tell()
+                            if compress:
+                                if prev_data is None or counter % 100 == 0:
+                                    output_data = make_json_serializable(data)
+                                    keyframe = offset
+                                else:
+                                    diff = generate_incremental_diff(prev_data, data)
+                                    output_data = make_json_serializable(diff)
+                                counter += 1
+                                prev_data = data
                             else:
-                                diff = generate_incremental_diff(prev_data, data)
-                                output_data = make_json_serializable(diff)
-                            counter += 1
-                            prev_data = data
-                        else:
-                            output_data = data
-
-                        if scoring_keys is None:
-                            scoring_keys = data["optimize"]["scoring"]
-                            n_objectives = len(scoring_keys)
-
-                        # --- Write to all_results.bin ---
-                        f.write(packer.pack(output_data))
-                        f.flush()
+                                output_data = data
+                                keyframe = offset
+
+                            # --- Write to all_results.bin ---
+                            f.write(packer.pack(output_data))
+                            results_index.add(offset, keyframe, objectives)
+                        except Exception as e:
+                            logging.error(f"Error writing results: {e}")
+                    if columnar is not None:
+                        try:
+                            columnar.append(individual, data["analyses_combined"], analyses)
+                        except Exception as e:
+                            logging.error(f"Error writing results: {e}")
+                    try:
+                        tracker.add(objectives, data["analyses_combined"])
+                        store.add_entry(data, params=individual)
                     except Exception as e:
-                        logging.error(f"Error writing results: {e}")
+                        logging.error(f"ParetoStore error: {e}")
+                if write_all_results and records:
+                    f.flush()
+                    results_index.flush()
+                if status is not None:
+                    status[WRITER_RECORDS_WRITTEN] += len(records)
+                    status[WRITER_BACKLOG] = reader.backlog()
+                    status[WRITER_FRONT_SIZE] = len(store)
                 try:
-                    store.add_entry(data)
+                    hv = tracker.update(force=done)
                 except Exception as e:
-                    logging.error(f"ParetoStore error: {e}")
+                    logging.error(f"Hypervolume error: {e}")
+                    hv = None
+                if status is not None:
+                    status[WRITER_HYPERVOLUME] = np.nan if hv is None else hv
+                if columnar is not None and time.time() - last_columnar_flush >= flush_interval:
+                    columnar.flush()
+                    last_columnar_flush = time.time()
+                if done:
+                    store.flush_now()
+                    break
+                if not records:
+                    time.sleep(poll_interval)
 
     except Exception as e:
         logging.error(f"Results writer process error: {e}")
@@ -239,25 +828,33 @@ def results_writer_process(
         except Exception as e1:
             logging.error(f"Unable to flush Pareto front on shutdown: {e1}")
             traceback.print_exc()
+        if results_index is not None:
+            results_index.close()
+        if columnar is not None:
+            try:
+                columnar.close()
+            except Exception as e1:
+                logging.error(f"Unable to write columnar results on shutdown: {e1}")
 
 
 def create_shared_memory_file(hlcvs):
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
+    temp_file = tempfile.NamedTemporaryFile(dir=get_shared_memory_dir(), delete=False)
     logging.info(f"Creating shared memory file: {temp_file.name}...")
     shared_memory_file = temp_file.name
     temp_file.close()
 
     try:
-        total_size = hlcvs.nbytes
         chunk_size = 1024 * 1024  # 1 MB chunks
-        hlcvs_bytes = hlcvs.tobytes()
+        # slices of a memoryview are written from the array's own buffer, without a copy
+        hlcvs_buffer = memoryview(np.ascontiguousarray(hlcvs)).cast("B")
+        total_size = len(hlcvs_buffer)
 
         with open(shared_memory_file, "wb") as f:
             with tqdm(
                 total=total_size, unit="B", unit_scale=True, desc="Writing to shared memory"
             ) as pbar:
-                for i in range(0, len(hlcvs_bytes), chunk_size):
-                    chunk = hlcvs_bytes[i : i + chunk_size]
+                for i in range(0, total_size, chunk_size):
+                    chunk = hlcvs_buffer[i : i + chunk_size]
                     f.write(chunk)
                     pbar.update(len(chunk))
 
@@ -268,6 +865,67 @@ def create_shared_memory_file(hlcvs):
     return shared_memory_file
 
 
+def get_shared_memory_file(array, key=None):
+    """
+    (path, offset) of a file holding array's data for Rust to map: the cache file itself if
+    array is mapped from an uncompressed hlcvs cache, else the shared dataset named key,
+    attached to or created, else a new private shared memory file.
+    """
+    mapped = get_mapped_file_offset(array)
+    if mapped is not None:
+        logging.info(f"Mapping cache file {mapped[0]} in place")
+        return mapped
+    required_space = array.nbytes * 1.1  # Add 10% buffer
+    check_disk_space(get_shared_memory_dir(), required_space)
+    if key is not None:
+        return get_registry().attach(key, array), 0
+    return create_shared_memory_file(array), 0
+
+
+def remove_shared_memory_files(datasets):
+    """
+    Delete the private shared memory files created by prepare_shared_memory_datasets, and
+    detach from its shared datasets.
+    """
+    registry = get_registry()
+    for key_files, key_offsets in [
+        ("shared_memory_files", "hlcvs_offsets"),
+        ("btc_usd_shared_memory_files", "btc_usd_offsets"),
+    ]:
+        for exchange, path in datasets[key_files].items():
+            if datasets.get(key_offsets, {}).get(exchange, 0):
+                continue  # a cache file mapped in place
+            if (key := registry.key_of(path)) is not None:
+                registry.detach(key)
+            elif path and os.path.exists(path):
+                logging.info(f"Removing shared memory file: {path}")
+                try:
+                    os.unlink(path)
+                except Exception as e:
+                    logging.error(f"Error removing shared memory file: {e}")
+
+
+def size_worker_pool(config, evaluate_fn, genes) -> int:
+    """
+    Number of optimizer worker processes: as many as the cores and the available memory allow,
+    given the peak memory of one evaluation of genes, capped by optimize.n_cpus (0: no cap).
+    """
+    max_workers = config["optimize"]["n_cpus"]
+    if not config["optimize"].get("probe_worker_memory", True):
+        return max_workers or available_cores()
+    logging.info("Probing time and memory of one evaluation...")
+    probe = probe_worker(evaluate_fn, genes)
+    available = available_memory()
+    n_workers, limited_by = choose_n_workers(probe["peak_bytes"], max_workers, available)
+    peak = "unknown" if probe["peak_bytes"] is None else f"{probe['peak_bytes'] / 1024**3:.2f} GB"
+    free = "unknown" if available is None else f"{available / 1024**3:.2f} GB"
+    logging.info(
+        f"One evaluation: {probe['seconds']:.2f}s, peak worker memory {peak}. Available memory "
+        f"{free}, {available_cores()} cores: using {n_workers} workers (limited by {limited_by})"
+    )
+    return n_workers
+
+
 def check_disk_space(path, required_space):
     total, used, free = shutil.disk_usage(path)
     logging.info(
@@ -392,10 +1050,10 @@ def config_to_individual(config, bounds, sig_digits=None):
 
 
 @contextmanager
-def managed_mmap(filename, dtype, shape):
+def managed_mmap(filename, dtype, shape, offset=0):
     mmap = None
     try:
-        mmap = np.memmap(filename, dtype=dtype, mode="r", shape=shape)
+        mmap = np.memmap(filename, dtype=dtype, mode="r", shape=shape, offset=offset)
         yield mmap
     except FileNotFoundError:
         if shutdown_event.is_set():
@@ -408,10 +1066,14 @@ def managed_mmap(filename, dtype, shape):
 
 
 def validate_array(arr, name):
-    if np.any(np.isnan(arr)):
-        raise ValueError(f"{name} contains NaN values")
-    if np.any(np.isinf(arr)):
-        raise ValueError(f"{name} contains inf values")
+    # in chunks along the first axis, so a memory-mapped array is never copied whole
+    step = max(1, (1 << 24) // max(1, arr[0].size))
+    for i in range(0, len(arr), step):
+        chunk = arr[i : i + step]
+        if np.any(np.isnan(chunk)):
+            raise ValueError(f"{name} contains NaN values")
+        if np.any(np.isinf(chunk)):
+            raise ValueError(f"{name} contains inf values")
 
 
 class Evaluator:
@@ -424,9 +1086,11 @@ class Evaluator:
         btc_usd_dtypes,
         msss,
         config,
-        results_queue,
+        results_channel,
         seen_hashes=None,
-        duplicate_counter=None,
+        evaluation_cache=None,
+        hlcvs_offsets=None,
+        btc_usd_offsets=None,
     ):
         logging.info("Initializing Evaluator...")
         self.shared_memory_files = shared_memory_files
@@ -434,6 +1098,11 @@ class Evaluator:
         self.hlcvs_dtypes = hlcvs_dtypes
         self.btc_usd_shared_memory_files = btc_usd_shared_memory_files
         self.btc_usd_dtypes = btc_usd_dtypes
+        # byte offsets of the data within the files; nonzero for cache files mapped in place
+        self.hlcvs_offsets = {ex: (hlcvs_offsets or {}).get(ex, 0) for ex in shared_memory_files}
+        self.btc_usd_offsets = {
+            ex: (btc_usd_offsets or {}).get(ex, 0) for ex in btc_usd_shared_memory_files
+        }
         self.msss = msss
         self.exchanges = list(shared_memory_files.keys())
 
@@ -441,115 +1110,44 @@ class Evaluator:
         self.shared_hlcvs_np = {}
         self.exchange_params = {}
         self.backtest_params = {}
+        self.required_metrics = None  # None: all metrics are computed
         for exchange in self.exchanges:
             logging.info(f"Setting up managed_mmap for {exchange}...")
             self.mmap_contexts[exchange] = managed_mmap(
                 self.shared_memory_files[exchange],
                 self.hlcvs_dtypes[exchange],
                 self.hlcvs_shapes[exchange],
+                self.hlcvs_offsets[exchange],
             )
             self.shared_hlcvs_np[exchange] = self.mmap_contexts[exchange].__enter__()
             _, self.exchange_params[exchange], self.backtest_params[exchange] = prep_backtest_args(
                 config, self.msss[exchange], exchange
             )
+            if not config["optimize"].get("compute_all_metrics", False):
+                # let Rust skip metrics which are used neither for scoring nor for limits
+                self.required_metrics = get_required_metrics(config)
+                self.backtest_params[exchange]["metrics"] = self.required_metrics
             logging.info(f"mmap_context entered successfully for {exchange}.")
 
         self.config = config
         logging.info("Evaluator initialization complete.")
-        self.results_queue = results_queue
-        self.seen_hashes = seen_hashes if seen_hashes is not None else {}
-        self.duplicate_counter = duplicate_counter
+        self.results_channel = results_channel
+        if seen_hashes is None:
+            seen_hashes = DedupTable.create(
+                capacity_for(config["optimize"]["iters"]), len(config["optimize"]["scoring"])
+            )
+        self.seen_hashes = seen_hashes
+        self.evaluation_cache = evaluation_cache
+        if evaluation_cache is not None:
+            self.dataset_hashes = {
+                exchange: get_cache_hash(config, exchange) for exchange in self.exchanges
+            }
         self.bounds = extract_bounds_tuple_list_from_config(self.config)
         self.sig_digits = config.get("optimize", {}).get("round_to_n_significant_digits", 6)
-        self.scoring_weights = {
-            "adg": -1.0,
-            "adg_per_exposure_long": -1.0,
-            "adg_per_exposure_short": -1.0,
-            "adg_w": -1.0,
-            "adg_w_per_exposure_long": -1.0,
-            "adg_w_per_exposure_short": -1.0,
-            "btc_adg": -1.0,
-            "btc_adg_per_exposure_long": -1.0,
-            "btc_adg_per_exposure_short": -1.0,
-            "btc_adg_w": -1.0,
-            "btc_adg_w_per_exposure_long": -1.0,
-            "btc_adg_w_per_exposure_short": -1.0,
-            "btc_calmar_ratio": -1.0,
-            "btc_calmar_ratio_w": -1.0,
-            "btc_drawdown_worst": 1.0,
-            "btc_drawdown_worst_mean_1pct": 1.0,
-            "btc_equity_balance_diff_neg_max": 1.0,
-            "btc_equity_balance_diff_neg_mean": 1.0,
-            "btc_equity_balance_diff_pos_max": 1.0,
-            "btc_equity_balance_diff_pos_mean": 1.0,
-            "btc_equity_choppiness": 1.0,
-            "btc_equity_choppiness_w": 1.0,
-            "btc_equity_jerkiness": 1.0,
-            "btc_equity_jerkiness_w": 1.0,
-            "btc_expected_shortfall_1pct": 1.0,
-            "btc_exponential_fit_error": 1.0,
-            "btc_exponential_fit_error_w": 1.0,
-            "btc_gain": -1.0,
-            "btc_gain_per_exposure_long": -1.0,
-            "btc_gain_per_exposure_short": -1.0,
-            "btc_loss_profit_ratio": 1.0,
-            "btc_loss_profit_ratio_w": 1.0,
-            "btc_mdg": -1.0,
-            "btc_mdg_per_exposure_long": -1.0,
-            "btc_mdg_per_exposure_short": -1.0,
-            "btc_mdg_w": -1.0,
-            "btc_mdg_w_per_exposure_long": -1.0,
-            "btc_mdg_w_per_exposure_short": -1.0,
-            "btc_omega_ratio": -1.0,
-            "btc_omega_ratio_w": -1.0,
-            "btc_sharpe_ratio": -1.0,
-            "btc_sharpe_ratio_w": -1.0,
-            "btc_sortino_ratio": -1.0,
-            "btc_sortino_ratio_w": -1.0,
-            "btc_sterling_ratio": -1.0,
-            "btc_sterling_ratio_w": -1.0,
-            "calmar_ratio": -1.0,
-            "calmar_ratio_w": -1.0,
-            "drawdown_worst": 1.0,
-            "drawdown_worst_mean_1pct": 1.0,
-            "equity_balance_diff_neg_max": 1.0,
-            "equity_balance_diff_neg_mean": 1.0,
-            "equity_balance_diff_pos_max": 1.0,
-            "equity_balance_diff_pos_mean": 1.0,
-            "equity_choppiness": 1.0,
-            "equity_choppiness_w": 1.0,
-            "equity_jerkiness": 1.0,
-            "equity_jerkiness_w": 1.0,
-            "expected_shortfall_1pct": 1.0,
-            "exponential_fit_error": 1.0,
-            "exponential_fit_error_w": 1.0,
-            "gain": -1.0,
-            "gain_per_exposure_long": -1.0,
-            "gain_per_exposure_short": -1.0,
-            "loss_profit_ratio": 1.0,
-            "loss_profit_ratio_w": 1.0,
-            "mdg": -1.0,
-            "mdg_per_exposure_long": -1.0,
-            "mdg_per_exposure_short": -1.0,
-            "mdg_w": -1.0,
-            "mdg_w_per_exposure_long": -1.0,
-            "mdg_w_per_exposure_short": -1.0,
-            "omega_ratio": -1.0,
-            "omega_ratio_w": -1.0,
-            "position_held_hours_max": 1.0,
-            "position_held_hours_mean": 1.0,
-            "position_held_hours_median": 1.0,
-            "position_unchanged_hours_max": 1.0,
-            "positions_held_per_day": 1.0,
-            "sharpe_ratio": -1.0,
-            "sharpe_ratio_w": -1.0,
-            "sortino_ratio": -1.0,
-            "sortino_ratio_w": -1.0,
-            "sterling_ratio": -1.0,
-            "sterling_ratio_w": -1.0,
-            "volume_pct_per_day_avg": -1.0,
-            "volume_pct_per_day_avg_w": -1.0,
-        }
+        self.param_indices = get_param_indices()
+        self.bot_params_layouts = {}  # tuple(overrides_list) -> BotParamsLayout
+        self.n_coins = max(len(params["coins"]) for params in self.backtest_params.values())
+        self.scoring_weights = SCORING_WEIGHTS
 
         self.build_limit_checks()
 
@@ -631,14 +1229,43 @@ class Evaluator:
                 perturbed.append(np.random.uniform(low, high))
         return perturbed
 
-    def evaluate(self, individual, overrides_list):
-        individual[:] = enforce_bounds(individual, self.bounds, self.sig_digits)
-        config = individual_to_config(individual, optimizer_overrides, overrides_list, self.config)
-        individual_hash = calc_hash(individual)
-        if individual_hash in self.seen_hashes:
-            existing_score = self.seen_hashes[individual_hash]
-            self.duplicate_counter["count"] += 1
-            dup_ct = self.duplicate_counter["count"]
+    def canonicalize(self, individual):
+        return canonicalize_individual(
+            enforce_bounds(individual, self.bounds, self.sig_digits),
+            self.bounds,
+            self.param_indices,
+            self.n_coins,
+        )
+
+    def evaluate(self, individual, overrides_list, claimed=False):
+        """
+        Objectives of individual. claimed: individual is canonical genes already claimed with
+        claim, e.g. by the optimizer before it handed the task over.
+        """
+        if claimed:
+            canonical = list(individual)
+        else:
+            canonical, existing_score = self.claim(individual)
+            if canonical is None:
+                return existing_score
+        objectives, analyses = self.backtest(canonical, overrides_list)
+        # the writer rebuilds config and combined analyses from the evaluated genes
+        self.results_channel.put(canonical, analyses, objectives)
+        return objectives
+
+    def claim(self, individual):
+        """
+        Claims the canonical form of individual in seen_hashes. Inactive params are normalized
+        in the canonical form only, so duplicates are detected by behavior while the
+        individual keeps its genes for mutation and crossover. A duplicate is replaced in place
+        by a perturbation. Returns (canonical genes to evaluate, None), or (None, objectives of
+        the earlier evaluation) if every perturbation was a duplicate too.
+        """
+        canonical = self.canonicalize(individual)
+        individual_hash = calc_individual_hash(canonical)
+        if not self.seen_hashes.claim(individual_hash):
+            existing_score = self.seen_hashes.get(individual_hash)
+            dup_ct = self.seen_hashes.increment_duplicates()
             perturbation_funcs = [
                 self.perturb_x_pct,
                 self.perturb_step_digits,
@@ -648,136 +1275,98 @@ class Evaluator:
                 self.perturb_large_uniform,
             ]
             for perturb_fn in perturbation_funcs:
-                perturbed = perturb_fn(individual)
-                perturbed = enforce_bounds(perturbed, self.bounds, self.sig_digits)
-                new_hash = calc_hash(perturbed)
-                if new_hash not in self.seen_hashes:
+                perturbed = enforce_bounds(perturb_fn(individual), self.bounds, self.sig_digits)
+                perturbed_canonical = self.canonicalize(perturbed)
+                new_hash = calc_individual_hash(perturbed_canonical)
+                if self.seen_hashes.claim(new_hash):
                     logging.info(
                         f"[DUPLICATE {dup_ct}] resolved with {perturb_fn.__name__} Hash: {new_hash}"
                     )
                     individual[:] = perturbed
-                    self.seen_hashes[new_hash] = None
-                    config = individual_to_config(
-                        perturbed, optimizer_overrides, overrides_list, self.config
-                    )
-                    break
-            else:
-                logging.info(f"[DUPLICATE {dup_ct}] All perturbations failed.")
-                if existing_score is not None:
-                    return existing_score
+                    return perturbed_canonical, None
+            logging.info(f"[DUPLICATE {dup_ct}] All perturbations failed.")
+            self.seen_hashes.increment_failed_perturbations()
+            if existing_score is not None:
+                return None, existing_score
+        return canonical, None
+
+    def backtest(self, individual, overrides_list):
+        """(objectives, per-exchange analyses) of canonical genes claimed with claim."""
+        # the full config is only built for results that get persisted, by the results writer
+        layout = self.get_bot_params_layout(overrides_list)
+        if layout.vectorized:
+            bot_params = {
+                exchange: layout.pack(individual, len(self.backtest_params[exchange]["coins"]))
+                for exchange in self.exchanges
+            }
         else:
-            self.seen_hashes[individual_hash] = None
-        analyses = {}
-        for exchange in self.exchanges:
-            bot_params, _, _ = prep_backtest_args(
-                config,
-                [],
-                exchange,
-                exchange_params=self.exchange_params[exchange],
-                backtest_params=self.backtest_params[exchange],
+            config = individual_to_config(
+                individual, optimizer_overrides, overrides_list, self.config
             )
-            fills, equities_usd, equities_btc, analysis_usd, analysis_btc = pbr.run_backtest(
-                self.shared_memory_files[exchange],
-                self.hlcvs_shapes[exchange],
-                self.hlcvs_dtypes[exchange].str,
-                self.btc_usd_shared_memory_files[exchange],
-                self.btc_usd_dtypes[exchange].str,
-                bot_params,
-                self.exchange_params[exchange],
-                self.backtest_params[exchange],
+            bot_params = {
+                exchange: layout.flatten(
+                    prep_backtest_args(
+                        config,
+                        self.msss[exchange],
+                        exchange,
+                        self.exchange_params[exchange],
+                        self.backtest_params[exchange],
+                    )[0]
+                )
+                for exchange in self.exchanges
+            }
+        analyses = None
+        if self.evaluation_cache is not None:
+            cache_key = evaluation_key(
+                self.dataset_hashes,
+                {exchange: values.tolist() for exchange, values in bot_params.items()},
+                self.exchange_params,
+                self.backtest_params,
             )
-            analyses[exchange] = expand_analysis(analysis_usd, analysis_btc, fills, config)
-        analyses_combined = self.combine_analyses(analyses)
-        objectives = self.calc_fitness(analyses_combined)
-        for i, val in enumerate(objectives):
-            analyses_combined[f"w_{i}"] = val
-        data = {
-            **config,
-            "analyses_combined": analyses_combined,
-            "analyses": analyses,
-        }
-        self.results_queue.put(data)
-        actual_hash = calc_hash(individual)
-        self.seen_hashes[actual_hash] = tuple(objectives)
-        return tuple(objectives)
-
-    def combine_analyses(self, analyses):
-        analyses_combined = {}
-        keys = analyses[next(iter(analyses))].keys()
-        for key in keys:
-            values = [analysis[key] for analysis in analyses.values()]
-            if not values or any([x == np.inf for x in values]) or any([x is None for x in values]):
-                analyses_combined[f"{key}_mean"] = 0.0
-                analyses_combined[f"{key}_min"] = 0.0
-                analyses_combined[f"{key}_max"] = 0.0
-                analyses_combined[f"{key}_std"] = 0.0
-            else:
-                try:
-                    analyses_combined[f"{key}_mean"] = np.mean(values)
-                    analyses_combined[f"{key}_min"] = np.min(values)
-                    analyses_combined[f"{key}_max"] = np.max(values)
-                    analyses_combined[f"{key}_std"] = np.std(values)
-                except Exception as e:
-                    print("\n\n debug\n\n")
-                    print("key, values", key, values)
-                    print(e)
-                    traceback.print_exc()
-                    raise
-        return analyses_combined
+            analyses = self.evaluation_cache.get(cache_key, self.required_metrics)
+        if analyses is None:
+            analyses = {}
+            for exchange in self.exchanges:
+                fills, equities_usd, equities_btc, analysis_usd, analysis_btc = pbr.run_backtest(
+                    self.shared_memory_files[exchange],
+                    self.hlcvs_shapes[exchange],
+                    self.hlcvs_dtypes[exchange].str,
+                    self.btc_usd_shared_memory_files[exchange],
+                    self.btc_usd_dtypes[exchange].str,
+                    bot_params[exchange],
+                    self.exchange_params[exchange],
+                    self.backtest_params[exchange],
+                    self.hlcvs_offsets[exchange],
+                    self.btc_usd_offsets[exchange],
+                )
+                analyses[exchange] = expand_analysis(
+                    analysis_usd,
+                    analysis_btc,
+                    fills,
+                    layout.analysis_config(bot_params[exchange], self.config),
+                )
+            if self.evaluation_cache is not None:
+                self.evaluation_cache.put(cache_key, analyses, self.required_metrics)
+        objectives = tuple(self.calc_fitness(combine_analyses(analyses)))
+        self.seen_hashes[calc_individual_hash(individual)] = objectives
+        return objectives, analyses
+
+    def get_bot_params_layout(self, overrides_list) -> BotParamsLayout:
+        key = tuple(overrides_list or [])
+        if key not in self.bot_params_layouts:
+            self.bot_params_layouts[key] = BotParamsLayout(self.config, overrides_list)
+        return self.bot_params_layouts[key]
 
     def build_limit_checks(self):
-        self.limit_checks = []
-        limits = self.config["optimize"].get("limits", {})
-        scoring_weights = self.scoring_weights
-
-        for i, full_key in enumerate(sorted(limits)):
-            bound = limits[full_key]
-
-            if full_key.startswith("penalize_if_greater_than_"):
-                metric = full_key[len("penalize_if_greater_than_") :]
-                penalize_if = "greater"
-            elif full_key.startswith("penalize_if_lower_than_"):
-                metric = full_key[len("penalize_if_lower_than_") :]
-                penalize_if = "lower"
-            else:
-                # Fallback for scoring_weight-based logic
-                metric = full_key
-                weight = scoring_weights.get(metric)
-                if weight is None:
-                    continue
-                penalize_if = "lower" if weight < 0 else "greater"
-            suffix = "min" if penalize_if == "lower" else "max"
-
-            self.limit_checks.append(
-                {
-                    "metric_key": f"{metric}_{suffix}",
-                    "penalize_if": penalize_if,
-                    "bound": bound,
-                    "penalty_weight": 1e6,
-                }
-            )
+        self.limit_checks = build_limit_checks(self.config, self.scoring_weights)
 
     def calc_fitness(self, analyses_combined):
-        modifier = 0.0
-        for check in self.limit_checks:
-            val = analyses_combined.get(check["metric_key"])
-            if val is None:
-                continue
-
-            if check["penalize_if"] == "greater" and val > check["bound"]:
-                modifier += (val - check["bound"]) * (check["penalty_weight"])
-            elif check["penalize_if"] == "lower" and val < check["bound"]:
-                modifier += (check["bound"] - val) * (check["penalty_weight"])
-
-        scores = []
-        for sk in sorted(self.config["optimize"]["scoring"]):
-            val = analyses_combined.get(f"{sk}_mean")
-            if val is None:
-                val = analyses_combined.get(f"{sk}_mean")
-            if val is None:
-                return None
-            scores.append(val * self.scoring_weights[sk] + modifier)
-        return tuple(scores)
+        return calc_fitness(
+            analyses_combined,
+            self.config["optimize"]["scoring"],
+            self.limit_checks,
+            self.scoring_weights,
+        )
 
     def __del__(self):
         if hasattr(self, "mmap_contexts"):
@@ -800,6 +1389,7 @@ class Evaluator:
                 self.shared_memory_files[exchange],
                 self.hlcvs_dtypes[exchange],
                 self.hlcvs_shapes[exchange],
+                self.hlcvs_offsets[exchange],
             )
             self.shared_hlcvs_np[exchange] = self.mmap_contexts[exchange].__enter__()
             if self.shared_hlcvs_np[exchange] is None:
@@ -818,6 +1408,46 @@ def add_extra_options(parser):
         default=None,
         help="Start with given live configs. Single json file or dir with multiple json files",
     )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        required=False,
+        dest="resume",
+        default=None,
+        help="Resume an interrupted run from the checkpoint in the given optimize_results dir",
+    )
+    parser.add_argument(
+        "--island_dir",
+        type=str,
+        required=False,
+        dest="island_dir",
+        default=None,
+        help="Island model: directory shared by all islands, also used as results dir",
+    )
+    parser.add_argument(
+        "--island_id",
+        type=int,
+        required=False,
+        dest="island_id",
+        default=0,
+        help="Island model: id of this island, 0..n_islands-1. Island 0 writes the results",
+    )
+    parser.add_argument(
+        "--n_islands",
+        type=int,
+        required=False,
+        dest="n_islands",
+        default=1,
+        help="Island model: total number of islands",
+    )
+    parser.add_argument(
+        "--listen",
+        type=str,
+        required=False,
+        dest="listen",
+        default=None,
+        help="host:port to accept remote evaluation workers on (see src/optimize_worker.py)",
+    )
 
 
 def extract_configs(path):
@@ -874,6 +1504,197 @@ def configs_to_individuals(cfgs, bounds, sig_digits=0):
     return list(inds.values())
 
 
+def check_shared_memory_datasets_budget(config, loaded: dict) -> bool:
+    """
+    Warn if the shared memory files of the datasets in loaded ({exchange: (hlcvs,
+    btc_usd_prices)}) won't fit, before any of them is written.
+    """
+    required = 0
+    for exchange, (hlcvs, btc_usd_prices) in loaded.items():
+        hlcvs_key, btc_usd_key = get_shared_dataset_keys(config, exchange)
+        required += shared_memory_bytes_needed(hlcvs, hlcvs_key)
+        if config["backtest"].get("use_btc_collateral", False):
+            required += shared_memory_bytes_needed(btc_usd_prices, btc_usd_key)
+        else:
+            required += hlcvs.shape[0] * np.dtype(np.float64).itemsize
+    return check_shared_memory_budget(required * 1.1, get_shared_memory_dir())
+
+
+async def prepare_shared_memory_datasets(config):
+    """
+    Fetch/load hlcvs per exchange (or combined) and write them and the BTC/USD prices to
+    shared memory files, or map uncompressed cache files in place. Sets config["backtest"]["coins"].
+    Returns a dict of per-exchange file paths, data offsets, shapes, dtypes and market specific
+    settings.
+    """
+    # Prepare data for each exchange
+    hlcvs_dict = {}
+    shared_memory_files = {}
+    hlcvs_offsets = {}
+    hlcvs_shapes = {}
+    hlcvs_dtypes = {}
+    msss = {}
+
+    # NEW: Store per-exchange BTC arrays in a dict,
+    # and store their shared-memory file names in another dict.
+    btc_usd_data_dict = {}
+    btc_usd_shared_memory_files = {}
+    btc_usd_offsets = {}
+    btc_usd_dtypes = {}
+
+    config["backtest"]["coins"] = {}
+    if config["backtest"]["combine_ohlcvs"]:
+        exchange = "combined"
+        coins, hlcvs, mss, results_path, cache_dir, btc_usd_prices = await prepare_hlcvs_mss(
+            config, exchange
+        )
+        exchange_preference = defaultdict(list)
+        for coin in coins:
+            exchange_preference[mss[coin]["exchange"]].append(coin)
+        for ex in exchange_preference:
+            logging.info(f"chose {ex} for {','.join(exchange_preference[ex])}")
+        config["backtest"]["coins"][exchange] = coins
+        hlcvs_dict[exchange] = hlcvs
+        hlcvs_shapes[exchange] = hlcvs.shape
+        hlcvs_dtypes[exchange] = hlcvs.dtype
+        msss[exchange] = mss
+        check_shared_memory_datasets_budget(config, {exchange: (hlcvs, btc_usd_prices)})
+        logging.info(f"Starting to create shared memory file for {exchange}...")
+        validate_array(hlcvs, "hlcvs")
+        hlcvs_key, btc_usd_key = get_shared_dataset_keys(config, exchange)
+        shared_memory_file, hlcvs_offsets[exchange] = get_shared_memory_file(hlcvs, hlcvs_key)
+        shared_memory_files[exchange] = shared_memory_file
+        if config["backtest"].get("use_btc_collateral", False):
+            # Use the fetched array
+            btc_usd_data_dict[exchange] = btc_usd_prices
+        else:
+            # Fall back to all ones
+            btc_usd_data_dict[exchange] = np.ones(hlcvs.shape[0], dtype=np.float64)
+        validate_array(btc_usd_data_dict[exchange], f"btc_usd_data for {exchange}")
+        (
+            btc_usd_shared_memory_files[exchange],
+            btc_usd_offsets[exchange],
+        ) = get_shared_memory_file(btc_usd_data_dict[exchange], btc_usd_key)
+        btc_usd_dtypes[exchange] = btc_usd_data_dict[exchange].dtype
+        logging.info(f"Finished creating shared memory file for {exchange}: {shared_memory_file}")
+    else:
+        tasks = {}
+        for exchange in config["backtest"]["exchanges"]:
+            tasks[exchange] = asyncio.create_task(prepare_hlcvs_mss(config, exchange))
+        loaded = {}
+        for exchange in config["backtest"]["exchanges"]:
+            loaded[exchange] = await tasks[exchange]
+        # all datasets are loaded before any is written, so a lack of space shows up front
+        check_shared_memory_datasets_budget(
+            config, {exchange: (res[1], res[5]) for exchange, res in loaded.items()}
+        )
+        for exchange in config["backtest"]["exchanges"]:
+            coins, hlcvs, mss, results_path, cache_dir, btc_usd_prices = loaded[exchange]
+            config["backtest"]["coins"][exchange] = coins
+            hlcvs_dict[exchange] = hlcvs
+            hlcvs_shapes[exchange] = hlcvs.shape
+            hlcvs_dtypes[exchange] = hlcvs.dtype
+            msss[exchange] = mss
+            logging.info(f"Starting to create shared memory file for {exchange}...")
+            validate_array(hlcvs, "hlcvs")
+            hlcvs_key, btc_usd_key = get_shared_dataset_keys(config, exchange)
+            shared_memory_file, hlcvs_offsets[exchange] = get_shared_memory_file(
+                hlcvs, hlcvs_key
+            )
+            shared_memory_files[exchange] = shared_memory_file
+            # Create the BTC array for this exchange
+            if config["backtest"].get("use_btc_collateral", False):
+                btc_usd_data_dict[exchange] = btc_usd_prices
+            else:
+                btc_usd_data_dict[exchange] = np.ones(hlcvs.shape[0], dtype=np.float64)
+
+            validate_array(btc_usd_data_dict[exchange], f"btc_usd_data for {exchange}")
+            (
+                btc_usd_shared_memory_files[exchange],
+                btc_usd_offsets[exchange],
+            ) = get_shared_memory_file(btc_usd_data_dict[exchange], btc_usd_key)
+            btc_usd_dtypes[exchange] = btc_usd_data_dict[exchange].dtype
+            logging.info(
+                f"Finished creating shared memory file for {exchange}: {shared_memory_file}"
+            )
+    return {
+        "shared_memory_files": shared_memory_files,
+        "hlcvs_offsets": hlcvs_offsets,
+        "hlcvs_shapes": hlcvs_shapes,
+        "hlcvs_dtypes": hlcvs_dtypes,
+        "btc_usd_shared_memory_files": btc_usd_shared_memory_files,
+        "btc_usd_offsets": btc_usd_offsets,
+        "btc_usd_dtypes": btc_usd_dtypes,
+        "msss": msss,
+    }
+
+
+def shared_memory_datasets_intact(datasets) -> bool:
+    """True if every shared memory file of a previous run still exists with the expected size."""
+    for key_files, key_offsets, key_shapes, key_dtypes in [
+        ("shared_memory_files", "hlcvs_offsets", "hlcvs_shapes", "hlcvs_dtypes"),
+        ("btc_usd_shared_memory_files", "btc_usd_offsets", None, "btc_usd_dtypes"),
+    ]:
+        for exchange, path in datasets[key_files].items():
+            n_items = (
+                math.prod(datasets[key_shapes][exchange])
+                if key_shapes
+                else datasets["hlcvs_shapes"][exchange][0]
+            )
+            expected_size = n_items * np.dtype(datasets[key_dtypes][exchange]).itemsize
+            expected_size += datasets.get(key_offsets, {}).get(exchange, 0)
+            if not os.path.exists(path) or os.path.getsize(path) != expected_size:
+                return False
+    return True
+
+
+def reattach_shared_memory_datasets(datasets) -> bool:
+    """
+    Take references to the shared datasets of an interrupted run if all its shared memory
+    files are still in place. Returns False, holding no references, otherwise.
+    """
+    registry = get_registry()
+    attached = []
+    for key_files in ["shared_memory_files", "btc_usd_shared_memory_files"]:
+        for path in datasets[key_files].values():
+            if (key := registry.key_of(path)) is not None and registry.attach_existing(key):
+                attached.append(key)
+    if shared_memory_datasets_intact(datasets):
+        return True
+    for key in attached:
+        registry.detach(key)
+    return False
+
+
+def get_checkpoint_filenames(island_id=None):
+    """(checkpoint, dedup snapshot) file names; islands sharing a results dir get their own."""
+    if island_id is None:
+        return CHECKPOINT_FILENAME, DEDUP_SNAPSHOT_FILENAME
+    return (
+        CHECKPOINT_FILENAME.replace(".", f"_island_{island_id}."),
+        DEDUP_SNAPSHOT_FILENAME.replace(".", f"_island_{island_id}."),
+    )
+
+
+def save_checkpoint(results_dir, state, filename=CHECKPOINT_FILENAME):
+    """Atomically pickle the optimizer state to results_dir/filename."""
+    path = os.path.join(results_dir, filename)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(results_dir, filename=CHECKPOINT_FILENAME):
+    path = os.path.join(results_dir, filename)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"no checkpoint found in {results_dir}")
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
 async def main():
     manage_rust_compilation()
     parser = argparse.ArgumentParser(prog="optimize", description="run optimizer")
@@ -894,163 +1715,125 @@ async def main():
     add_arguments_recursively(parser, template_config)
     add_extra_options(parser)
     args = parser.parse_args()
-    if args.config_path is None:
-        logging.info(f"loading default template config configs/template.json")
-        config = load_config("configs/template.json", verbose=True)
+    island_id = args.island_id if args.island_dir is not None else None
+    checkpoint_filename, dedup_snapshot_filename = get_checkpoint_filenames(island_id)
+    checkpoint = None
+    if args.resume is not None:
+        logging.info(f"resuming from checkpoint in {args.resume}")
+        checkpoint = load_checkpoint(args.resume, checkpoint_filename)
+        config = checkpoint["config"]
+        update_config_with_args(config, args)
     else:
-        logging.info(f"loading config {args.config_path}")
-        config = load_config(args.config_path, verbose=True)
-    old_config = deepcopy(config)
-    update_config_with_args(config, args)
-    config = format_config(config, verbose=True)
-    await add_all_eligible_coins_to_config(config)
+        if args.config_path is None:
+            logging.info(f"loading default template config configs/template.json")
+            config = load_config("configs/template.json", verbose=True)
+        else:
+            logging.info(f"loading config {args.config_path}")
+            config = load_config(args.config_path, verbose=True)
+        old_config = deepcopy(config)
+        update_config_with_args(config, args)
+        config = format_config(config, verbose=True)
+        await add_all_eligible_coins_to_config(config)
     try:
-        # Prepare data for each exchange
-        hlcvs_dict = {}
-        shared_memory_files = {}
-        hlcvs_shapes = {}
-        hlcvs_dtypes = {}
-        msss = {}
-
-        # NEW: Store per-exchange BTC arrays in a dict,
-        # and store their shared-memory file names in another dict.
-        btc_usd_data_dict = {}
-        btc_usd_shared_memory_files = {}
-        btc_usd_dtypes = {}
-
-        config["backtest"]["coins"] = {}
-        if config["backtest"]["combine_ohlcvs"]:
-            exchange = "combined"
-            coins, hlcvs, mss, results_path, cache_dir, btc_usd_prices = await prepare_hlcvs_mss(
-                config, exchange
+        datasets = None
+        if checkpoint is not None and reattach_shared_memory_datasets(checkpoint["datasets"]):
+            logging.info("Reusing shared memory files of the interrupted run")
+            datasets = checkpoint["datasets"]
+        if datasets is None:
+            datasets = await prepare_shared_memory_datasets(config)
+        shared_memory_files = datasets["shared_memory_files"]
+        btc_usd_shared_memory_files = datasets["btc_usd_shared_memory_files"]
+        if checkpoint is None and args.island_dir is not None:
+            results_dir = make_get_filepath(os.path.join(args.island_dir, ""))
+            config["results_dir"] = results_dir
+            config["results_filename"] = os.path.join(results_dir, "all_results.bin")
+        elif checkpoint is None:
+            exchanges = config["backtest"]["exchanges"]
+            exchanges_fname = "combined" if config["backtest"]["combine_ohlcvs"] else "_".join(exchanges)
+            date_fname = ts_to_date_utc(utc_ms())[:19].replace(":", "_")
+            coins = sorted(set([x for y in config["backtest"]["coins"].values() for x in y]))
+            coins_fname = "_".join(coins) if len(coins) <= 6 else f"{len(coins)}_coins"
+            hash_snippet = uuid4().hex[:8]
+            n_days = int(
+                round(
+                    (
+                        date_to_ts(config["backtest"]["end_date"])
+                        - date_to_ts(config["backtest"]["start_date"])
+                    )
+                    / (1000 * 60 * 60 * 24)
+                )
             )
-            exchange_preference = defaultdict(list)
-            for coin in coins:
-                exchange_preference[mss[coin]["exchange"]].append(coin)
-            for ex in exchange_preference:
-                logging.info(f"chose {ex} for {','.join(exchange_preference[ex])}")
-            config["backtest"]["coins"][exchange] = coins
-            hlcvs_dict[exchange] = hlcvs
-            hlcvs_shapes[exchange] = hlcvs.shape
-            hlcvs_dtypes[exchange] = hlcvs.dtype
-            msss[exchange] = mss
-            required_space = hlcvs.nbytes * 1.1  # Add 10% buffer
-            check_disk_space(tempfile.gettempdir(), required_space)
-            logging.info(f"Starting to create shared memory file for {exchange}...")
-            validate_array(hlcvs, "hlcvs")
-            shared_memory_file = create_shared_memory_file(hlcvs)
-            shared_memory_files[exchange] = shared_memory_file
-            if config["backtest"].get("use_btc_collateral", False):
-                # Use the fetched array
-                btc_usd_data_dict[exchange] = btc_usd_prices
-            else:
-                # Fall back to all ones
-                btc_usd_data_dict[exchange] = np.ones(hlcvs.shape[0], dtype=np.float64)
-            validate_array(btc_usd_data_dict[exchange], f"btc_usd_data for {exchange}")
-            btc_usd_shared_memory_files[exchange] = create_shared_memory_file(
-                btc_usd_data_dict[exchange]
+            results_dir = make_get_filepath(
+                f"optimize_results/{date_fname}_{exchanges_fname}_{n_days}days_{coins_fname}_{hash_snippet}/"
             )
-            btc_usd_dtypes[exchange] = btc_usd_data_dict[exchange].dtype
-            logging.info(f"Finished creating shared memory file for {exchange}: {shared_memory_file}")
+            os.makedirs(results_dir, exist_ok=True)
+            config["results_dir"] = results_dir
+            results_filename = os.path.join(results_dir, "all_results.bin")
+            config["results_filename"] = results_filename
         else:
-            tasks = {}
-            for exchange in config["backtest"]["exchanges"]:
-                tasks[exchange] = asyncio.create_task(prepare_hlcvs_mss(config, exchange))
-            for exchange in config["backtest"]["exchanges"]:
-                coins, hlcvs, mss, results_path, cache_dir, btc_usd_prices = await tasks[exchange]
-                config["backtest"]["coins"][exchange] = coins
-                hlcvs_dict[exchange] = hlcvs
-                hlcvs_shapes[exchange] = hlcvs.shape
-                hlcvs_dtypes[exchange] = hlcvs.dtype
-                msss[exchange] = mss
-                required_space = hlcvs.nbytes * 1.1  # Add 10% buffer
-                check_disk_space(tempfile.gettempdir(), required_space)
-                logging.info(f"Starting to create shared memory file for {exchange}...")
-                validate_array(hlcvs, "hlcvs")
-                shared_memory_file = create_shared_memory_file(hlcvs)
-                shared_memory_files[exchange] = shared_memory_file
-                # Create the BTC array for this exchange
-                if config["backtest"].get("use_btc_collateral", False):
-                    btc_usd_data_dict[exchange] = btc_usd_prices
-                else:
-                    btc_usd_data_dict[exchange] = np.ones(hlcvs.shape[0], dtype=np.float64)
-
-                validate_array(btc_usd_data_dict[exchange], f"btc_usd_data for {exchange}")
-                btc_usd_shared_memory_files[exchange] = create_shared_memory_file(
-                    btc_usd_data_dict[exchange]
-                )
-                btc_usd_dtypes[exchange] = btc_usd_data_dict[exchange].dtype
-                logging.info(
-                    f"Finished creating shared memory file for {exchange}: {shared_memory_file}"
-                )
-        exchanges = config["backtest"]["exchanges"]
-        exchanges_fname = "combined" if config["backtest"]["combine_ohlcvs"] else "_".join(exchanges)
-        date_fname = ts_to_date_utc(utc_ms())[:19].replace(":", "_")
-        coins = sorted(set([x for y in config["backtest"]["coins"].values() for x in y]))
-        coins_fname = "_".join(coins) if len(coins) <= 6 else f"{len(coins)}_coins"
-        hash_snippet = uuid4().hex[:8]
-        n_days = int(
-            round(
-                (
-                    date_to_ts(config["backtest"]["end_date"])
-                    - date_to_ts(config["backtest"]["start_date"])
-                )
-                / (1000 * 60 * 60 * 24)
-            )
-        )
-        results_dir = make_get_filepath(
-            f"optimize_results/{date_fname}_{exchanges_fname}_{n_days}days_{coins_fname}_{hash_snippet}/"
-        )
-        os.makedirs(results_dir, exist_ok=True)
-        config["results_dir"] = results_dir
-        results_filename = os.path.join(results_dir, "all_results.bin")
-        config["results_filename"] = results_filename
+            results_dir = config["results_dir"]
+            if island_id is None:
+                # records of the interrupted run not yet consumed by its writer are dropped;
+                # their configs are re-evaluated from the checkpointed population
+                shutil.rmtree(os.path.join(results_dir, "results_channel"), ignore_errors=True)
+        islands = None
+        if island_id is not None:
+            islands = MigrationDirectory(results_dir, island_id, args.n_islands)
+            islands.start_heartbeat()
+            logging.info(f"island {island_id} of {args.n_islands}, shared dir {results_dir}")
         overrides_list = config.get("optimize", {}).get("enable_overrides", [])
 
-        # Create results queue and start manager process
-        manager = multiprocessing.Manager()
-        results_queue = manager.Queue()
-        seen_hashes = manager.dict()
-        duplicate_counter = manager.dict()
-        duplicate_counter["count"] = 0
+        # workers append binary records to the channel dir; the writer process polls it
+        channel_dir = os.path.join(results_dir, "results_channel")
+        results_channel = ResultsChannel(channel_dir)
+        writer_done = multiprocessing.Event()
+        # shared by all workers; sized for the full run so it never grows
+        dedup_snapshot_path = os.path.join(results_dir, dedup_snapshot_filename)
+        if checkpoint is not None and os.path.exists(dedup_snapshot_path):
+            seen_hashes = DedupTable.restore(dedup_snapshot_path)
+        else:
+            seen_hashes = DedupTable.create(
+                capacity_for(config["optimize"]["iters"] + config["optimize"]["population_size"]),
+                len(config["optimize"]["scoring"]),
+            )
         flush_interval = 60  # or read from your config
         sig_digits = config["optimize"]["round_to_n_significant_digits"]
-        writer_process = multiprocessing.Process(
-            target=results_writer_process,
-            args=(results_queue, results_dir, sig_digits, flush_interval),
-            kwargs={
-                "compress": config["optimize"]["compress_results_file"],
-                "write_all_results": config["optimize"].get("write_all_results", True),  # ← new
-            },
-        )
-        writer_process.start()
-
-        # Prepare BTC/USD data
-        # For optimization, use the BTC/USD prices from the first exchange (or combined)
-        # Since all exchanges should align in timesteps, this should be consistent
-        btc_usd_data = btc_usd_prices  # Use the fetched btc_usd_prices from prepare_hlcvs_mss
-        if config["backtest"].get("use_btc_collateral", False):
-            logging.info("Using fetched BTC/USD prices for collateral")
-        else:
-            logging.info("Using default BTC/USD prices (all 1.0s) as use_btc_collateral is False")
-            btc_usd_data = np.ones(hlcvs_dict[next(iter(hlcvs_dict))].shape[0], dtype=np.float64)
-
-        validate_array(btc_usd_data, "btc_usd_data")
-        btc_usd_shared_memory_file = create_shared_memory_file(btc_usd_data)
+        writer_status = None
+        if islands is None or islands.is_home:
+            # records written, channel backlog, front size and hypervolume, for the telemetry
+            writer_status = multiprocessing.Array("d", WRITER_STATUS_SIZE)
+            writer_status[WRITER_HYPERVOLUME] = np.nan
+            # a resumed run goes on until it converges again
+            if os.path.exists(os.path.join(results_dir, CONVERGED_FILENAME)):
+                os.remove(os.path.join(results_dir, CONVERGED_FILENAME))
+            # with islands, the home island consumes the results of all of them
+            writer_process = multiprocessing.Process(
+                target=results_writer_process,
+                args=(channel_dir, writer_done, config, results_dir, sig_digits, flush_interval),
+                kwargs={
+                    "compress": config["optimize"]["compress_results_file"],
+                    "write_all_results": config["optimize"].get("write_all_results", True),
+                    "results_format": config["optimize"].get("results_format", "msgpack"),
+                    "status": writer_status,
+                },
+            )
+            writer_process.start()
 
         # Initialize evaluator with results queue and BTC/USD shared memory
         evaluator = Evaluator(
             shared_memory_files=shared_memory_files,
-            hlcvs_shapes=hlcvs_shapes,
-            hlcvs_dtypes=hlcvs_dtypes,
+            hlcvs_shapes=datasets["hlcvs_shapes"],
+            hlcvs_dtypes=datasets["hlcvs_dtypes"],
             # Instead of a single file/dtype, pass dictionaries
             btc_usd_shared_memory_files=btc_usd_shared_memory_files,
-            btc_usd_dtypes=btc_usd_dtypes,
-            msss=msss,
+            btc_usd_dtypes=datasets["btc_usd_dtypes"],
+            msss=datasets["msss"],
             config=config,
-            results_queue=results_queue,
+            results_channel=results_channel,
             seen_hashes=seen_hashes,
-            duplicate_counter=duplicate_counter,
+            evaluation_cache=EvaluationCache() if config["optimize"]["evaluation_cache"] else None,
+            hlcvs_offsets=datasets.get("hlcvs_offsets"),
+            btc_usd_offsets=datasets.get("btc_usd_offsets"),
         )
 
         logging.info(f"Finished initializing evaluator...")
@@ -1096,37 +1879,57 @@ async def main():
         toolbox.register("select", tools.selNSGA2)
 
         # Parallelization setup
-        logging.info(f"Initializing multiprocessing pool. N cpus: {config['optimize']['n_cpus']}")
-        pool = multiprocessing.Pool(processes=config["optimize"]["n_cpus"])
-        toolbox.register("map", pool.map)
+        n_cpus = size_worker_pool(
+            config, toolbox.evaluate, enforce_bounds(toolbox.individual(), bounds, sig_digits)
+        )
+        logging.info(f"Initializing multiprocessing pool. N cpus: {n_cpus}")
+        # the evaluator is sent to each worker once instead of with every task
+        pool = multiprocessing.Pool(
+            processes=n_cpus,
+            initializer=init_pool_worker,
+            initargs=(toolbox.evaluate,),
+        )
         logging.info(f"Finished initializing multiprocessing pool.")
 
-        # Create initial population
-        logging.info(f"Creating initial population...")
+        if checkpoint is not None:
+            population = []
+            for genes, fitness in checkpoint["population"]:
+                individual = creator.Individual(genes)
+                if fitness is not None:
+                    individual.fitness.values = fitness
+                population.append(individual)
+            random.setstate(checkpoint["random_state"])
+            np.random.set_state(checkpoint["np_random_state"])
+            logging.info(
+                f"Restored population of {len(population)} after {checkpoint['n_evals']} evaluations"
+            )
+        else:
+            # Create initial population
+            logging.info(f"Creating initial population...")
 
-        starting_individuals = configs_to_individuals(
-            get_starting_configs(args.starting_configs),
-            bounds,
-            sig_digits,
-        )
-        if (nstart := len(starting_individuals)) > (popsize := config["optimize"]["population_size"]):
-            logging.info(f"Number of starting configs greater than population size.")
-            logging.info(f"Increasing population size: {popsize} -> {nstart}")
-            config["optimize"]["population_size"] = nstart
-
-        population = toolbox.population(n=config["optimize"]["population_size"])
-        if starting_individuals:
-            for i in range(len(starting_individuals)):
-                population[i] = creator.Individual(starting_individuals[i])
-
-            # populate up to half of the population with duplicates of random choices within starting configs
-            # duplicates will be perturbed during runtime
-            for i in range(len(starting_individuals), len(population) // 2):
-                population[i] = deepcopy(
-                    population[np.random.choice(range(len(starting_individuals)))]
-                )
-        for i in range(len(population)):
-            population[i][:] = enforce_bounds(population[i], bounds, sig_digits)
+            starting_individuals = configs_to_individuals(
+                get_starting_configs(args.starting_configs),
+                bounds,
+                sig_digits,
+            )
+            if (nstart := len(starting_individuals)) > (popsize := config["optimize"]["population_size"]):
+                logging.info(f"Number of starting configs greater than population size.")
+                logging.info(f"Increasing population size: {popsize} -> {nstart}")
+                config["optimize"]["population_size"] = nstart
+
+            population = toolbox.population(n=config["optimize"]["population_size"])
+            if starting_individuals:
+                for i in range(len(starting_individuals)):
+                    population[i] = creator.Individual(starting_individuals[i])
+
+                # populate up to half of the population with duplicates of random choices within starting configs
+                # duplicates will be perturbed during runtime
+                for i in range(len(starting_individuals), len(population) // 2):
+                    population[i] = deepcopy(
+                        population[np.random.choice(range(len(starting_individuals)))]
+                    )
+            for i in range(len(population)):
+                population[i][:] = enforce_bounds(population[i], bounds, sig_digits)
 
         logging.info(f"Initial population size: {len(population)}")
 
@@ -1137,62 +1940,152 @@ async def main():
         stats.register("min", np.min, axis=0)
         stats.register("max", np.max, axis=0)
 
-        logbook = tools.Logbook()
-        # logbook.header = "gen", "evals", "std", "min", "avg", "max"
-        logbook.header = "gen", "evals", "min", "max"
-
         hof = tools.ParetoFront()
 
         # Run the optimization
         logging.info(f"Starting optimize...")
-        population, logbook = algorithms.eaMuPlusLambda(
+        # steady-state: workers never wait on a generation barrier
+        mu = config["optimize"]["population_size"]
+        if checkpoint is not None:
+            max_evals = checkpoint["max_evals"]
+        else:
+            ngen = max(1, int(config["optimize"]["iters"] / len(population)))
+            max_evals = len(population) + ngen * mu
+
+        screen = None
+        if config["optimize"]["surrogate_keep_fraction"] < 1.0:
+            screen = SurrogateScreen(
+                keep_fraction=config["optimize"]["surrogate_keep_fraction"],
+                exploration=config["optimize"]["surrogate_exploration"],
+                retrain_every=max(100, 2 * n_cpus),
+            )
+
+        def save_optimizer_checkpoint(state):
+            seen_hashes.snapshot(dedup_snapshot_path)
+            save_checkpoint(
+                results_dir,
+                {
+                    "population": [
+                        (list(ind), ind.fitness.values if ind.fitness.valid else None)
+                        for ind in state["population"]
+                    ],
+                    "logbook": state["logbook"],
+                    "n_evals": state["n_evals"],
+                    "max_evals": max_evals,
+                    "random_state": random.getstate(),
+                    "np_random_state": np.random.get_state(),
+                    "config": config,
+                    "datasets": datasets,
+                },
+                checkpoint_filename,
+            )
+            logging.info(f"Checkpoint saved after {state['n_evals']} evaluations")
+
+        if args.listen is not None:
+
+            def record_remote_result(genes, analyses, objectives):
+                results_channel.put(genes, analyses, objectives)
+                seen_hashes[calc_individual_hash(genes)] = objectives
+
+            backend = RemoteEvaluationBackend(
+                pool,
+                2 * n_cpus,
+                args.listen,
+                init_message={
+                    "type": "init",
+                    "config": config,
+                    "overrides_list": overrides_list,
+                    "dataset_hashes": {
+                        exchange: get_cache_hash(config, exchange)
+                        for exchange in shared_memory_files
+                    },
+                },
+                on_remote_result=record_remote_result,
+                claim_fn=evaluator.claim,
+            )
+        else:
+            backend = PoolEvaluationBackend(pool, capacity=2 * n_cpus)
+
+        telemetry = OptimizerTelemetry(
+            results_dir,
+            interval=config["optimize"].get("telemetry_interval_seconds", 30.0),
+            seen_hashes=seen_hashes,
+            writer_status=writer_status,
+            n_evals=checkpoint["n_evals"] if checkpoint is not None else 0,
+            island_id=island_id,
+        )
+
+        population, logbook = ea_steady_state(
             population,
             toolbox,
-            mu=config["optimize"]["population_size"],
-            lambda_=config["optimize"]["population_size"],
+            backend,
+            mu=mu,
             cxpb=config["optimize"]["crossover_probability"],
             mutpb=config["optimize"]["mutation_probability"],
-            ngen=max(1, int(config["optimize"]["iters"] / len(population))),
+            max_evals=max_evals,
+            trim_every=max(2 * n_cpus, mu // 4),
             stats=stats,
             halloffame=hof,
-            verbose=False,
+            logbook=checkpoint["logbook"] if checkpoint is not None else None,
+            n_evals_done=checkpoint["n_evals"] if checkpoint is not None else 0,
+            checkpoint_fn=save_optimizer_checkpoint,
+            checkpoint_interval=config["optimize"]["checkpoint_interval_minutes"] * 60,
+            screen=screen,
+            migration=islands if islands is not None and args.n_islands > 1 else None,
+            migrate_every=config["optimize"]["island_migration_interval"],
+            n_migrants=config["optimize"]["island_n_migrants"],
+            telemetry=telemetry,
+            stop_fn=(
+                make_convergence_check(results_dir)
+                if config["optimize"].get("convergence_window", 0) > 0
+                else None
+            ),
+        )
+        telemetry.write(backend)
+        save_optimizer_checkpoint(
+            {"population": population, "logbook": logbook, "n_evals": telemetry.n_evals}
         )
 
         # Print statistics
         print(logbook)
 
         logging.info(f"Optimization complete.")
+        if islands is not None:
+            islands.mark_done()
+            if islands.is_home:
+                islands.wait_for_all()
 
     except Exception as e:
         logging.error(f"An error occurred: {e}")
         traceback.print_exc()
     finally:
+        if "islands" in locals() and islands is not None:
+            # also on failure, so the home island doesn't wait for this one
+            islands.mark_done()
+        if "backend" in locals() and isinstance(backend, RemoteEvaluationBackend):
+            backend.close()
         # Signal the writer process to shut down and wait for it
-        if "results_queue" in locals():
-            results_queue.put("DONE")
+        if "writer_process" in locals():
+            writer_done.set()
             writer_process.join()
         if "pool" in locals():
             logging.info("Closing and terminating the process pool...")
             pool.close()
             pool.terminate()
             pool.join()
+        if (
+            "channel_dir" in locals()
+            and os.path.exists(channel_dir)
+            and (islands is None or (islands.is_home and islands.n_done() >= islands.n_islands))
+        ):
+            # every record has been written to all_results.bin by now
+            shutil.rmtree(channel_dir, ignore_errors=True)
 
         # Remove shared memory files (including BTC/USD)
-        if "shared_memory_files" in locals():
-            for shared_memory_file in shared_memory_files.values():
-                if shared_memory_file and os.path.exists(shared_memory_file):
-                    logging.info(f"Removing shared memory file: {shared_memory_file}")
-                    try:
-                        os.unlink(shared_memory_file)
-                    except Exception as e:
-                        logging.error(f"Error removing shared memory file: {e}")
-        if "btc_usd_shared_memory_file" in locals():
-            if btc_usd_shared_memory_file and os.path.exists(btc_usd_shared_memory_file):
-                logging.info(f"Removing BTC/USD shared memory file: {btc_usd_shared_memory_file}")
-                try:
-                    os.unlink(btc_usd_shared_memory_file)
-                except Exception as e:
-                    logging.error(f"Error removing BTC/USD shared memory file: {e}")
+        if "datasets" in locals() and datasets is not None:
+            remove_shared_memory_files(datasets)
+        if "seen_hashes" in locals():
+            seen_hashes.unlink()
 
         logging.info("Cleanup complete. Exiting.")
         sys.exit(0)
@@ -0,0 +1,72 @@
+"""
+Remote evaluation worker for optimize.py.
+
+Start the optimizer with --listen, then on any machine with the hlcvs data cached:
+
+    python3 src/optimize_worker.py optimizer-host:port --n_cpus 16
+
+The worker receives the config from the optimizer, checks that the hlcvs cache for it exists
+locally (run a backtest or optimize with the same config there once to create it), loads it
+into shared memory and evaluates parameter vectors until the optimizer finishes.
+"""
+
+import argparse
+import asyncio
+import functools
+import multiprocessing
+import os
+
+from backtest import get_cache_hash
+from evaluation_cache import EvaluationCache
+from main import manage_rust_compilation
+from optimize import Evaluator, prepare_shared_memory_datasets, remove_shared_memory_files
+from remote_workers import run_worker
+
+
+def prepare_evaluator(init_message):
+    config = init_message["config"]
+    for exchange, cache_hash in init_message["dataset_hashes"].items():
+        if get_cache_hash(config, exchange) != cache_hash:
+            raise ValueError(f"{exchange} dataset hash mismatch; update passivbot on this worker")
+        cache_dir = os.path.join("caches", "hlcvs_data", cache_hash[:16])
+        if not os.path.exists(cache_dir):
+            raise FileNotFoundError(f"no hlcvs cache {cache_dir} for {exchange} on this worker")
+    datasets = asyncio.run(prepare_shared_memory_datasets(config))
+    evaluator = Evaluator(
+        shared_memory_files=datasets["shared_memory_files"],
+        hlcvs_shapes=datasets["hlcvs_shapes"],
+        hlcvs_dtypes=datasets["hlcvs_dtypes"],
+        btc_usd_shared_memory_files=datasets["btc_usd_shared_memory_files"],
+        btc_usd_dtypes=datasets["btc_usd_dtypes"],
+        msss=datasets["msss"],
+        config=config,
+        results_channel=None,  # results go back to the optimizer
+        evaluation_cache=EvaluationCache() if config["optimize"]["evaluation_cache"] else None,
+        hlcvs_offsets=datasets["hlcvs_offsets"],
+        btc_usd_offsets=datasets["btc_usd_offsets"],
+    )
+
+    def cleanup():
+        remove_shared_memory_files(datasets)
+        evaluator.seen_hashes.unlink()
+
+    # tasks arrive claimed and canonicalized by the optimizer's dedup table
+    evaluate_fn = functools.partial(
+        evaluator.backtest, overrides_list=init_message["overrides_list"]
+    )
+    return evaluate_fn, cleanup
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="optimize_worker", description="remote optimize worker")
+    parser.add_argument("address", type=str, help="host:port the optimizer listens on")
+    parser.add_argument(
+        "--n_cpus", type=int, default=multiprocessing.cpu_count(), help="worker processes"
+    )
+    args = parser.parse_args()
+    manage_rust_compilation()
+    run_worker(args.address, args.n_cpus, prepare_evaluator)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,29 @@
+# Overrides which raise a bot param to at least the value of another: name -> (target, source).
+# The optimizer applies these directly to its flat bot params arrays. Overrides with any other
+# logic belong in optimizer_overrides() below; the optimizer then builds a full config instead.
+MAX_OVERRIDES = {
+    "lossless_close_trailing": ("close_trailing_threshold_pct", "close_trailing_retracement_pct"),
+}
+
+# Overrides which change nothing.
+NOOP_OVERRIDES = {"example"}
+
+
 def optimizer_overrides(overrides_list, config, pside):
     if not overrides_list:
         # No overrides to apply
         return config
 
     for override in overrides_list:
-        if override == "lossless_close_trailing":
-
-            # Logic for lossless close
-            config["bot"][pside]["close_trailing_threshold_pct"] = max(
-                config["bot"][pside]["close_trailing_threshold_pct"],
-                config["bot"][pside]["close_trailing_retracement_pct"],
+        if override in MAX_OVERRIDES:
+            # e.g. lossless close: close_trailing_threshold_pct >= close_trailing_retracement_pct
+            target, source = MAX_OVERRIDES[override]
+            config["bot"][pside][target] = max(
+                config["bot"][pside][target],
+                config["bot"][pside][source],
             )
 
-        elif override == "example":
+        elif override in NOOP_OVERRIDES:
             # Logic for override 'example'
             pass
 
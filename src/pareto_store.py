@@ -4,16 +4,121 @@ import json
 import hashlib
 from typing import Dict
 import glob
-import math
 import time
 import numpy as np
 import threading
 import logging
 import passivbot_rust as pbr
-from opt_utils import calc_normalized_dist, round_floats, dominates
+from opt_utils import calc_normalized_dist, round_floats
 from pure_funcs import calc_hash
 
 
+def front_dominance(front_objs: np.ndarray, obj) -> tuple:
+    """
+    Dominance between obj and the members of a front (all objectives minimized).
+    front_objs: (n_objectives, n_members). Returns (whether a member dominates obj, mask of
+    the members obj dominates).
+    """
+    all_le = np.ones(front_objs.shape[1], dtype=bool)  # member <= obj in every objective
+    any_lt = np.zeros(front_objs.shape[1], dtype=bool)  # member < obj in some objective
+    for row, value in zip(front_objs, obj):
+        all_le &= row <= value
+        any_lt |= row < value
+    # obj dominates a member which is >= obj everywhere (not any_lt) and > somewhere (not all_le)
+    return bool(np.any(all_le & any_lt)), ~(all_le | any_lt)
+
+
+EXACT_HYPERVOLUME_MAX_OBJECTIVES = 3  # above this, hypervolume is a Monte Carlo estimate
+HYPERVOLUME_SAMPLES = 100_000
+
+
+def _hypervolume_2d(points: np.ndarray, ref: np.ndarray) -> float:
+    points = points[np.argsort(points[:, 0], kind="stable")]
+    # staircase: between consecutive x, the lowest y of the points to the left
+    y_min = np.minimum.accumulate(points[:, 1])
+    widths = np.diff(np.append(points[:, 0], ref[0]))
+    return float(np.sum(widths * (ref[1] - y_min)))
+
+
+def hypervolume(points, ref) -> float:
+    """
+    Exact volume dominated by points (n_points, n_objectives), all objectives minimized, and
+    bounded by the reference point ref. Points not better than ref in every objective add
+    nothing. Up to EXACT_HYPERVOLUME_MAX_OBJECTIVES objectives.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, len(ref))
+    ref = np.asarray(ref, dtype=np.float64)
+    points = points[np.all(points < ref, axis=1)]
+    if not len(points):
+        return 0.0
+    n_objectives = len(ref)
+    if n_objectives == 1:
+        return float(ref[0] - points[:, 0].min())
+    if n_objectives == 2:
+        return _hypervolume_2d(points, ref)
+    if n_objectives == 3:
+        # slices between consecutive z are covered by the 2d front of the points below them
+        points = points[np.argsort(points[:, 2], kind="stable")]
+        depths = np.diff(np.append(points[:, 2], ref[2]))
+        volume = 0.0
+        for i in np.flatnonzero(depths > 0.0).tolist():
+            volume += depths[i] * _hypervolume_2d(points[: i + 1, :2], ref)
+        return volume
+    raise ValueError(f"no exact hypervolume for {n_objectives} objectives")
+
+
+def non_dominated_points(points: np.ndarray) -> np.ndarray:
+    """Distinct non-dominated rows of points (n_points, n_objectives), all minimized."""
+    # the lexicographically first row is dominated by no other; keep it and drop every row it
+    # dominates, so the loop runs once per kept row
+    points = np.unique(points, axis=0)
+    kept = []
+    while len(points):
+        kept.append(points[0])
+        points = points[1:][~np.all(points[1:] >= points[0], axis=1)]
+    return np.array(kept).reshape(-1, points.shape[1])
+
+
+def hypervolume_contribution(point, front, ref) -> float:
+    """Volume point adds to the hypervolume of front (n_members, n_objectives)."""
+    point = np.asarray(point, dtype=np.float64)
+    ref = np.asarray(ref, dtype=np.float64)
+    if np.any(point >= ref):
+        return 0.0
+    # the part of point's box the front already covers is the front clipped to that box
+    clipped = np.maximum(np.asarray(front, dtype=np.float64).reshape(-1, len(ref)), point)
+    # most members collapse onto the box's faces; only the front of the clipped points counts
+    clipped = non_dominated_points(clipped[np.all(clipped < ref, axis=1)])
+    return float(np.prod(ref - point)) - hypervolume(clipped, ref)
+
+
+def estimate_hypervolume(points, ref, n_samples: int = HYPERVOLUME_SAMPLES, seed: int = 0):
+    """
+    Monte Carlo estimate of hypervolume(points, ref), for any number of objectives: the share
+    of n_samples uniform samples between the front's ideal point and ref which the front
+    dominates, times that box's volume. The relative error is about
+    sqrt((1 - share) / (share * n_samples)).
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, len(ref))
+    ref = np.asarray(ref, dtype=np.float64)
+    points = points[np.all(points < ref, axis=1)]
+    if not len(points):
+        return 0.0
+    lower = points.min(axis=0)
+    box_volume = float(np.prod(ref - lower))
+    rng = np.random.default_rng(seed)
+    n_dominated = 0
+    # bound the (batch, n_points) comparison matrix to ~1e7 elements
+    batch_size = max(1, 10_000_000 // len(points))
+    for start in range(0, n_samples, batch_size):
+        samples = rng.uniform(lower, ref, size=(min(batch_size, n_samples - start), len(ref)))
+        dominated = np.ones((len(samples), len(points)), dtype=bool)
+        for k in range(len(ref)):
+            dominated &= points[:, k] <= samples[:, k, None]
+        n_dominated += int(dominated.any(axis=1).sum())
+    return box_volume * n_dominated / n_samples
+
+
 class ParetoStore:
     def __init__(
         self,
@@ -29,10 +134,28 @@ class ParetoStore:
         self.flush_interval = flush_interval  # seconds
         os.makedirs(os.path.join(self.directory, "pareto"), exist_ok=True)
         # --- in‑memory structures -----------------------------------------
-        self._entries: dict[str, dict] = {}  # hash -> full entry
-        self._objectives: dict[str, tuple] = {}  # hash -> objective vector
-        self._front: list[str] = []  # list of hashes (Pareto set)
+        # the Pareto set: member i has hash _front_hashes[i] and objectives _front_objs[:, i];
+        # both are allocated ahead, only the first _n_front slots are in use
+        self._n_front = 0
+        self._front_hashes = np.empty(0, dtype=object)
+        self._front_objs = np.empty((0, 0))  # (n_objectives, capacity)
+        self._params: dict[str, np.ndarray | None] = {}  # hash -> parameter vector, if known
+        # analyses_combined of members, minus the objectives, for summary.npz
+        self._metric_names: list[str] | None = None
+        self._metrics: dict[str, np.ndarray] = {}
         self._objective_lookup: dict[tuple, str] = {}  # objective vector ➜ hash
+        # full entries are kept only until flushed; afterwards they're read back from pareto/
+        self._pending: dict[str, dict] = {}
+        # --- on-disk state: deltas since the last flush -------------------
+        self.manifest_path = os.path.join(self.directory, "index.json")
+        self.summary_path = os.path.join(self.directory, "summary.npz")
+        self._manifest: dict[str, str] = {}  # hash -> file name in pareto/, as last flushed
+        self._removed: set[str] = set()  # hashes removed from the front since the last flush
+        self._dirty = False
+        # hypervolume w.r.t. reference_point: kept up to date member by member when exact,
+        # else estimated on demand and cached until the front changes
+        self.reference_point: np.ndarray | None = None
+        self._hypervolume: float | None = None
         # ------------------------------------------------------------------
         self.n_iters = 0
         self._last_flush_ts = time.time()
@@ -43,50 +166,77 @@ class ParetoStore:
         # bootstrap from disk if any
         self._bootstrap_from_disk()
 
-    def add_entry(self, entry: dict) -> bool:
+    def __len__(self) -> int:
+        return self._n_front
+
+    @property
+    def _front(self) -> np.ndarray:
+        return self._front_hashes[: self._n_front]
+
+    def add_entry(self, entry: dict, params=None) -> bool:
         """
         Add a new entry, update Pareto front in‑memory.
+        params: the entry's parameter vector (optimizer individual), kept alongside its
+        objectives while it's a member.
         Return True if the store actually changed.
         """
         self.n_iters += 1
         if self.scoring_keys is None:
             self.scoring_keys = entry["optimize"]["scoring"]
-        rounded = round_floats(entry, self.sig_digits)
-        h = calc_hash(rounded)
+        # objective vector = sorted w_i keys, rounded like the rest of the entry
+        analyses_combined = entry["analyses_combined"]
+        w_keys = sorted(k for k in analyses_combined if k.startswith("w_"))
+        obj = tuple(round_floats(analyses_combined[k], self.sig_digits) for k in w_keys)
         with self._lock:
-            if h in self._entries:  # fast‑dedupe
-                return False
-
-            # objective vector = sorted w_i keys
-            w_keys = sorted(k for k in rounded["analyses_combined"] if k.startswith("w_"))
-            obj = tuple(rounded["analyses_combined"][k] for k in w_keys)
-
-            # ───────────── NEW: dedupe on the objective vector ──────────────
             # identical after rounding  → nothing new to store or write
             if obj in self._objective_lookup:
                 self._log.info(f"Dropping candidate whose obj score is already present: {obj}")
                 return False
-            # ────────────────────────────────────────────────────────────────
 
             # discard if dominated by current front
-            if any(dominates(self._objectives[idx], obj) for idx in self._front):
+            n = self._n_front
+            is_dominated, dominated = front_dominance(self._front_objs[:, :n], obj)
+            if is_dominated:
                 return False
 
-            # remove dominated members
-            dominated = [idx for idx in self._front if dominates(obj, self._objectives[idx])]
-            for idx in dominated:
-                del self._objective_lookup[self._objectives[idx]]
-                self._front.remove(idx)
+            # only entries which make it into the front are rounded and hashed in full
+            rounded = round_floats(entry, self.sig_digits)
+            h = calc_hash(rounded)
+            if h in self._params:
+                return False
 
-            # add new member
-            self._entries[h] = rounded
-            self._objectives[h] = obj
-            self._front.append(h)
-            self._objective_lookup[obj] = h
+            if self.reference_point is not None:
+                if len(obj) <= EXACT_HYPERVOLUME_MAX_OBJECTIVES:
+                    self._hypervolume += hypervolume_contribution(
+                        obj, self._front_objs[:, :n].T, self.reference_point
+                    )
+                else:
+                    self._hypervolume = None
+
+            # remove dominated members, compacting the arrays
+            n_removed = int(dominated.sum())
+            if n_removed:
+                for idx in np.flatnonzero(dominated):
+                    self._objective_lookup.pop(tuple(self._front_objs[:, idx].tolist()), None)
+                    h_removed = self._front_hashes[idx]
+                    del self._params[h_removed]
+                    self._metrics.pop(h_removed, None)
+                    self._pending.pop(h_removed, None)
+                    self._removed.add(h_removed)
+                keep = ~dominated
+                self._n_front = n - n_removed
+                self._front_hashes[: self._n_front] = self._front_hashes[:n][keep]
+                self._front_hashes[self._n_front : n] = None
+                self._front_objs[:, : self._n_front] = self._front_objs[:, :n][:, keep]
+
+            if params is not None:
+                params = np.asarray(params, dtype=np.float64)
+            self._insert(h, rounded, obj, params)
+            self._metrics[h] = self._metrics_vector(rounded["analyses_combined"])
 
             self._log_front_state(
                 added=1,
-                removed=len(dominated),
+                removed=n_removed,
             )
 
             # maybe flush
@@ -94,81 +244,277 @@ class ParetoStore:
 
             return True
 
+    def _insert(self, h: str, entry: dict | None, obj: tuple, params=None) -> None:
+        """
+        Append a member known not to be dominated by, nor to dominate, the front.
+        entry is None for members whose file is already in pareto/.
+        """
+        n = self._n_front
+        if n == len(self._front_hashes):
+            capacity = max(64, 2 * n)
+            hashes = np.empty(capacity, dtype=object)
+            hashes[:n] = self._front_hashes[:n]
+            objs = np.empty((len(obj), capacity))
+            if n:
+                objs[:, :n] = self._front_objs[:, :n]
+            self._front_hashes, self._front_objs = hashes, objs
+        self._front_objs[:, n] = obj
+        self._front_hashes[n] = h
+        self._n_front = n + 1
+        self._params[h] = params
+        if entry is not None:
+            self._pending[h] = entry
+        self._objective_lookup[obj] = h
+        self._dirty = True
+
+    def _metrics_vector(self, analyses_combined: dict) -> np.ndarray:
+        if self._metric_names is None:
+            self._metric_names = sorted(k for k in analyses_combined if not k.startswith("w_"))
+        return np.array(
+            [
+                np.nan if (v := analyses_combined.get(k)) is None else float(v)
+                for k in self._metric_names
+            ]
+        )
+
+    @property
+    def hypervolume(self) -> float | None:
+        """Hypervolume of the front; None until a reference point is set."""
+        with self._lock:
+            if self.reference_point is None:
+                return None
+            if self._hypervolume is None:
+                self._hypervolume = estimate_hypervolume(
+                    self._front_objs[:, : self._n_front].T, self.reference_point
+                )
+            return self._hypervolume
+
+    def set_reference_point(self, reference_point) -> None:
+        """
+        Reference point of the hypervolume, worse than any acceptable objective vector.
+        It's saved in index.json, and restored with the front.
+        """
+        with self._lock:
+            self._set_reference_point(reference_point)
+            self._dirty = True
+
+    def _set_reference_point(self, reference_point) -> None:
+        self.reference_point = np.asarray(reference_point, dtype=np.float64)
+        front = self._front_objs[:, : self._n_front].T
+        if len(self.reference_point) <= EXACT_HYPERVOLUME_MAX_OBJECTIVES:
+            self._hypervolume = hypervolume(front, self.reference_point)
+        else:
+            self._hypervolume = None
+
+    def load_entry(self, h: str) -> dict:
+        """Full entry of member h, read from its file unless not flushed yet."""
+        with self._lock:
+            if h in self._pending:
+                return self._pending[h]
+            path = os.path.join(self.pareto_dir, self._manifest[h])
+        with open(path) as f:
+            return json.load(f)
+
     def get_front(self) -> list[dict]:
         with self._lock:
-            return [self._entries[h] for h in self._front]
+            hashes = self._front.tolist()
+        return [self.load_entry(h) for h in hashes]
 
     def flush_now(self) -> None:
         """Force a write of the current in‑memory set to disk."""
         with self._lock:
-            self._write_all_to_disk()
+            self._write_to_disk()
             self._last_flush_ts = time.time()
 
     def _maybe_flush(self) -> None:
         if time.time() - self._last_flush_ts >= self.flush_interval:
-            self._write_all_to_disk()
+            self._write_to_disk()
             self._last_flush_ts = time.time()
 
-    def _write_all_to_disk(self) -> None:
+    def _write_to_disk(self) -> None:
         """
-        Flush the current Pareto front to disk.
+        Bring pareto/ up to date with the in-memory front, touching only what changed since
+        the last flush:
+
+        * files of members removed from the front are deleted;
+        * new members are written to ``"<dist>_<hash>.json"``;
+        * files whose distance prefix changed are renamed.
 
-        * For every hash in ``self._front`` an up‑to‑date
-          ``"<dist>_<hash>.json"`` file is created if it does not already exist.
-        * After writing, every ``*.json`` file whose hash is **not** in
-          the front is removed.  The directory therefore mirrors the
-          in‑memory set 1‑to‑1.
+        Written entries are dropped from memory. ``index.json`` holds each member's file name,
+        objectives and parameter vector, so the directory is never scanned and a restart
+        doesn't need to read the member files.
         """
-        if not self._front:
+        if not self._dirty:
             return
 
-        # ── distance normalisation ------------------------------------------------
-        obj_matrix = [self._objectives[h] for h in self._front]
-        mins = [min(col) for col in zip(*obj_matrix)]
-        maxs = [max(col) for col in zip(*obj_matrix)]
-
-        live_files: set[str] = set()
+        for h in self._removed:
+            name = self._manifest.pop(h, None)
+            if name is not None:
+                try:
+                    os.remove(os.path.join(self.pareto_dir, name))
+                except OSError as e:
+                    self._log.warning("Could not remove obsolete Pareto file %s: %s", name, e)
+        self._removed.clear()
 
-        for h in self._front:
-            obj = self._objectives[h]
-            norm = [(v - mi) / (ma - mi) if ma > mi else 0.0 for v, mi, ma in zip(obj, mins, maxs)]
-            dist = math.sqrt(sum(v * v for v in norm))
-            path = os.path.join(self.pareto_dir, f"{dist:08.4f}_{h}.json")
-            live_files.add(path)
+        # ── distance normalisation ------------------------------------------------
+        obj_matrix = self._front_objs[:, : self._n_front]
+        mins = obj_matrix.min(axis=1, keepdims=True)
+        spans = obj_matrix.max(axis=1, keepdims=True) - mins
+        norm = np.divide(
+            obj_matrix - mins, spans, out=np.zeros_like(obj_matrix), where=spans > 0.0
+        )
+        dists = np.sqrt((norm**2).sum(axis=0))
 
-            if not os.path.exists(path):
+        for h, dist in zip(self._front, dists.tolist()):
+            name = f"{dist:08.4f}_{h}.json"
+            old_name = self._manifest.get(h)
+            if old_name == name:
+                continue
+            path = os.path.join(self.pareto_dir, name)
+            if old_name is None:
                 tmp = path + ".tmp"
                 with open(tmp, "w") as f:
-                    json.dump(self._entries[h], f, separators=(",", ":"), indent=4)
+                    json.dump(self._pending.pop(h), f, separators=(",", ":"), indent=4)
                 os.replace(tmp, path)
+            else:
+                os.replace(os.path.join(self.pareto_dir, old_name), path)
+            self._manifest[h] = name
 
-        # ── one‑pass purge of everything that is *not* in the front --------------
-        for fp in glob.glob(os.path.join(self.pareto_dir, "*.json")):
-            if fp not in live_files:
-                try:
-                    os.remove(fp)
-                except OSError as e:
-                    self._log.warning("Could not remove obsolete Pareto file %s: %s", fp, e)
+        index = {
+            "scoring": self.scoring_keys,
+            "reference_point": (
+                None if self.reference_point is None else self.reference_point.tolist()
+            ),
+            "members": {
+                h: {
+                    "file": self._manifest[h],
+                    "objectives": obj_matrix[:, i].tolist(),
+                    "params": None if self._params[h] is None else self._params[h].tolist(),
+                }
+                for i, h in enumerate(self._front)
+            },
+        }
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+        os.replace(tmp, self.manifest_path)
+        self._write_summary(obj_matrix)
+        self._dirty = False
+
+    def _write_summary(self, obj_matrix: np.ndarray) -> None:
+        """summary.npz: file names, objectives and metrics of all members."""
+        hashes = self._front.tolist()
+        metric_names = self._metric_names or []
+        metrics = np.full((len(hashes), len(metric_names)), np.nan)
+        for i, h in enumerate(hashes):
+            if h in self._metrics:
+                metrics[i] = self._metrics[h]
+        tmp = self.summary_path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                hashes=np.array(hashes, dtype=str),
+                files=np.array([self._manifest[h] for h in hashes], dtype=str),
+                scoring=np.array(self.scoring_keys or [], dtype=str),
+                objectives=obj_matrix.T,
+                metric_names=np.array(metric_names, dtype=str),
+                metrics=metrics,
+            )
+        os.replace(tmp, self.summary_path)
 
     def _bootstrap_from_disk(self) -> None:
         """
-        Read existing *.json files once at start so we don’t lose old results
-        when the new optimizer run appends.
+        Restore the front of a previous run in this directory, so we don’t lose old results
+        when the new optimizer run appends. Members are taken from index.json; the files in
+        pareto/ are only read if there is no index (results of older versions).
+        """
+        try:
+            with open(self.manifest_path) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = None
+        except ValueError as e:
+            self._log.warning("Ignoring unreadable %s: %s", self.manifest_path, e)
+            index = None
+        if index is None or "members" not in index:
+            self._bootstrap_from_files()
+            return
+        self.scoring_keys = index["scoring"]
+        names = set(os.listdir(self.pareto_dir))
+        n_missing = 0
+        for h, member in index["members"].items():
+            if member["file"] not in names:
+                n_missing += 1
+                continue
+            params = member["params"]
+            if params is not None:
+                params = np.asarray(params, dtype=np.float64)
+            self._insert(h, None, tuple(member["objectives"]), params)
+            self._manifest[h] = member["file"]
+        summary_stale = self._load_summary_metrics()
+        if index.get("reference_point") is not None:
+            self._set_reference_point(index["reference_point"])
+        listed = set(self._manifest.values())
+        for name in names:
+            if name.endswith(".json") and name not in listed:
+                try:
+                    os.remove(os.path.join(self.pareto_dir, name))
+                except OSError:
+                    pass
+        # rewrite the index at the next flush only if it didn't match the directory
+        self._dirty = n_missing > 0 or summary_stale
+
+    def _load_summary_metrics(self) -> bool:
         """
-        for fp in glob.glob(os.path.join(self.pareto_dir, "*.json")):
+        Metrics of the members restored from index.json, from summary.npz or else from their
+        files. Returns whether summary.npz lacked any.
+        """
+        if os.path.exists(self.summary_path):
             try:
-                with open(fp) as f:
-                    entry = json.load(f)
-                self.add_entry(entry)  # uses the normal path
-            except Exception as e:
-                print(f"bootstrap skip {fp}: {e}")
+                with np.load(self.summary_path) as summary:
+                    self._metric_names = summary["metric_names"].tolist()
+                    for h, row in zip(summary["hashes"].tolist(), summary["metrics"]):
+                        if h in self._params:
+                            self._metrics[h] = row
+            except (OSError, ValueError, KeyError) as e:
+                self._log.warning("Ignoring unreadable %s: %s", self.summary_path, e)
+        missing = [h for h in self._front.tolist() if h not in self._metrics]
+        for h in missing:
+            self._metrics[h] = self._metrics_vector(self.load_entry(h)["analyses_combined"])
+        return bool(missing)
+
+    def _bootstrap_from_files(self) -> None:
+        files = glob.glob(os.path.join(self.pareto_dir, "*.json"))
+        flush_interval, self.flush_interval = self.flush_interval, float("inf")
+        try:
+            for fp in files:
+                try:
+                    with open(fp) as f:
+                        entry = json.load(f)
+                    self.add_entry(entry)  # uses the normal path
+                except Exception as e:
+                    print(f"bootstrap skip {fp}: {e}")
+        finally:
+            self.flush_interval = flush_interval
+        # adopt the files of members as they are; the next flush renames them as needed
+        for fp in files:
+            name = os.path.basename(fp)
+            h = os.path.splitext(name)[0].split("_")[-1]
+            if h in self._pending and h not in self._manifest:
+                self._manifest[h] = name
+                del self._pending[h]
+            else:
+                try:
+                    os.remove(fp)
+                except OSError:
+                    pass
 
     def _log_front_state(self, *, added: int, removed: int) -> None:
         """Emit a compact one‑liner with min / max / spread per objective."""
-        objs = [self._objectives[idx] for idx in self._front]
+        objs = self._front_objs[:, : self._n_front]
 
-        mins = [min(col) for col in zip(*objs)]
-        maxs = [max(col) for col in zip(*objs)]
+        mins = objs.min(axis=1).tolist()
+        maxs = objs.max(axis=1).tolist()
 
         metrics = []
         for i, key in enumerate(self.scoring_keys):
@@ -220,6 +566,58 @@ def compute_ideal(values_matrix, mode="min", weights=None, eps=1e-3, pct=10):
     raise ValueError(f"unknown mode {mode}")
 
 
+def load_front_summary(pareto_dir: str) -> dict:
+    """
+    Hashes, file names, scoring, objectives (n_members, n_objectives), metric names and
+    metrics (n_members, n_metrics; NaN where missing) of the front in pareto_dir. Read from the
+    summary.npz a ParetoStore keeps next to pareto/, or else from the member files.
+    """
+    summary_path = os.path.join(os.path.dirname(os.path.abspath(pareto_dir)), "summary.npz")
+    if os.path.exists(summary_path):
+        with np.load(summary_path) as f:
+            return {
+                "hashes": f["hashes"].tolist(),
+                "files": f["files"].tolist(),
+                "scoring": f["scoring"].tolist(),
+                "objectives": f["objectives"],
+                "metric_names": f["metric_names"].tolist(),
+                "metrics": f["metrics"],
+            }
+    hashes, files, objectives, combined = [], [], [], []
+    scoring = None
+    for entry_path in sorted(glob.glob(os.path.join(pareto_dir, "*.json"))):
+        h = os.path.splitext(os.path.basename(entry_path))[0].split("_")[-1]
+        try:
+            with open(entry_path) as f:
+                entry = json.load(f)
+            analyses_combined = entry["analyses_combined"]
+            w_keys = sorted(k for k in analyses_combined if k.startswith("w_"))
+            values = [analyses_combined[k] for k in w_keys]
+            if any(v is None for v in values):
+                continue
+        except Exception as e:
+            print(f"Error loading {h}: {e}")
+            continue
+        if scoring is None:
+            scoring = entry.get("optimize", {}).get("scoring", [])
+        hashes.append(h)
+        files.append(os.path.basename(entry_path))
+        objectives.append(values)
+        combined.append(analyses_combined)
+    metric_names = sorted({k for ac in combined for k in ac if not k.startswith("w_")})
+    metrics = np.array(
+        [[np.nan if ac.get(k) is None else ac[k] for k in metric_names] for ac in combined]
+    ).reshape(len(combined), len(metric_names))
+    return {
+        "hashes": hashes,
+        "files": files,
+        "scoring": scoring or [],
+        "objectives": np.array(objectives, dtype=float).reshape(len(hashes), -1),
+        "metric_names": metric_names,
+        "metrics": metrics,
+    }
+
+
 def comma_separated_values_float(x):
     return [float(z) for z in x.split(",")]
 
@@ -262,20 +660,12 @@ def main():
     args = parser.parse_args()
 
     pareto_dir = args.pareto_dir.rstrip("/")
-    entries = sorted(glob.glob(os.path.join(pareto_dir, "*.json")))
-    if not entries:
-        if not pareto_dir.endswith("pareto"):
-            pareto_dir += "/pareto"
-            entries = sorted(glob.glob(os.path.join(pareto_dir, "*.json")))
-    print(f"Found {len(entries)} Pareto members.")
-
-    points = []
-    filenames = {}
-    w_keys = []
-    metric_names, metric_name_map = None, None
+    if not glob.glob(os.path.join(pareto_dir, "*.json")) and not pareto_dir.endswith("pareto"):
+        pareto_dir += "/pareto"
+    summary = load_front_summary(pareto_dir)
+    print(f"Found {len(summary['hashes'])} Pareto members.")
 
     import operator
-    import re
 
     OPERATORS = {
         "<": operator.lt,
@@ -294,47 +684,33 @@ def main():
                 return key, OPERATORS[op_str], val
         raise ValueError(f"Invalid limit expression: {expr}")
 
-    limit_checks = []
+    # vectorized over all members; a missing metric counts as +inf
+    keep = np.ones(len(summary["hashes"]), dtype=bool)
     if args.limits:
         for expr in args.limits:
             try:
                 key, op_fn, val = parse_limit_expr(expr)
-                limit_checks.append((key + "_mean", op_fn, val))
             except Exception as e:
                 print(f"Skipping invalid limit expression '{expr}': {e}")
-
-    for entry_path in entries:
-        try:
-            with open(entry_path) as f:
-                entry = json.load(f)
-            h = os.path.splitext(os.path.basename(entry_path))[0].split("_")[-1]
-            if not w_keys:
-                w_keys = sorted(k for k in entry.get("analyses_combined", {}) if k.startswith("w_"))
-            if metric_names is None:
-                metric_names = entry.get("optimize", {}).get("scoring", [])
-                metric_name_map = {f"w_{i}": name for i, name in enumerate(metric_names)}
-            if any(
-                not op(entry.get("analyses_combined", {}).get(key, float("inf")), val)
-                for key, op, val in limit_checks
-            ):
                 continue
-            values = [entry.get("analyses_combined", {}).get(k) for k in w_keys]
-            if all(v is not None for v in values):
-                points.append((*values, h))
-                filenames[h] = os.path.split(entry_path)[-1]
-        except Exception as e:
-            print(f"Error loading {h}: {e}")
+            metric_names = summary["metric_names"]
+            if key + "_mean" in metric_names:
+                column = summary["metrics"][:, metric_names.index(key + "_mean")]
+                column = np.where(np.isnan(column), np.inf, column)
+            else:
+                column = np.full(len(keep), np.inf)
+            keep &= op_fn(column, val)
 
-    if not points:
+    w_keys = [f"w_{i}" for i in range(summary["objectives"].shape[1])]
+    metric_name_map = {f"w_{i}": name for i, name in enumerate(summary["scoring"])}
+    values_matrix = summary["objectives"][keep]
+    hashes = [h for h, k in zip(summary["hashes"], keep) if k]
+    filenames = dict(zip(summary["hashes"], summary["files"]))
+
+    if not len(values_matrix):
         print("No valid Pareto points found.")
         exit(0)
 
-    values_matrix = np.array([p[:-1] for p in points])
-    hashes = [p[-1] for p in points]
-    if values_matrix.shape[1] != len(w_keys):
-        print("Mismatch between values and keys!")
-        exit(1)
-
     weights = tuple([0.0] * values_matrix.shape[1]) if args.weights is None else args.weights
     if len(weights) == 1:
         weights = tuple([weights[0]] * values_matrix.shape[1])
@@ -411,15 +787,6 @@ def main():
         import plotly.graph_objs as go
         import plotly.io as pio
 
-        # Load a config to get metric names
-        sample_entry_path = entries[0]
-        with open(sample_entry_path) as f:
-            sample_entry = json.load(f)
-
-        # Try to read optimize.scoring if available
-        metric_names = sample_entry.get("optimize", {}).get("scoring", [])
-        metric_name_map = {f"w_{i}": name for i, name in enumerate(metric_names)}
-
         fig = go.Figure()
 
         # Scatter points for Pareto members
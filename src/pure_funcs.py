@@ -657,16 +657,28 @@ def get_template_live_config(passivbot_mode="v7"):
                     "short_unstuck_loss_allowance_pct": [0.001, 0.05],
                     "short_unstuck_threshold": [0.4, 0.95],
                 },
+                "checkpoint_interval_minutes": 10.0,
                 "compress_results_file": True,
+                "compute_all_metrics": False,
+                "convergence_threshold": 0.001,
+                "convergence_window": 0,
                 "crossover_probability": 0.7,
                 "enable_overrides": [],
+                "evaluation_cache": False,
+                "island_migration_interval": 1000,
+                "island_n_migrants": 8,
                 "iters": 30000,
                 "limits": "--drawdown_worst 0.333 --loss_profit_ratio: 0.9 --position_unchanged_hours_max 300.0",
                 "mutation_probability": 0.45,
                 "n_cpus": 5,
                 "population_size": 1000,
+                "probe_worker_memory": True,
+                "results_format": "msgpack",
                 "round_to_n_significant_digits": 5,
                 "scoring": ["adg", "sharpe_ratio"],
+                "surrogate_exploration": 0.1,
+                "surrogate_keep_fraction": 1.0,
+                "telemetry_interval_seconds": 30.0,
                 "write_all_results": True,
             },
         }
@@ -0,0 +1,275 @@
+"""
+Rebuild the Pareto front of an optimize run under a new scoring and/or new limits.
+
+    python3 src/recompute_pareto.py optimize_results/<run>/ --scoring mdg,sharpe_ratio \
+        --limits "--penalize_if_greater_than_drawdown_worst 0.3"
+
+The results of the run (all_results.bin, or all_results/ if it was written in columnar format)
+are streamed in chunks. Worker processes compute the new objectives of a chunk from its
+combined metrics and reduce the chunk to its non-dominated subset. The parent merges these
+subsets into the front. Memory use is bounded by the chunk size and the size of the front,
+not by the number of results.
+
+all_results.bin chunks start at full (non-diff) records, taken from all_results.idx. The index
+is built first if it's missing. The new front is written like an optimizer run's front
+(pareto/ and index.json), to <run>/pareto_recomputed/ unless --output is given.
+"""
+
+import argparse
+import functools
+import glob
+import json
+import logging
+import multiprocessing
+import os
+
+import msgpack
+import numpy as np
+
+from columnar_results import get_chunk_paths, get_columnar_dir, load_chunk, load_columnar_schema
+from opt_utils import deep_updated, load_result, load_results_index, update_results_index
+from optimize import build_limit_checks, calc_fitness
+from pareto_store import ParetoStore, front_dominance
+from procedures import load_config, parse_limits_string
+
+CHUNK_ID_SHIFT = 32  # columnar ids: chunk number << CHUNK_ID_SHIFT | row in chunk
+
+
+def non_dominated(ids: np.ndarray, objs: np.ndarray) -> tuple:
+    """
+    (ids, objs) of the non-dominated rows of objs (n_rows, n_objectives), all objectives
+    minimized. Of identical rows, the first one is kept.
+    """
+    if not len(objs):
+        return ids, objs
+    # in lexicographic order no row can dominate an earlier one, so a row accepted into the
+    # front stays there
+    _, order = np.unique(objs, axis=0, return_index=True)
+    front = np.empty((objs.shape[1], len(order)))
+    kept = []
+    for i in order:
+        if kept and front_dominance(front[:, : len(kept)], objs[i])[0]:
+            continue
+        front[:, len(kept)] = objs[i]
+        kept.append(i)
+    return ids[kept], objs[kept]
+
+
+def _to_front(ids: list, objs: list, n_objectives: int) -> tuple:
+    return non_dominated(
+        np.array(ids, dtype=np.int64), np.array(objs, dtype=np.float64).reshape(-1, n_objectives)
+    )
+
+
+def msgpack_chunk_front(task) -> tuple:
+    """Front of n_records records of filepath, the first of which is a full record at offset."""
+    filepath, offset, first_id, n_records, scoring, limit_checks = task
+    ids, objs = [], []
+    with open(filepath, "rb") as f:
+        f.seek(offset)
+        unpacker = msgpack.Unpacker(f, raw=False)
+        current = {}
+        for i in range(n_records):
+            current = deep_updated(current, next(unpacker))
+            objectives = calc_fitness(current["analyses_combined"], scoring, limit_checks)
+            if objectives is not None:
+                ids.append(first_id + i)
+                objs.append(objectives)
+    return _to_front(ids, objs, len(scoring))
+
+
+def columnar_chunk_front(task) -> tuple:
+    chunk_path, chunk_no, combined_columns, scoring, limit_checks = task
+    data = load_chunk(chunk_path)
+    names = list(combined_columns)
+    combined = data[:, list(combined_columns.values())].tolist()
+    ids, objs = [], []
+    for row_no, values in enumerate(combined):
+        analyses_combined = {k: None if v != v else v for k, v in zip(names, values)}
+        objectives = calc_fitness(analyses_combined, scoring, limit_checks)
+        if objectives is not None:
+            ids.append(chunk_no << CHUNK_ID_SHIFT | row_no)
+            objs.append(objectives)
+    return _to_front(ids, objs, len(scoring))
+
+
+def msgpack_tasks(filepath: str, chunk_size: int, scoring: list, limit_checks: list):
+    update_results_index(filepath)
+    index = load_results_index(filepath)
+    keyframes = np.flatnonzero(index["offset"] == index["keyframe"])
+    bounds = [0]
+    for i in keyframes.tolist():
+        if i - bounds[-1] >= chunk_size:
+            bounds.append(i)
+    bounds.append(len(index))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if end > start:
+            offset = int(index["offset"][start])
+            yield filepath, offset, start, end - start, scoring, limit_checks
+
+
+def columnar_tasks(results_dir: str, scoring: list, limit_checks: list):
+    schema = load_columnar_schema(results_dir)
+    combined_columns = {
+        name: i
+        for i, name in enumerate(schema["columns"])
+        if i >= schema["n_params"] and "." not in name and not name.startswith("w_")
+    }
+    for chunk_no, chunk_path in enumerate(get_chunk_paths(results_dir)):
+        yield chunk_path, chunk_no, combined_columns, scoring, limit_checks
+
+
+@functools.lru_cache(maxsize=1)
+def load_cached_chunk(chunk_path: str) -> np.ndarray:
+    return load_chunk(chunk_path)
+
+
+def columnar_entry(schema: dict, chunk_paths: list, row_id: int) -> tuple:
+    """(entry, parameter vector) of a columnar result, as far as the columns hold it."""
+    chunk = load_cached_chunk(chunk_paths[row_id >> CHUNK_ID_SHIFT])
+    row = chunk[row_id & ((1 << CHUNK_ID_SHIFT) - 1)].tolist()
+    n_params = schema["n_params"]
+    entry = {"bot": {}, "analyses_combined": {}, "analyses": {}}
+    for i, (name, value) in enumerate(zip(schema["columns"], row)):
+        value = None if value != value else value
+        if i < n_params:
+            pside, key = name.split("_", 1)
+            entry["bot"].setdefault(pside, {})[key] = value
+        elif "." in name:
+            exchange, key = name.split(".", 1)
+            entry["analyses"].setdefault(exchange, {})[key] = value
+        elif not name.startswith("w_"):
+            entry["analyses_combined"][name] = value
+    return entry, np.array(row[:n_params])
+
+
+def load_stored_metrics(results_dir: str, columnar: bool) -> set:
+    """Names of the combined metrics stored with the run's results, e.g. adg_mean."""
+    if columnar:
+        schema = load_columnar_schema(results_dir)
+        return {
+            name
+            for i, name in enumerate(schema["columns"])
+            if i >= schema["n_params"] and "." not in name and not name.startswith("w_")
+        }
+    with open(os.path.join(results_dir, "all_results.bin"), "rb") as f:
+        first = next(msgpack.Unpacker(f, raw=False), {})
+    return set(first.get("analyses_combined", {}))
+
+
+def check_metrics_stored(stored: set, scoring: list, limit_checks: list):
+    """
+    Raise if a scoring or limit metric was not stored with the results. Unless
+    optimize.compute_all_metrics was set, a run only computes the metrics of its own scoring
+    and limits; without this check calc_fitness would reject every result of a new scoring,
+    and calc_penalty would skip a new limit.
+    """
+    required = [f"{sk}_mean" for sk in scoring] + [check["metric_key"] for check in limit_checks]
+    missing = sorted({key for key in required if key not in stored})
+    if missing:
+        raise ValueError(
+            f"metrics {missing} are not in the stored results; the run computed only the "
+            "metrics of its own scoring and limits. Rerun the optimizer with "
+            "optimize.compute_all_metrics set to true to recompute under other metrics."
+        )
+
+
+def load_base_optimize_config(results_dir: str, config_path: str = None) -> dict:
+    """optimize section of config_path if given, else of the run's own results."""
+    if config_path is not None:
+        return load_config(config_path, verbose=False)["optimize"]
+    results_filepath = os.path.join(results_dir, "all_results.bin")
+    if os.path.exists(results_filepath) and os.path.getsize(results_filepath):
+        with open(results_filepath, "rb") as f:
+            return next(msgpack.Unpacker(f, raw=False))["optimize"]
+    for path in glob.glob(os.path.join(results_dir, "pareto", "*.json")):
+        with open(path) as f:
+            return json.load(f)["optimize"]
+    raise ValueError(f"no config found in {results_dir}; pass --config")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="recompute_pareto", description="rebuild the Pareto front of an optimize run"
+    )
+    parser.add_argument("results_dir", type=str, help="optimize_results/ directory of the run")
+    parser.add_argument(
+        "--config", type=str, default=None, help="take scoring and limits from this config"
+    )
+    parser.add_argument(
+        "--scoring", type=str, default=None, help="comma separated scoring metrics"
+    )
+    parser.add_argument(
+        "--limits", type=str, default=None, help='limits, e.g. "--drawdown_worst 0.3"'
+    )
+    parser.add_argument("--output", type=str, default=None, help="output directory")
+    parser.add_argument(
+        "--chunk_size", type=int, default=20000, help="results per chunk (all_results.bin)"
+    )
+    parser.add_argument(
+        "--n_cpus", type=int, default=multiprocessing.cpu_count(), help="worker processes"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)-8s %(message)s",
+        level=logging.INFO,
+        datefmt="%Y-%m-%dT%H:%M:%S",
+    )
+
+    results_dir = args.results_dir.rstrip("/")
+    optimize_config = load_base_optimize_config(results_dir, args.config)
+    if args.scoring is not None:
+        optimize_config["scoring"] = [x.strip() for x in args.scoring.split(",")]
+    if args.limits is not None:
+        optimize_config["limits"] = args.limits
+    optimize_config["scoring"] = sorted(optimize_config["scoring"])
+    optimize_config["limits"] = parse_limits_string(optimize_config.get("limits", {}))
+    scoring = optimize_config["scoring"]
+    limit_checks = build_limit_checks({"optimize": optimize_config})
+    logging.info(f"scoring: {scoring} | limits: {optimize_config['limits']}")
+
+    output_dir = args.output or os.path.join(results_dir, "pareto_recomputed")
+    if os.path.exists(output_dir) and os.listdir(output_dir):
+        raise FileExistsError(f"{output_dir} is not empty; remove it or pass another --output")
+
+    columnar = os.path.exists(os.path.join(get_columnar_dir(results_dir), "schema.json"))
+    check_metrics_stored(load_stored_metrics(results_dir, columnar), scoring, limit_checks)
+    if columnar:
+        tasks = columnar_tasks(results_dir, scoring, limit_checks)
+        chunk_front = columnar_chunk_front
+    else:
+        results_filepath = os.path.join(results_dir, "all_results.bin")
+        tasks = msgpack_tasks(results_filepath, args.chunk_size, scoring, limit_checks)
+        chunk_front = msgpack_chunk_front
+
+    front_ids = np.empty(0, dtype=np.int64)
+    front_objs = np.empty((0, len(scoring)))
+    with multiprocessing.Pool(args.n_cpus) as pool:
+        for n_chunks, (ids, objs) in enumerate(pool.imap_unordered(chunk_front, tasks), 1):
+            front_ids, front_objs = non_dominated(
+                np.concatenate([front_ids, ids]), np.concatenate([front_objs, objs])
+            )
+            if n_chunks % 10 == 0:
+                logging.info(f"{n_chunks} chunks done, front size {len(front_ids)}")
+    logging.info(f"front size {len(front_ids)}; writing it to {output_dir}")
+
+    store = ParetoStore(output_dir, flush_interval=float("inf"))
+    if columnar:
+        schema, chunk_paths = load_columnar_schema(results_dir), get_chunk_paths(results_dir)
+    order = np.argsort(front_ids)  # in file order, so each chunk is read once
+    for row_id, objectives in zip(front_ids[order].tolist(), front_objs[order].tolist()):
+        if columnar:
+            entry, params = columnar_entry(schema, chunk_paths, row_id)
+        else:
+            entry, params = load_result(results_filepath, row_id), None
+        entry["optimize"] = {**entry.get("optimize", {}), **optimize_config}
+        entry["analyses_combined"] = {
+            **{k: v for k, v in entry["analyses_combined"].items() if not k.startswith("w_")},
+            **{f"w_{i}": val for i, val in enumerate(objectives)},
+        }
+        store.add_entry(entry, params=params)
+    store.flush_now()
+
+
+if __name__ == "__main__":
+    main()
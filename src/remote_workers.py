@@ -0,0 +1,435 @@
+"""
+Remote evaluation workers for the optimizer.
+
+The optimizer listens on a TCP address (``--listen host:port``); worker processes on other
+machines connect to it (``python3 src/optimize_worker.py host:port``). A worker receives the
+config once, loads the dataset from its own hlcvs cache (checked against the optimizer's
+cache hashes), and from then on only receives parameter vectors and sends back objectives
+and per-exchange analyses. Duplicate detection stays with the optimizer: it claims every task
+in its dedup table (perturbing duplicates) before sending the canonical genes out, so workers
+only backtest.
+
+Protocol: each message is a msgpack map prefixed by its length (4 bytes, big endian).
+    worker -> optimizer: hello {n_slots, host, token}, ready, heartbeat,
+                         result {id, genes, objectives, analyses, seconds}, failed {id, message}
+    optimizer -> worker: init {config, overrides_list, dataset_hashes}, task {id, genes}, error
+
+Workers send a heartbeat every HEARTBEAT_INTERVAL seconds. A worker silent for longer than
+the heartbeat timeout, or whose connection drops, is dropped and its tasks are requeued:
+to other workers if any are connected, otherwise to the local pool.
+
+Set the same PB_WORKER_TOKEN environment variable on both sides to reject unknown workers;
+it is required when the optimizer listens on a non-loopback address. No pickle is involved,
+but the protocol is meant for trusted networks only.
+"""
+
+import hmac
+import ipaddress
+import logging
+import os
+import queue
+import select
+import socket
+import struct
+import threading
+import time
+from itertools import count
+
+import msgpack
+
+from evolution import evaluate_in_worker
+
+HEARTBEAT_INTERVAL = 5.0
+LENGTH = struct.Struct(">I")
+
+
+def parse_address(address: str) -> tuple:
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+def is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False  # e.g. "" binds all interfaces
+
+
+def send_message(sock, message: dict, lock=None) -> None:
+    data = msgpack.packb(message, use_bin_type=True)
+    if lock is None:
+        sock.sendall(LENGTH.pack(len(data)) + data)
+    else:
+        with lock:
+            sock.sendall(LENGTH.pack(len(data)) + data)
+
+
+class MessageReader:
+    """Incremental decoder for length-prefixed frames."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b""
+        self.pending = []
+
+    def read_available(self, timeout: float) -> list:
+        """Messages that arrived within timeout. Raises ConnectionError on EOF."""
+        if self.pending:
+            messages, self.pending = self.pending, []
+            return messages
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        if readable:
+            chunk = self.sock.recv(1 << 20)
+            if not chunk:
+                raise ConnectionError("connection closed")
+            self.buffer += chunk
+        messages = []
+        while len(self.buffer) >= LENGTH.size:
+            (length,) = LENGTH.unpack_from(self.buffer)
+            if len(self.buffer) < LENGTH.size + length:
+                break
+            payload = self.buffer[LENGTH.size : LENGTH.size + length]
+            self.buffer = self.buffer[LENGTH.size + length :]
+            messages.append(msgpack.unpackb(payload, raw=False))
+        return messages
+
+    def read_one(self, timeout: float | None = None) -> dict:
+        deadline = None if timeout is None else time.time() + timeout
+        while not self.pending:
+            if deadline is not None and time.time() > deadline:
+                raise TimeoutError("no message received")
+            self.pending = self.read_available(1.0)
+        return self.pending.pop(0)
+
+
+# -- optimizer side -------------------------------------------------------------------
+
+
+class RemoteEvaluationBackend:
+    """
+    Evaluation backend for evolution.ea_steady_state which sends work to connected remote
+    workers while they have free slots, and to the local pool otherwise.
+
+    claim_fn(genes) -> (canonical genes, None) or (None, objectives) claims genes in the
+    optimizer's dedup table, perturbing them in place if they are a duplicate (see
+    Evaluator.claim). Tasks for remote workers are claimed before they are queued; a duplicate
+    which couldn't be perturbed gets the earlier objectives without being sent.
+
+    on_remote_result(canonical genes, analyses, objectives) is called for every remote result,
+    so the optimizer can record it like a local one.
+    """
+
+    def __init__(
+        self,
+        pool,
+        local_capacity: int,
+        address: str,
+        init_message: dict,
+        on_remote_result,
+        claim_fn,
+        heartbeat_timeout: float = 30.0,
+    ):
+        self.pool = pool
+        self.local_capacity = local_capacity
+        self.init_message = init_message
+        self.on_remote_result = on_remote_result
+        self.claim_fn = claim_fn
+        self.heartbeat_timeout = heartbeat_timeout
+        self.token = os.environ.get("PB_WORKER_TOKEN")
+        host, _ = parse_address(address)
+        if not self.token and not is_loopback(host):
+            raise ValueError(
+                f"set PB_WORKER_TOKEN to listen on {address}; without a token any client could "
+                "read the config and inject results"
+            )
+        self.n_pending = 0
+        self._results = queue.Queue()
+        self._tasks = queue.Queue()  # (task_id, individual, genes, canonical) for a remote slot
+        self._task_ids = count()
+        self._lock = threading.Lock()
+        self._result_lock = threading.Lock()
+        # name -> {"n_slots": int, "in_flight": {task_id: (individual, genes, canonical)}}
+        self._workers = {}
+        self._n_remote_pending = 0
+        self.n_remote_failures = 0  # remote tasks that failed and were evaluated locally
+        self._closed = False
+        self._server = socket.create_server(parse_address(address))
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        logging.info(f"listening for remote workers on {address}")
+
+    @property
+    def capacity(self) -> int:
+        with self._lock:
+            return self.local_capacity + sum(w["n_slots"] for w in self._workers.values())
+
+    def submit(self, individual) -> None:
+        with self._lock:
+            remote_capacity = sum(w["n_slots"] for w in self._workers.values())
+            to_remote = self._n_remote_pending < remote_capacity
+            if to_remote:
+                self._n_remote_pending += 1
+            self.n_pending += 1
+        if not to_remote:
+            self._submit_local(individual)
+            return
+        genes = list(individual)
+        canonical, existing_score = self.claim_fn(genes)
+        if canonical is None:
+            with self._lock:
+                self._n_remote_pending -= 1
+            self._results.put((individual, (genes, existing_score, None), None))
+            return
+        with self._lock:
+            # the last worker may have dropped while claiming; _drop_worker has then already
+            # drained the queue, so nobody would take the task
+            if sum(w["n_slots"] for w in self._workers.values()):
+                self._tasks.put((next(self._task_ids), individual, genes, canonical))
+                return
+            self._n_remote_pending -= 1
+        self._submit_local_claimed(individual, genes, canonical)
+
+    def _submit_local(self, individual) -> None:
+        self.pool.apply_async(
+            evaluate_in_worker,
+            (list(individual),),
+            callback=lambda res, ind=individual: self._results.put((ind, res, None)),
+            error_callback=lambda exc, ind=individual: self._results.put((ind, None, exc)),
+        )
+
+    def _submit_local_claimed(self, individual, genes, canonical) -> None:
+        """Evaluate a task claimed for a remote worker in the local pool instead."""
+        self.pool.apply_async(
+            evaluate_in_worker,
+            (canonical, True),
+            callback=lambda res, ind=individual, genes=genes: self._results.put(
+                (ind, (genes, res[1], res[2]), None)
+            ),
+            error_callback=lambda exc, ind=individual: self._results.put((ind, None, exc)),
+        )
+
+    def next_result(self, timeout=None):
+        """
+        Blocks until an evaluation finishes. Returns (individual, genes, fitness, timing),
+        timing being (worker name, seconds taken).
+        """
+        individual, res, exc = self._results.get(timeout=timeout)
+        with self._lock:
+            self.n_pending -= 1
+        if exc is not None:
+            raise exc
+        genes, fitness, timing = res
+        return individual, genes, fitness, timing
+
+    def close(self) -> None:
+        self._closed = True
+        self._server.close()
+
+    def _accept_loop(self) -> None:
+        while not self._closed:
+            try:
+                sock, peer = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_worker, args=(sock, peer), daemon=True).start()
+
+    def _serve_worker(self, sock, peer) -> None:
+        name = f"{peer[0]}:{peer[1]}"
+        reader = MessageReader(sock)
+        send_lock = threading.Lock()
+        try:
+            hello = reader.read_one(timeout=self.heartbeat_timeout)
+            if hello.get("type") != "hello" or not hmac.compare_digest(
+                str(hello.get("token")), str(self.token)
+            ):
+                send_message(sock, {"type": "error", "message": "rejected"})
+                raise ConnectionError("bad hello")
+            name = f"{hello.get('host', peer[0])}:{peer[1]}"
+            send_message(sock, self.init_message)
+            logging.info(f"remote worker {name} connected, preparing dataset")
+            while (message := reader.read_one(self.heartbeat_timeout))["type"] == "heartbeat":
+                pass  # the worker is loading its dataset
+            if message["type"] != "ready":
+                raise ConnectionError(message.get("message", f"unexpected {message['type']}"))
+            worker = {"name": name, "n_slots": int(hello["n_slots"]), "in_flight": {}}
+            with self._lock:
+                self._workers[name] = worker
+            logging.info(f"remote worker {name} ready with {worker['n_slots']} slots")
+            last_seen = time.time()
+            while not self._closed:
+                while len(worker["in_flight"]) < worker["n_slots"]:
+                    try:
+                        task_id, *task = self._tasks.get_nowait()
+                    except queue.Empty:
+                        break
+                    worker["in_flight"][task_id] = task
+                    send_message(
+                        sock, {"type": "task", "id": task_id, "genes": task[2]}, send_lock
+                    )
+                for message in reader.read_available(0.05):
+                    last_seen = time.time()
+                    if message["type"] in ("result", "failed"):
+                        self._handle_result(worker, message)
+                if time.time() - last_seen > self.heartbeat_timeout:
+                    raise TimeoutError("heartbeat timeout")
+        except Exception as e:
+            logging.warning(f"remote worker {name} lost: {e!r}")
+        finally:
+            sock.close()
+            self._drop_worker(name)
+
+    def _handle_result(self, worker: dict, message: dict) -> None:
+        task = worker["in_flight"].pop(message["id"], None)
+        if task is None:
+            return
+        individual, genes, canonical = task
+        with self._lock:
+            self._n_remote_pending -= 1
+        if message["type"] == "failed":
+            self.n_remote_failures += 1
+            logging.warning(
+                f"remote worker {worker['name']} failed a task ({self.n_remote_failures} so far):"
+                f" {message['message']}; evaluating it locally"
+            )
+            self._submit_local_claimed(individual, genes, canonical)
+            return
+        objectives = tuple(message["objectives"])
+        with self._result_lock:
+            self.on_remote_result(canonical, message["analyses"], objectives)
+        timing = (worker["name"], message.get("seconds"))
+        self._results.put((individual, (genes, objectives, timing), None))
+
+    def _drop_worker(self, name: str) -> None:
+        with self._lock:
+            worker = self._workers.pop(name, None)
+            orphans = list(worker["in_flight"].values()) if worker else []
+            remote_capacity = sum(w["n_slots"] for w in self._workers.values())
+            if remote_capacity:
+                for task in orphans:
+                    self._tasks.put((next(self._task_ids), *task))
+            else:
+                # nobody left to take queued tasks either
+                while True:
+                    try:
+                        orphans.append(self._tasks.get_nowait()[1:])
+                    except queue.Empty:
+                        break
+                self._n_remote_pending -= len(orphans)
+        if not remote_capacity:
+            # already claimed, so they must not go through the dedup check again
+            for task in orphans:
+                self._submit_local_claimed(*task)
+        if orphans:
+            where = "remote workers" if remote_capacity else "the local pool"
+            logging.info(f"requeued {len(orphans)} tasks of {name} to {where}")
+
+
+# -- worker side ----------------------------------------------------------------------
+
+_task_evaluate = None
+
+
+def init_task_worker(evaluate_fn):
+    """
+    Pool initializer on remote workers; evaluate_fn(genes) -> (objectives, analyses) backtests
+    genes already claimed by the optimizer.
+    """
+    global _task_evaluate
+    _task_evaluate = evaluate_fn
+
+
+def run_task(task_id, genes):
+    individual = list(genes)
+    start = time.perf_counter()
+    objectives, analyses = _task_evaluate(individual)
+    seconds = time.perf_counter() - start
+    return task_id, individual, [float(x) for x in objectives], analyses, seconds
+
+
+def run_worker(address: str, n_cpus: int, prepare_fn) -> None:
+    """
+    Connect to an optimizer and evaluate its tasks until it goes away.
+    prepare_fn(init_message) -> (evaluate_fn, cleanup_fn) loads the dataset and builds the
+    evaluator; evaluate_fn must be picklable.
+    """
+    import multiprocessing
+
+    sock = socket.create_connection(parse_address(address))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    send_lock = threading.Lock()
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                send_message(sock, {"type": "heartbeat"}, send_lock)
+            except OSError:
+                return
+
+    reader = MessageReader(sock)
+    hello = {
+        "type": "hello",
+        "n_slots": 2 * n_cpus,
+        "host": socket.gethostname(),
+        "token": os.environ.get("PB_WORKER_TOKEN"),
+    }
+    send_message(sock, hello, send_lock)
+    init_message = reader.read_one()
+    if init_message["type"] != "init":
+        raise ConnectionError(init_message.get("message", "rejected by optimizer"))
+    threading.Thread(target=heartbeat, daemon=True).start()
+    cleanup_fn = None
+    pool = None
+    try:
+        try:
+            evaluate_fn, cleanup_fn = prepare_fn(init_message)
+        except Exception as e:
+            send_message(sock, {"type": "error", "message": repr(e)}, send_lock)
+            raise
+        pool = multiprocessing.Pool(n_cpus, initializer=init_task_worker, initargs=(evaluate_fn,))
+
+        def on_done(res):
+            task_id, genes, objectives, analyses, seconds = res
+            message = {
+                "type": "result",
+                "id": task_id,
+                "genes": genes,
+                "objectives": objectives,
+                "analyses": analyses,
+                "seconds": seconds,
+            }
+            try:
+                send_message(sock, message, send_lock)
+            except OSError:
+                pass
+
+        def on_error(task_id, exc):
+            try:
+                message = {"type": "failed", "id": task_id, "message": repr(exc)}
+                send_message(sock, message, send_lock)
+            except OSError:
+                pass
+
+        send_message(sock, {"type": "ready"}, send_lock)
+        logging.info(f"connected to optimizer {address}, {n_cpus} processes")
+        while True:
+            try:
+                messages = reader.read_available(1.0)
+            except (ConnectionError, OSError):
+                logging.info("optimizer closed the connection")
+                return
+            for message in messages:
+                if message["type"] == "task":
+                    pool.apply_async(
+                        run_task,
+                        (message["id"], message["genes"]),
+                        callback=on_done,
+                        error_callback=lambda exc, task_id=message["id"]: on_error(task_id, exc),
+                    )
+    finally:
+        stop.set()
+        sock.close()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if cleanup_fn is not None:
+            cleanup_fn()
@@ -0,0 +1,164 @@
+"""
+Binary channel carrying optimizer results from worker processes to the results writer.
+
+Each worker appends fixed-size float64 records to its own file ``worker_<host>_<pid>.bin`` in
+the channel directory (the host name keeps files apart when islands on several machines share
+one channel directory). A file starts with a schema header written once (magic, header length,
+JSON schema); every record then holds the parameter vector, one metric vector per exchange
+and the objective vector. Missing metrics (None) are stored as NaN and read back as None.
+
+The writer polls the directory and only consumes complete records, so no locking, pickling
+or IPC is involved on the hot path.
+"""
+
+import glob
+import json
+import math
+import os
+import socket
+import struct
+
+import numpy as np
+
+MAGIC = b"PBRCH001"
+HEADER_PREFIX = struct.Struct("<8sI")  # magic, length of the JSON schema that follows
+
+
+def make_schema(n_params: int, analyses: dict, n_objectives: int) -> dict:
+    exchanges = list(analyses)
+    metric_keys = sorted(set().union(*(analyses[ex].keys() for ex in exchanges)))
+    return {
+        "n_params": n_params,
+        "exchanges": exchanges,
+        "metric_keys": metric_keys,
+        "n_objectives": n_objectives,
+        "record_size": n_params + len(exchanges) * len(metric_keys) + n_objectives,
+    }
+
+
+def _to_float(value) -> float:
+    return math.nan if value is None else float(value)
+
+
+def _from_float(value: float):
+    return None if math.isnan(value) else value
+
+
+class ResultsChannel:
+    """Worker side. Picklable; each process lazily opens its own append file."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._fd = None
+        self._pid = None
+        self._schema = None
+
+    def __getstate__(self):
+        return {"directory": self.directory}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"])
+
+    def _open(self, schema: dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._pid = os.getpid()
+        self._schema = schema
+        path = os.path.join(self.directory, f"worker_{socket.gethostname()}_{self._pid}.bin")
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.fstat(self._fd).st_size == 0:
+            header = json.dumps(schema).encode()
+            os.write(self._fd, HEADER_PREFIX.pack(MAGIC, len(header)) + header)
+
+    def put(self, individual, analyses: dict, objectives) -> None:
+        if self._pid != os.getpid():
+            self._open(make_schema(len(individual), analyses, len(objectives)))
+        schema = self._schema
+        record = np.empty(schema["record_size"], dtype=np.float64)
+        n_params, n_metrics = schema["n_params"], len(schema["metric_keys"])
+        record[:n_params] = individual
+        i = n_params
+        for exchange in schema["exchanges"]:
+            analysis = analyses[exchange]
+            record[i : i + n_metrics] = [
+                _to_float(analysis.get(key)) for key in schema["metric_keys"]
+            ]
+            i += n_metrics
+        record[i:] = objectives
+        # one write per record; O_APPEND keeps records contiguous
+        os.write(self._fd, record.tobytes())
+
+    def close(self) -> None:
+        if self._fd is not None and self._pid == os.getpid():
+            os.close(self._fd)
+        self._fd = None
+        self._pid = None
+
+
+class ResultsReader:
+    """Writer side. poll() returns the records appended since the previous call."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._files = {}  # path -> {"offset": int, "schema": dict | None}
+
+    def _read_header(self, path: str, state: dict) -> bool:
+        with open(path, "rb") as f:
+            prefix = f.read(HEADER_PREFIX.size)
+            if len(prefix) < HEADER_PREFIX.size:
+                return False
+            magic, length = HEADER_PREFIX.unpack(prefix)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a results channel file")
+            header = f.read(length)
+            if len(header) < length:
+                return False
+        state["schema"] = json.loads(header)
+        state["offset"] = HEADER_PREFIX.size + length
+        return True
+
+    def poll(self) -> list:
+        """List of (individual, analyses, objectives) tuples."""
+        records = []
+        for path in sorted(glob.glob(os.path.join(self.directory, "worker_*.bin"))):
+            state = self._files.setdefault(path, {"offset": 0, "schema": None})
+            if state["schema"] is None and not self._read_header(path, state):
+                continue
+            schema = state["schema"]
+            record_bytes = schema["record_size"] * 8
+            with open(path, "rb") as f:
+                f.seek(state["offset"])
+                data = f.read()
+            n_records = len(data) // record_bytes
+            if n_records == 0:
+                continue
+            state["offset"] += n_records * record_bytes
+            matrix = np.frombuffer(data[: n_records * record_bytes], dtype=np.float64).reshape(
+                n_records, schema["record_size"]
+            )
+            records.extend(self._decode(schema, row) for row in matrix.tolist())
+        return records
+
+    def backlog(self) -> int:
+        """Number of complete records appended to known files but not returned by poll() yet."""
+        n_records = 0
+        for path, state in self._files.items():
+            if state["schema"] is None:
+                continue
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            n_records += (size - state["offset"]) // (state["schema"]["record_size"] * 8)
+        return n_records
+
+    @staticmethod
+    def _decode(schema: dict, row: list) -> tuple:
+        n_params, keys = schema["n_params"], schema["metric_keys"]
+        individual = row[:n_params]
+        analyses = {}
+        i = n_params
+        for exchange in schema["exchanges"]:
+            analyses[exchange] = {k: _from_float(v) for k, v in zip(keys, row[i : i + len(keys)])}
+            i += len(keys)
+        objectives = row[i:]
+        return individual, analyses, objectives
@@ -0,0 +1,167 @@
+"""
+Registry of named, reference-counted shared memory datasets.
+
+Runs on the same box using the same data (same get_cache_hash) attach to one shared memory
+file instead of each writing a private copy. A segment is created by the first run that
+needs it and deleted by the last one to detach.
+
+Layout in the registry directory (in /dev/shm where available):
+- <key>.bin: the array data, created under <key>.lock and moved into place once complete
+- <key>.refs/<pid>_<id>: one file per attachment
+
+A reference whose process no longer exists is ignored and removed, so a crashed run doesn't
+keep a segment alive forever; its segment is reused by the next run attaching to it.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from uuid import uuid4
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no file locks; concurrent runs may race on creating a segment
+    fcntl = None
+
+
+def default_directory() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "passivbot_datasets")
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class SharedDatasetRegistry:
+    def __init__(self, directory: str = None):
+        self.directory = directory or default_directory()
+        os.makedirs(self.directory, exist_ok=True)
+        self._refs = {}  # key -> ref files held by this process
+
+    def segment_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def key_of(self, path: str):
+        """Key of the segment at path, or None if path is not a segment of this registry."""
+        directory, name = os.path.split(path)
+        if not name.endswith(".bin"):
+            return None
+        if os.path.abspath(directory) != os.path.abspath(self.directory):
+            return None
+        return name[: -len(".bin")]
+
+    def _refs_dir(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.refs")
+
+    @contextmanager
+    def _locked(self, key: str):
+        with open(os.path.join(self.directory, f"{key}.lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _live_refs(self, key: str) -> list:
+        """Ref files of running processes; removes those of dead ones."""
+        refs_dir = self._refs_dir(key)
+        if not os.path.isdir(refs_dir):
+            return []
+        live = []
+        for name in os.listdir(refs_dir):
+            if pid_alive(int(name.split("_")[0])):
+                live.append(name)
+            else:
+                try:
+                    os.remove(os.path.join(refs_dir, name))
+                except OSError:
+                    pass
+        return live
+
+    def _add_ref(self, key: str) -> None:
+        refs_dir = self._refs_dir(key)
+        os.makedirs(refs_dir, exist_ok=True)
+        ref = os.path.join(refs_dir, f"{os.getpid()}_{uuid4().hex[:8]}")
+        open(ref, "w").close()
+        self._refs.setdefault(key, []).append(ref)
+
+    def attach(self, key: str, array: np.ndarray) -> str:
+        """
+        Path of the segment named key holding array's data, written from array if no run has
+        created it yet. Takes a reference; release it with detach(key).
+        """
+        path = self.segment_path(key)
+        with self._locked(key):
+            live_refs = self._live_refs(key)
+            if os.path.exists(path) and os.path.getsize(path) != array.nbytes:
+                if live_refs:
+                    raise ValueError(f"shared dataset {key} in use with a different size")
+                os.remove(path)
+            if os.path.exists(path):
+                logging.info(f"Attaching to shared dataset {path} ({len(live_refs)} other runs)")
+            else:
+                logging.info(f"Creating shared dataset {path}...")
+                tmp = f"{path}.{os.getpid()}.tmp"
+                try:
+                    with open(tmp, "wb") as f:
+                        np.ascontiguousarray(array).tofile(f)
+                    os.replace(tmp, path)
+                except BaseException:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                    raise
+            self._add_ref(key)
+        return path
+
+    def attach_existing(self, key: str) -> bool:
+        """Take a reference to the segment named key if it exists; False if it doesn't."""
+        path = self.segment_path(key)
+        with self._locked(key):
+            if not os.path.exists(path):
+                return False
+            self._add_ref(key)
+        return True
+
+    def detach(self, key: str) -> None:
+        """Release one reference to key; the segment is deleted once no run holds one."""
+        refs = self._refs.get(key)
+        if not refs:
+            return
+        with self._locked(key):
+            try:
+                os.remove(refs.pop())
+            except OSError:
+                pass
+            if not self._live_refs(key):
+                logging.info(f"Removing shared dataset {self.segment_path(key)}")
+                try:
+                    os.remove(self.segment_path(key))
+                except OSError:
+                    pass
+                shutil.rmtree(self._refs_dir(key), ignore_errors=True)
+
+
+_registry = None
+
+
+def get_registry() -> SharedDatasetRegistry:
+    """The registry of this process, created on first use."""
+    global _registry
+    if _registry is None:
+        _registry = SharedDatasetRegistry()
+    return _registry
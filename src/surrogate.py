@@ -0,0 +1,196 @@
+"""
+Surrogate pre-screening of optimizer offspring.
+
+An extremely randomized trees regressor (NumPy only) is fit on the evaluations seen so far,
+mapping parameter vectors to objectives. Before an offspring is backtested, several
+candidates are bred and the one with the best predicted objectives is submitted; the others
+are discarded. A share of submissions skips the screen so the model keeps seeing
+unbiased samples.
+
+Objectives are clipped at their 90th percentile before fitting, so penalized configs
+(objectives around 1e6) don't dominate the squared error; only the good side needs resolution.
+"""
+
+import logging
+import time
+
+import numpy as np
+
+
+class ExtraTreesRegressor:
+    """Multi-output extremely randomized trees. Trees are stored as flat arrays."""
+
+    def __init__(
+        self,
+        n_trees: int = 16,
+        max_depth: int = 10,
+        min_samples_leaf: int = 8,
+        n_split_candidates: int = 8,
+        seed=None,
+    ):
+        self.n_trees = n_trees
+        self.max_depth = max_depth
+        self.min_samples_leaf = min_samples_leaf
+        self.n_split_candidates = n_split_candidates
+        self.rng = np.random.default_rng(seed)
+        self.trees = []
+
+    def fit(self, X: np.ndarray, Y: np.ndarray) -> "ExtraTreesRegressor":
+        self.trees = [self._fit_tree(X, Y) for _ in range(self.n_trees)]
+        return self
+
+    def _fit_tree(self, X: np.ndarray, Y: np.ndarray) -> dict:
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+        varying = np.flatnonzero(X.max(axis=0) > X.min(axis=0))
+
+        def new_node(rows) -> int:
+            features.append(-1)
+            thresholds.append(0.0)
+            lefts.append(-1)
+            rights.append(-1)
+            values.append(Y[rows].mean(axis=0))
+            return len(features) - 1
+
+        stack = [(new_node(np.arange(len(X))), np.arange(len(X)), 0)]
+        while stack:
+            node, rows, depth = stack.pop()
+            if depth >= self.max_depth or len(rows) < 2 * self.min_samples_leaf or not len(varying):
+                continue
+            split = self._best_split(X[rows], Y[rows], varying)
+            if split is None:
+                continue
+            feature, threshold = split
+            mask = X[rows, feature] <= threshold
+            features[node], thresholds[node] = feature, threshold
+            lefts[node] = new_node(rows[mask])
+            rights[node] = new_node(rows[~mask])
+            stack.append((lefts[node], rows[mask], depth + 1))
+            stack.append((rights[node], rows[~mask], depth + 1))
+        return {
+            "feature": np.array(features),
+            "threshold": np.array(thresholds),
+            "left": np.array(lefts),
+            "right": np.array(rights),
+            "value": np.array(values),
+        }
+
+    def _best_split(self, X: np.ndarray, Y: np.ndarray, varying: np.ndarray):
+        n_candidates = min(self.n_split_candidates, len(varying))
+        candidate_features = self.rng.choice(varying, n_candidates, replace=False)
+        lows, highs = X[:, candidate_features].min(axis=0), X[:, candidate_features].max(axis=0)
+        candidate_thresholds = self.rng.uniform(lows, highs)
+        # (n_samples, n_candidates): which side of each candidate split every sample falls on
+        masks = X[:, candidate_features] <= candidate_thresholds
+        n_left = masks.sum(axis=0)
+        n_right = len(X) - n_left
+        valid = (n_left >= self.min_samples_leaf) & (n_right >= self.min_samples_leaf)
+        if not valid.any():
+            return None
+        # sum of squared errors after the split, up to a constant shared by all candidates
+        sum_left = masks.T.astype(float) @ Y
+        sum_right = Y.sum(axis=0) - sum_left
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gain = (sum_left**2).sum(axis=1) / n_left + (sum_right**2).sum(axis=1) / n_right
+        gain[~valid] = -np.inf
+        best = int(np.argmax(gain))
+        return int(candidate_features[best]), float(candidate_thresholds[best])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.mean([self._predict_tree(tree, X) for tree in self.trees], axis=0)
+
+    def _predict_tree(self, tree: dict, X: np.ndarray) -> np.ndarray:
+        nodes = np.zeros(len(X), dtype=int)
+        rows = np.arange(len(X))
+        for _ in range(self.max_depth):
+            feature = tree["feature"][nodes]
+            inner = feature >= 0
+            if not inner.any():
+                break
+            go_left = X[rows[inner], feature[inner]] <= tree["threshold"][nodes[inner]]
+            nodes[inner] = np.where(
+                go_left, tree["left"][nodes[inner]], tree["right"][nodes[inner]]
+            )
+        return tree["value"][nodes]
+
+
+def clip_and_standardize(Y: np.ndarray, clip_pct: float = 90.0) -> np.ndarray:
+    """Per column: clip the worst (largest) values at clip_pct, then standardize."""
+    Y = np.minimum(Y, np.percentile(Y, clip_pct, axis=0))
+    return (Y - Y.mean(axis=0)) / (Y.std(axis=0) + 1e-12)
+
+
+class SurrogateScreen:
+    """
+    Collects (genes, objectives) of finished evaluations and picks, among bred candidates,
+    the one predicted to be best. Objectives are minimized.
+
+    keep_fraction: share of bred candidates that get backtested; 1 / keep_fraction
+        candidates are bred per submitted offspring.
+    exploration: probability of submitting a candidate without screening.
+    retrain_every: refit after this many new samples.
+    """
+
+    def __init__(
+        self,
+        keep_fraction: float,
+        exploration: float = 0.1,
+        retrain_every: int = 100,
+        min_samples: int = 200,
+        max_samples: int = 2000,
+        seed=None,
+    ):
+        self.n_candidates = max(1, int(round(1.0 / keep_fraction)))
+        self.exploration = exploration
+        self.retrain_every = retrain_every
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.rng = np.random.default_rng(seed)
+        self.model = ExtraTreesRegressor(seed=seed)
+        self.X, self.Y = [], []
+        self.n_since_fit = 0
+        self.fitted = False
+        self.n_screened = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.fitted and self.n_candidates > 1
+
+    def add(self, genes, objectives) -> None:
+        self.X.append(list(genes))
+        self.Y.append(list(objectives))
+        if len(self.X) > self.max_samples:
+            # keep the most recent samples: they cover the region the search is in
+            del self.X[0], self.Y[0]
+        self.n_since_fit += 1
+        if len(self.X) >= self.min_samples and (
+            not self.fitted or self.n_since_fit >= self.retrain_every
+        ):
+            self.fit()
+
+    def fit(self) -> None:
+        sts = time.time()
+        X = np.array(self.X, dtype=float)
+        Y = clip_and_standardize(np.array(self.Y, dtype=float))
+        self.model.fit(X, Y)
+        self.fitted = True
+        self.n_since_fit = 0
+        logging.info(
+            f"surrogate fit on {len(X)} samples in {time.time() - sts:.2f}s | "
+            f"screened offspring so far: {self.n_screened}"
+        )
+
+    def pick(self, candidates: list) -> int:
+        """Index of the candidate to submit."""
+        if len(candidates) == 1 or self.rng.random() < self.exploration:
+            return 0
+        self.n_screened += len(candidates) - 1
+        predicted = self.model.predict(np.array([list(c) for c in candidates], dtype=float))
+        dominated_by = np.array(
+            [
+                np.sum(np.all(predicted <= p, axis=1) & np.any(predicted < p, axis=1))
+                for p in predicted
+            ]
+        )
+        # random among the predicted non-dominated: a scalar tie-break would favor one
+        # region of the front and cost diversity
+        return int(self.rng.choice(np.flatnonzero(dominated_by == dominated_by.min())))
@@ -0,0 +1,159 @@
+"""
+Throughput metrics of a running optimizer, for tuning n_cpus, population size and data
+resolution.
+
+Every interval seconds the optimizer appends a record to telemetry.jsonl in the results
+directory (``tail -f`` it) and replaces status.json with the same record. Rates, backtest
+times and worker utilization cover the interval since the previous record:
+
+- evals_per_second, evals_per_second_total: finished evaluations per second, in the interval
+  and since the start
+- backtest_seconds: p50/p90/p99/max time of an evaluation (backtests plus duplicate handling)
+- workers: per worker process (remote ones by host:port), evals_per_second and utilization,
+  the share of the interval it spent evaluating; worker_utilization is their mean. Workers
+  stay listed once they finished an evaluation, with 0 for the intervals they sat idle
+- duplicates, duplicate_rate: total duplicates, and their share of the interval's evaluations;
+  failed_perturbations, failed_perturbation_rate: the same for duplicates which no
+  perturbation could turn into a new config
+- in_flight, capacity: evaluations submitted but not finished, and the maximum
+- writer: records_written and backlog (records in the results channel not consumed yet) of
+  the results writer, and the size and hypervolume (None until its reference point is known)
+  of the Pareto front
+"""
+
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+
+# slots of the results writer's shared status array
+WRITER_RECORDS_WRITTEN, WRITER_BACKLOG, WRITER_FRONT_SIZE, WRITER_HYPERVOLUME = range(4)
+WRITER_STATUS_SIZE = 4
+
+
+def get_telemetry_filenames(island_id=None):
+    """(telemetry log, status) file names; islands sharing a results dir get their own."""
+    if island_id is None:
+        return "telemetry.jsonl", "status.json"
+    return f"telemetry_island_{island_id}.jsonl", f"status_island_{island_id}.json"
+
+
+class OptimizerTelemetry:
+    def __init__(
+        self,
+        results_dir: str,
+        interval: float = 30.0,
+        seen_hashes=None,
+        writer_status=None,
+        n_evals: int = 0,
+        island_id=None,
+    ):
+        log_name, status_name = get_telemetry_filenames(island_id)
+        self.log_path = os.path.join(results_dir, log_name)
+        self.status_path = os.path.join(results_dir, status_name)
+        self.interval = interval
+        self.seen_hashes = seen_hashes
+        self.writer_status = writer_status
+        self.start_ts = self.last_ts = time.time()
+        self.n_evals_start = self.n_evals = self.last_n_evals = n_evals
+        self.last_duplicates = self._duplicates()
+        self.last_failed_perturbations = self._failed_perturbations()
+        self._seconds = []
+        self._busy = defaultdict(float)  # worker -> seconds spent evaluating
+        self._counts = defaultdict(int)  # worker -> evaluations finished
+        self._workers = set()  # every worker seen so far, so idle ones are reported too
+
+    def _duplicates(self) -> int:
+        return self.seen_hashes.duplicates if self.seen_hashes is not None else 0
+
+    def _failed_perturbations(self) -> int:
+        return self.seen_hashes.failed_perturbations if self.seen_hashes is not None else 0
+
+    def on_result(self, n_evals: int, timing, backend=None) -> None:
+        self.n_evals = n_evals
+        if timing is not None and timing[1] is not None:
+            worker, seconds = timing
+            self._seconds.append(seconds)
+            self._busy[worker] += seconds
+            self._counts[worker] += 1
+            self._workers.add(worker)
+        if time.time() - self.last_ts >= self.interval:
+            self.write(backend)
+
+    def make_record(self, backend=None) -> dict:
+        now = time.time()
+        window = max(now - self.last_ts, 1e-9)
+        n_window = self.n_evals - self.last_n_evals
+        duplicates = self._duplicates()
+        failed_perturbations = self._failed_perturbations()
+        workers = {
+            worker: {
+                "evals_per_second": round(self._counts.get(worker, 0) / window, 4),
+                "utilization": round(min(1.0, self._busy.get(worker, 0.0) / window), 4),
+            }
+            for worker in sorted(self._workers)
+        }
+        record = {
+            "time": datetime.fromtimestamp(now, timezone.utc).isoformat(timespec="seconds"),
+            "elapsed_seconds": round(now - self.start_ts, 1),
+            "n_evals": self.n_evals,
+            "evals_per_second": round(n_window / window, 4),
+            "evals_per_second_total": round(
+                (self.n_evals - self.n_evals_start) / max(now - self.start_ts, 1e-9), 4
+            ),
+            "backtest_seconds": None,
+            "workers": workers,
+            "worker_utilization": (
+                round(float(np.mean([w["utilization"] for w in workers.values()])), 4)
+                if workers
+                else None
+            ),
+            "duplicates": duplicates,
+            "duplicate_rate": round((duplicates - self.last_duplicates) / max(n_window, 1), 4),
+            "failed_perturbations": failed_perturbations,
+            "failed_perturbation_rate": round(
+                (failed_perturbations - self.last_failed_perturbations) / max(n_window, 1), 4
+            ),
+        }
+        if self._seconds:
+            p50, p90, p99 = np.percentile(self._seconds, [50, 90, 99])
+            record["backtest_seconds"] = {
+                "p50": round(float(p50), 4),
+                "p90": round(float(p90), 4),
+                "p99": round(float(p99), 4),
+                "max": round(float(max(self._seconds)), 4),
+            }
+        if backend is not None:
+            record["in_flight"] = backend.n_pending
+            record["capacity"] = backend.capacity
+        if self.writer_status is not None:
+            hypervolume = float(self.writer_status[WRITER_HYPERVOLUME])
+            record["writer"] = {
+                "records_written": int(self.writer_status[WRITER_RECORDS_WRITTEN]),
+                "backlog": int(self.writer_status[WRITER_BACKLOG]),
+                "front_size": int(self.writer_status[WRITER_FRONT_SIZE]),
+                "hypervolume": None if hypervolume != hypervolume else hypervolume,
+            }
+        return record
+
+    def write(self, backend=None) -> dict:
+        """Append a record for the interval since the previous one and start a new interval."""
+        record = self.make_record(backend)
+        line = json.dumps(record)
+        with open(self.log_path, "a") as f:
+            f.write(line + "\n")
+        tmp = self.status_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(record, f, indent=4)
+        os.replace(tmp, self.status_path)
+        self.last_ts = time.time()
+        self.last_n_evals = self.n_evals
+        self.last_duplicates = record["duplicates"]
+        self.last_failed_perturbations = record["failed_perturbations"]
+        self._seconds = []
+        self._busy.clear()
+        self._counts.clear()
+        return record